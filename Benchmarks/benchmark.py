@@ -0,0 +1,303 @@
+"""
+Benchmarks LabJackPython with no devices attached. The Exodriver is
+replaced by the simulated one in LabJackSimulator, which answers like a U3,
+U6 and UE9, so the benchmarks time LabJackPython itself: building and
+checking packets, and decoding responses and stream data.
+
+For each benchmark the rate (calls, commands or samples per second) and
+the per call latency percentiles are reported. The stream decoding
+benchmarks also report the memory allocated per block, when tracemalloc
+is available.
+
+Save the results with --json and compare another run, like one from an
+earlier commit, with --compare.
+
+Usage:
+    python Benchmarks/benchmark.py [--seconds S] [--json FILE]
+                                   [--compare FILE] [benchmarks...]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+import LabJackChecksum
+import LabJackPython
+import LabJackSimulator
+import u3
+import u6
+import ue9
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+try:
+    _clock = time.perf_counter
+except AttributeError:  # Python 2
+    _clock = time.time
+
+
+def timeCalls(function, seconds):
+    """
+    Calls function for about the given number of seconds, and returns the
+    duration of each call.
+    """
+    function()  # Warm up
+    latencies = []
+    end = _clock() + seconds
+    while True:
+        start = _clock()
+        function()
+        stop = _clock()
+        latencies.append(stop - start)
+        if stop >= end:
+            return latencies
+
+
+def summarize(latencies, itemsPerCall = 1):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    total = sum(latencies)
+
+    def percentile(p):
+        return latencies[min(int(p * count), count - 1)] * 1e6
+
+    return dict(calls = count, rate = count * itemsPerCall / total, p50 = percentile(0.50), p90 = percentile(0.90), p99 = percentile(0.99), max = latencies[-1] * 1e6)
+
+
+def measureAllocations(function, repeat = 5):
+    """
+    Returns the peak bytes allocated during a call of function, and the
+    number of memory blocks still allocated after it, which are mostly its
+    result. The smallest of repeat calls is used.
+    """
+    if tracemalloc is None:
+        return dict()
+
+    peaks = []
+    blocks = []
+    tracemalloc.start()
+    try:
+        for i in range(repeat):
+            tracemalloc.clear_traces()
+            result = function()
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            blocks.append(len(tracemalloc.take_snapshot().traces))
+            del result
+    finally:
+        tracemalloc.stop()
+    return dict(peakBytesPerBlock = min(peaks), liveBlocksPerBlock = min(blocks))
+
+
+def benchSetChecksum(seconds):
+    command = [0] * 64
+    command[1] = 0xF8
+    command[2] = 0x1D
+    for i in range(6, 64):
+        command[i] = i
+    return summarize(timeCalls(lambda: LabJackPython.setChecksum(command), seconds))
+
+
+def benchFeedbackU3(seconds):
+    d = u3.U3()
+    try:
+        commands = [u3.AIN(i) for i in range(4)]
+        return summarize(timeCalls(lambda: d.getFeedback(*commands), seconds), len(commands))
+    finally:
+        d.close()
+
+
+def benchFeedbackU6(seconds):
+    d = u6.U6()
+    try:
+        commands = [u6.AIN24(i) for i in range(4)]
+        return summarize(timeCalls(lambda: d.getFeedback(*commands), seconds), len(commands))
+    finally:
+        d.close()
+
+
+def benchFeedbackPlanU6(seconds):
+    d = u6.U6()
+    try:
+        plan = d.compileFeedback(*[u6.AIN24(i) for i in range(4)])
+        return summarize(timeCalls(plan.run, seconds), len(plan))
+    finally:
+        d.close()
+
+
+def benchFeedbackPlanU6Metrics(seconds):
+    # The same as feedbackPlanU6, with metrics recorded.
+    d = u6.U6()
+    try:
+        d.enableMetrics()
+        plan = d.compileFeedback(*[u6.AIN24(i) for i in range(4)])
+        return summarize(timeCalls(plan.run, seconds), len(plan))
+    finally:
+        d.close()
+
+
+def benchFeedbackUE9(seconds):
+    d = ue9.UE9()
+    try:
+        return summarize(timeCalls(d.feedback, seconds))
+    finally:
+        d.close()
+
+
+def _rawStreamBlock(d):
+    # One block of stream data from the simulated device.
+    d.streamStart()
+    try:
+        for block in d.streamData(convert = False):
+            if block is not None:
+                return block['result']
+    finally:
+        d.streamStop()
+
+
+def _benchProcessStream(d, seconds, asArrays = False):
+    try:
+        block = _rawStreamBlock(d)
+        numBytes = d._streamPacketBytes()
+        samples = (len(block) // numBytes) * d.streamSamplesPerPacket
+        process = lambda: d.processStreamData(block, numBytes = numBytes, asArrays = asArrays)
+        result = summarize(timeCalls(process, seconds), samples)
+        result.update(measureAllocations(process))
+        return result
+    finally:
+        d.close()
+
+
+def benchProcessStreamU6(seconds):
+    d = u6.U6()
+    d.streamConfig(NumChannels = 4, ChannelNumbers = [0, 1, 2, 3], ChannelOptions = [0, 0, 0, 0], ScanFrequency = 10000)
+    return _benchProcessStream(d, seconds)
+
+
+def benchProcessStreamU6Arrays(seconds):
+    if LabJackPython._numpy() is None:
+        return None
+    d = u6.U6()
+    d.streamConfig(NumChannels = 4, ChannelNumbers = [0, 1, 2, 3], ChannelOptions = [0, 0, 0, 0], ScanFrequency = 10000)
+    return _benchProcessStream(d, seconds, asArrays = True)
+
+
+def benchProcessStreamU3(seconds):
+    d = u3.U3()
+    d.streamConfig(NumChannels = 2, PChannels = [0, 1], NChannels = [31, 31], ScanFrequency = 10000)
+    return _benchProcessStream(d, seconds)
+
+
+def benchProcessStreamUE9(seconds):
+    d = ue9.UE9()
+    d.streamConfig(NumChannels = 4, ChannelNumbers = [0, 1, 2, 3], ChannelOptions = [0, 0, 0, 0], ScanFrequency = 10000)
+    return _benchProcessStream(d, seconds)
+
+
+def benchVerifyStreamU6(seconds):
+    d = u6.U6()
+    try:
+        d.streamConfig(NumChannels = 4, ChannelNumbers = [0, 1, 2, 3], ChannelOptions = [0, 0, 0, 0], ScanFrequency = 10000)
+        block = _rawStreamBlock(d)
+        numBytes = d._streamPacketBytes()
+        samples = (len(block) // numBytes) * d.streamSamplesPerPacket
+        return summarize(timeCalls(lambda: LabJackChecksum.verifyStreamPackets(block, numBytes), seconds), samples)
+    finally:
+        d.close()
+
+
+def benchStreamDataU6(seconds):
+    d = u6.U6()
+    try:
+        d.streamConfig(NumChannels = 4, ChannelNumbers = [0, 1, 2, 3], ChannelOptions = [0, 0, 0, 0], ScanFrequency = 10000)
+        d.streamStart()
+        blocks = d.streamData()
+        samples = d.packetsPerRequest * d.streamSamplesPerPacket
+        try:
+            return summarize(timeCalls(lambda: next(blocks), seconds), samples)
+        finally:
+            d.streamStop()
+    finally:
+        d.close()
+
+
+# Name, function and what its rate counts.
+BENCHMARKS = [
+    ("setChecksum", benchSetChecksum, "calls/s"),
+    ("feedbackU3", benchFeedbackU3, "commands/s"),
+    ("feedbackU6", benchFeedbackU6, "commands/s"),
+    ("feedbackPlanU6", benchFeedbackPlanU6, "commands/s"),
+    ("feedbackPlanU6Metrics", benchFeedbackPlanU6Metrics, "commands/s"),
+    ("feedbackUE9", benchFeedbackUE9, "calls/s"),
+    ("processStreamU3", benchProcessStreamU3, "samples/s"),
+    ("processStreamU6", benchProcessStreamU6, "samples/s"),
+    ("processStreamU6Arrays", benchProcessStreamU6Arrays, "samples/s"),
+    ("processStreamUE9", benchProcessStreamUE9, "samples/s"),
+    ("verifyStreamU6", benchVerifyStreamU6, "samples/s"),
+    ("streamDataU6", benchStreamDataU6, "samples/s"),
+    ]
+
+
+def gitCommit():
+    try:
+        output = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd = REPO_DIR, stderr = subprocess.STDOUT)
+        return output.decode("ascii").strip()
+    except Exception:
+        return None
+
+
+def main():
+    names = [name for name, function, unit in BENCHMARKS]
+    parser = argparse.ArgumentParser(description = "Benchmark LabJackPython with simulated devices.")
+    parser.add_argument("benchmarks", nargs = "*", default = names, help = "the benchmarks to run (default all): %s" % ", ".join(names))
+    parser.add_argument("--seconds", type = float, default = 1.0, help = "seconds to run each benchmark (default 1)")
+    parser.add_argument("--json", help = "save the results to this file")
+    parser.add_argument("--compare", help = "compare the rates with the results saved in this file")
+    args = parser.parse_args()
+
+    unknown = set(args.benchmarks) - set(names)
+    if unknown:
+        parser.error("unknown benchmarks: %s" % ", ".join(sorted(unknown)))
+
+    numpy = LabJackPython._numpy()
+    results = dict(meta = dict(commit = gitCommit(), python = platform.python_version(), numpy = numpy.__version__ if numpy is not None else None, platform = platform.platform(), created = time.time(), seconds = args.seconds), benchmarks = dict())
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["benchmarks"]
+
+    print("%-22s %14s %-10s %9s %9s %9s %11s" % ("benchmark", "rate", "", "p50 us", "p90 us", "p99 us", "vs baseline"))
+    with LabJackSimulator.simulate():
+        for name, function, unit in BENCHMARKS:
+            if name not in args.benchmarks:
+                continue
+            result = function(args.seconds)
+            if result is None:
+                print("%-22s skipped" % name)
+                continue
+            result["unit"] = unit
+            results["benchmarks"][name] = result
+
+            change = ""
+            if baseline is not None and name in baseline:
+                change = "%+10.1f%%" % ((result["rate"] / baseline[name]["rate"] - 1) * 100)
+            print("%-22s %14.1f %-10s %9.1f %9.1f %9.1f %11s" % (name, result["rate"], unit, result["p50"], result["p90"], result["p99"], change))
+            if "peakBytesPerBlock" in result:
+                print("%-22s %d bytes peak, %d blocks live per block" % ("", result["peakBytesPerBlock"], result["liveBlocksPerBlock"]))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent = 2, sort_keys = True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Measures how long importing LabJackPython and the device modules takes,
+each in a new Python process, and checks that importing them doesn't load
+the Exodriver or UD driver, the LabJackUD module, or NumPy. The time is the
+full wall time of the import, with everything it imports.
+
+With --baseline, the same imports are timed from the src directory of
+another git revision, like the commit before a change, and the difference is
+shown.
+
+Exits with status 1 if a check fails, or if an import takes longer than
+--max-ms milliseconds.
+
+Usage:
+    python Benchmarks/importTime.py [--repeat N] [--max-ms MS]
+                                    [--baseline REV] [modules...]
+"""
+import argparse
+import compileall
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+SRC_DIR = os.path.join(ROOT_DIR, "src")
+
+DEFAULT_MODULES = ["LabJackPython", "u3", "u6", "ue9"]
+
+# Run in the new process. Prints the import time and what was loaded.
+CHILD = """
+import json, sys, time
+clock = getattr(time, "perf_counter", time.time)
+start = clock()
+module = __import__(%r)
+elapsed = clock() - start
+numpyImported = "numpy" in sys.modules
+import LabJackPython
+staticLib = getattr(LabJackPython, "staticLib", None)
+print(json.dumps(dict(
+    seconds = elapsed,
+    driverLoaded = hasattr(staticLib, "isLoaded") and staticLib.isLoaded(),
+    labJackUDImported = "LabJackUD" in sys.modules,
+    numpyImported = numpyImported)))
+"""
+
+
+def compileSource(srcDir):
+    """
+    Writes the bytecode of srcDir's modules, so every timed import loads
+    them from their .pyc files, even with PYTHONDONTWRITEBYTECODE set.
+    """
+    compileall.compile_dir(srcDir, quiet = 1)
+
+
+def timeImport(module, srcDir = SRC_DIR):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = srcDir + os.pathsep + env.get("PYTHONPATH", "")
+    output = subprocess.check_output([sys.executable, "-c", CHILD % module], env = env)
+    # The last line, in case something printed before it.
+    return json.loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def medianImportTime(module, repeat, srcDir = SRC_DIR):
+    """
+    Returns the median and minimum import times in milliseconds, and the
+    last run's results.
+    """
+    runs = [timeImport(module, srcDir) for i in range(repeat)]
+    times = sorted([run["seconds"] * 1000 for run in runs])
+    return times[len(times) // 2], times[0], runs[-1]
+
+
+def exportSource(revision, directory):
+    """
+    Writes the src directory of a git revision into directory, and returns
+    the path of the copy.
+    """
+    archive = subprocess.check_output(["git", "archive", "--format=tar", revision, "src"], cwd = ROOT_DIR)
+    tar = tarfile.open(fileobj = io.BytesIO(archive))
+    try:
+        tar.extractall(directory)
+    finally:
+        tar.close()
+    return os.path.join(directory, "src")
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Time LabJackPython imports.")
+    parser.add_argument("modules", nargs = "*", default = DEFAULT_MODULES)
+    parser.add_argument("--repeat", type = int, default = 5, help = "imports timed per module (default 5)")
+    parser.add_argument("--max-ms", type = float, default = None, help = "fail if the median import time is longer")
+    parser.add_argument("--baseline", default = None, help = "git revision to compare the import times with")
+    args = parser.parse_args()
+
+    compileSource(SRC_DIR)
+    baselineDir = None
+    if args.baseline is not None:
+        tempDir = tempfile.mkdtemp()
+        baselineDir = exportSource(args.baseline, tempDir)
+        compileSource(baselineDir)
+
+    failed = False
+    try:
+        for module in args.modules:
+            median, fastest, last = medianImportTime(module, args.repeat)
+            line = "%-14s median %7.1f ms  min %7.1f ms" % (module, median, fastest)
+            if baselineDir is not None:
+                baseline = medianImportTime(module, args.repeat, baselineDir)[0]
+                line += "  %s %7.1f ms  %+7.1f ms" % (args.baseline, baseline, median - baseline)
+            print(line)
+
+            if last["driverLoaded"]:
+                print("    FAIL: importing %s loaded the driver" % module)
+                failed = True
+            if last["labJackUDImported"]:
+                print("    FAIL: importing %s imported LabJackUD" % module)
+                failed = True
+            if last["numpyImported"]:
+                print("    FAIL: importing %s imported NumPy" % module)
+                failed = True
+            if args.max_ms is not None and median > args.max_ms:
+                print("    FAIL: longer than %s ms" % args.max_ms)
+                failed = True
+    finally:
+        if baselineDir is not None:
+            shutil.rmtree(tempDir)
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
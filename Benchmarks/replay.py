@@ -0,0 +1,96 @@
+"""
+Benchmarks stream decoding against traffic recorded with LabJackCapture,
+like a capture from a production rig, with no device attached.
+
+Two benchmarks are run on the capture's stream data:
+- processStream: processStreamData on each recorded block, as fast as
+  possible. Reported in samples per second.
+- streamData: the whole streamData loop reading the blocks from a
+  ReplayHandle. With --real-time the blocks come at their recorded times,
+  so a decoding change that can't keep up with the rig shows as a longer
+  run than the capture.
+
+Usage:
+    python Benchmarks/replay.py CAPTURE [--seconds S] [--real-time]
+"""
+import argparse
+import os
+import sys
+import time
+
+REPO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+import LabJackCapture
+import u3
+import u6
+import ue9
+from LabJackPython import LJ_dtU3, LJ_dtU6, LJ_dtUE9
+
+from benchmark import summarize, timeCalls
+
+DEVICE_CLASSES = {LJ_dtU3: u3.U3, LJ_dtU6: u6.U6, LJ_dtUE9: ue9.UE9}
+
+
+def openCapture(capture, realTime = False):
+    # A device with the attributes it had at the end of the capture, which
+    # include its stream configuration.
+    device = DEVICE_CLASSES[capture.devType](autoOpen = False)
+    return LabJackCapture.openReplay(device, capture, realTime = realTime, strict = False, final = True)
+
+
+def benchProcessStream(capture, seconds):
+    d = openCapture(capture)
+    numBytes = d._streamPacketBytes()
+    blocks = [block for block in capture.ofKind(LabJackCapture.STREAM + LabJackCapture.READ) if len(block) >= numBytes]
+    samples = sum([(len(block) // numBytes) * d.streamSamplesPerPacket for block in blocks])
+
+    def process():
+        for block in blocks:
+            d.processStreamData(block, numBytes = numBytes)
+
+    return summarize(timeCalls(process, seconds), samples)
+
+
+def benchStreamData(capture, realTime):
+    d = openCapture(capture, realTime)
+    d.streamStarted = True
+    start = time.time()
+    samples = errors = missed = 0
+    for block in d.streamData():
+        if block is not None:
+            samples += block["numPackets"] * d.streamSamplesPerPacket
+            errors += block["errors"]
+            missed += block["missed"]
+        if d.handle.remaining(LabJackCapture.STREAM) == 0:
+            break
+    elapsed = time.time() - start
+    return dict(samples = samples, errors = errors, missed = missed, seconds = elapsed, rate = samples / elapsed if elapsed else 0.0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "Benchmark stream decoding on a LabJackCapture file.")
+    parser.add_argument("capture", help = "the capture file")
+    parser.add_argument("--seconds", type = float, default = 1.0, help = "seconds to run processStream (default 1)")
+    parser.add_argument("--real-time", action = "store_true", help = "replay streamData at the recorded times")
+    args = parser.parse_args()
+
+    capture = LabJackCapture.Capture(args.capture)
+    if capture.finalDevice is None:
+        print("The capture was not stopped, so the device's stream configuration is unknown.")
+        return 1
+    streamReads = capture.ofKind(LabJackCapture.STREAM + LabJackCapture.READ)
+    print("%s: device type %s, %d records over %.1f s, %d stream reads of %d bytes" % (args.capture, capture.devType, len(capture.records), capture.duration(), len(streamReads), sum([len(data) for data in streamReads])))
+    if not streamReads:
+        return 0
+
+    result = benchProcessStream(capture, args.seconds)
+    print("%-14s %14.1f samples/s  p50 %.1f us  p99 %.1f us per pass" % ("processStream", result["rate"], result["p50"], result["p99"]))
+
+    result = benchStreamData(capture, args.real_time)
+    print("%-14s %14.1f samples/s  %d samples in %.2f s, %d errors, %d missed" % ("streamData", result["rate"], result["samples"], result["seconds"], result["errors"], result["missed"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -34,6 +34,12 @@ CLASSIFIERS = [
     'Topic :: System :: Hardware'
     ]
 
+PY_MODULES = ['LabJackCapture', 'LabJackChecksum', 'LabJackPython', 'LabJackSimulator', 'LabJackUD', 'Modbus', 'ScanScheduler', 'StreamRecorder', 'u3', 'u6', 'ue9', 'u12']
+
+if sys.version_info[:2] >= (3, 7):
+    # asyncio interface
+    PY_MODULES.append('LabJackAsync')
+
 setup(name='LabJackPython',
       version='2.1.0',
       description='The LabJack Python modules for the LabJack U3, U6, UE9 and U12.',
@@ -45,5 +51,5 @@ setup(name='LabJackPython',
       maintainer_email='support@labjack.com',
       classifiers=CLASSIFIERS,
       package_dir = {'': 'src'},
-      py_modules=['LabJackPython', 'Modbus', 'u3', 'u6', 'ue9', 'u12']
+      py_modules=PY_MODULES
       )
@@ -0,0 +1,268 @@
+"""
+Name: LabJackAsync.py
+Desc: An asyncio interface to U3, U6 and UE9 devices. Requires Python 3.7
+      or later.
+
+      AsyncDevice wraps an opened device. Over UE9 Ethernet and LJSocket the
+      Feedback, Modbus and stream traffic goes through non-blocking sockets
+      on the event loop. Over USB, and for every other device method, the
+      blocking call runs in a thread pool with a bounded number of threads
+      shared by all AsyncDevices, so many devices don't need a thread each.
+
+      Calls on one AsyncDevice run one at a time. Don't use the wrapped
+      device directly from other threads while it is wrapped.
+
+>>> import asyncio, u6, LabJackAsync
+>>> async def main():
+...     d = LabJackAsync.AsyncDevice(u6.U6())
+...     print(await d.getFeedback(u6.AIN24(0), u6.AIN24(1)))
+...     print(await d.call("getTemperature"))
+...     await d.close()
+>>> asyncio.run(main())
+"""
+import asyncio
+import concurrent.futures
+import threading
+
+from LabJackPython import (
+    FeedbackPlanGroup,
+    LabJackException,
+    LJSocketHandle,
+    SOCKET_TIMEOUT,
+    UE9StreamFramer,
+    UE9TCPHandle,
+    )
+
+
+# The most threads running blocking calls for all AsyncDevices together.
+MAX_EXECUTOR_WORKERS = 8
+
+_executor = None
+_executorLock = threading.Lock()
+
+
+def getExecutor():
+    """
+    Name: getExecutor()
+    Args: None
+    Desc: Returns the thread pool AsyncDevices use for blocking calls by
+          default, making it the first time. It has at most
+          MAX_EXECUTOR_WORKERS threads.
+    """
+    global _executor
+    with _executorLock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers = MAX_EXECUTOR_WORKERS)
+        return _executor
+
+
+class AsyncDevice(object):
+    """
+    AsyncDevice(device, executor = None)
+
+    Wraps an opened U3, U6 or UE9 with awaitable methods. executor is the
+    concurrent.futures executor for blocking calls, the shared one from
+    getExecutor() by default.
+    """
+    def __init__(self, device, executor = None):
+        self.device = device
+        self.executor = executor if executor is not None else getExecutor()
+        self._lock = None
+        self.sockets = dict()
+
+        # Non-blocking copies of the handle's sockets. The device keeps its
+        # own blocking sockets for the calls that run in the executor.
+        handle = device.handle
+        if isinstance(handle, LJSocketHandle):
+            names = dict(command = handle.crSocket, modbus = handle.modbusSocket, stream = handle.spontSocket)
+        elif isinstance(handle, UE9TCPHandle):
+            names = dict(command = handle.data, modbus = handle.modbus, stream = handle.stream)
+        else:
+            names = dict()
+
+        for name, sock in names.items():
+            if sock is not None:
+                asyncSock = sock.dup()
+                asyncSock.setblocking(False)
+                self.sockets[name] = (asyncSock, sock.gettimeout() or SOCKET_TIMEOUT)
+
+    @property
+    def lock(self):
+        # Made on first use, so it belongs to the running event loop.
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _runBlocking(self, function, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def _send(self, name, data):
+        sock, timeout = self.sockets[name]
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.wait_for(loop.sock_sendall(sock, bytes(data)), timeout)
+        except asyncio.TimeoutError:
+            raise LabJackException("Timed out sending to the %s." % self.device.deviceName)
+
+    async def _recvInto(self, name, view):
+        sock, timeout = self.sockets[name]
+        loop = asyncio.get_running_loop()
+        try:
+            count = await asyncio.wait_for(loop.sock_recv_into(sock, view), timeout)
+        except asyncio.TimeoutError:
+            raise LabJackException("Timed out waiting for a response from the %s." % self.device.deviceName)
+        if count == 0:
+            raise LabJackException("Communication Failure: The %s closed the connection." % self.device.deviceName)
+        return count
+
+    async def _recvExactly(self, name, numBytes):
+        buffer = bytearray(numBytes)
+        view = memoryview(buffer)
+        received = 0
+        while received < numBytes:
+            received += await self._recvInto(name, view[received:])
+        return buffer
+
+    async def call(self, name, *args, **kargs):
+        """
+        Name: AsyncDevice.call(name, *args, **kargs)
+        Args: name, the name of a method of the device
+              args, kargs, the method's arguments
+        Desc: Runs any method of the device in the executor and returns its
+              result, like await d.call("getAIN", 0).
+        """
+        method = getattr(self.device, name)
+        async with self.lock:
+            return await self._runBlocking(lambda: method(*args, **kargs))
+
+    async def getFeedback(self, *commandlist, **kargs):
+        """
+        Name: AsyncDevice.getFeedback(commandlist)
+        Args: the FeedbackCommands to run
+        Desc: Returns the results of the Feedback commands, like
+              getFeedback. The commands may be more than fit in one packet,
+              like getFeedbackMany. For the UE9, the arguments are passed to
+              UE9.feedback.
+        """
+        if not hasattr(self.device, "compileFeedbackMany"):
+            return await self.call("feedback", *commandlist, **kargs)
+        return await self.runFeedback(self.device.compileFeedbackMany(*commandlist))
+
+    async def runFeedback(self, plan):
+        """
+        Name: AsyncDevice.runFeedback(plan)
+        Args: plan, a FeedbackPlan or FeedbackPlanGroup from compileFeedback
+                    or compileFeedbackMany
+        Desc: Runs a compiled Feedback plan and returns its results.
+        """
+        if "command" not in self.sockets:
+            async with self.lock:
+                return await self._runBlocking(plan.run)
+
+        plans = plan.plans if isinstance(plan, FeedbackPlanGroup) else [plan]
+        async with self.lock:
+            for p in plans:
+                await self._send("command", p.request)
+            responses = []
+            for p in plans:
+                responses.append(await self._recvExactly("command", p.readLen))
+
+        results = []
+        for p, response in zip(plans, responses):
+            results.extend(p.parse(response))
+        return results
+
+    async def readRegister(self, addr, numReg = None, format = None, unitId = None):
+        """
+        Name: AsyncDevice.readRegister(addr, numReg = None, format = None,
+                                       unitId = None)
+        Args: the same as Device.readRegister
+        Desc: Reads a Modbus register and returns its value.
+        """
+        if "modbus" not in self.sockets:
+            return await self.call("readRegister", addr, numReg, format, unitId)
+
+        pkt, numBytes = self.device._buildReadRegisterPacket(addr, numReg, unitId)
+        response = await self._modbusWriteRead(pkt, numBytes)
+        return self.device._parseReadRegisterResponse(response, numBytes, addr, format, numReg)
+
+    async def writeRegister(self, addr, value, unitId = None):
+        """
+        Name: AsyncDevice.writeRegister(addr, value, unitId = None)
+        Args: the same as Device.writeRegister
+        Desc: Writes a value, or list of values, to Modbus registers.
+        """
+        if "modbus" not in self.sockets:
+            return await self.call("writeRegister", addr, value, unitId)
+
+        pkt, numBytes = self.device._buildWriteRegisterPacket(addr, value, unitId)
+        response = await self._modbusWriteRead(pkt, numBytes)
+        return self.device._parseWriteRegisterResponse(response, pkt, value)
+
+    async def _modbusWriteRead(self, request, numBytes):
+        async with self.lock:
+            await self._send("modbus", bytearray(request))
+            return list(await self._recvExactly("modbus", numBytes))
+
+    async def streamData(self, convert = True, asArrays = False):
+        """
+        Name: AsyncDevice.streamData(convert = True, asArrays = False)
+        Args: the same as Device.streamData
+        Desc: An async iterator of stream data blocks, the same dictionaries
+              Device.streamData returns. Start the stream first with
+              await d.call("streamStart").
+
+        >>> await d.call("streamStart")
+        >>> async for block in d.streamData():
+        ...     print(block['AIN0'][0])
+        """
+        if "stream" not in self.sockets:
+            blocks = self.device.streamData(convert = convert, asArrays = asArrays)
+            while True:
+                async with self.lock:
+                    block = await self._runBlocking(next, blocks)
+                if block is not None:
+                    yield block
+            return
+
+        if not self.device.streamStarted:
+            raise LabJackException("Stream has not been started. Configure and start streaming before reading stream data.")
+
+        numBytes = self.device._streamPacketBytes()
+        blockSize = numBytes * self.device.packetsPerRequest
+        framer = None
+        if isinstance(self.device.handle, UE9TCPHandle):
+            # Resynchronizes on packet boundaries if bytes are lost.
+            framer = UE9StreamFramer(None, numBytes, max(256, 4 * self.device.packetsPerRequest))
+
+        while self.device.streamStarted:
+            if framer is not None:
+                while framer.available() < self.device.packetsPerRequest:
+                    framer.commit(await self._recvInto("stream", framer.freeSpace()))
+                result = framer.packets(self.device.packetsPerRequest)
+            else:
+                result = bytes(await self._recvExactly("stream", blockSize))
+            block = self.device._streamBlockInfo(result, numBytes)
+            block.update(numPackets = blockSize // numBytes, result = result)
+            if convert:
+                block.update(self.device.processStreamData(result, numBytes = numBytes, asArrays = asArrays))
+            yield block
+
+    async def close(self):
+        """
+        Name: AsyncDevice.close()
+        Args: None
+        Desc: Closes the non-blocking sockets and the device.
+        """
+        for sock, timeout in self.sockets.values():
+            sock.close()
+        self.sockets = dict()
+        async with self.lock:
+            await self._runBlocking(self.device.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
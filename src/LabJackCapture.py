@@ -0,0 +1,379 @@
+"""
+Name: LabJackCapture.py
+Desc: Records the bytes a device sends and receives into a capture file,
+      and replays captures in place of the device.
+
+      startCapture() puts a RecordingHandle in front of a device's handle,
+      which can be an Exodriver or UD driver handle, a UE9TCPHandle or an
+      LJSocketHandle. Every command, Modbus request, response and stream
+      read then goes into the file with the time it happened. Start the
+      capture before streamStart, so stream reads go through it too.
+
+      A ReplayHandle answers from a capture: each read returns the next
+      recorded response, either as fast as it is read or at the times it
+      originally came. openReplay() opens a device on one, so the same
+      getFeedback, streamData and processStreamData code runs against
+      recorded traffic with no device attached.
+
+      A capture file starts with a header: the 4 bytes "LJCP", a version
+      byte and the length of a JSON description of the device, followed by
+      the description. Each record is then a kind byte, the seconds since
+      the capture started as a double, the length of the data as an
+      unsigned 32-bit int, all little-endian, and the data. The last record
+      describes the device again, as it was when the capture stopped.
+
+>>> import u6, LabJackCapture
+>>> d = u6.U6()
+>>> LabJackCapture.startCapture(d, "rig.ljcap")
+>>> d.getFeedback(u6.AIN24(0))
+>>> LabJackCapture.stopCapture(d)
+>>> r = LabJackCapture.openReplay(u6.U6(autoOpen = False), "rig.ljcap")
+>>> r.getFeedback(u6.AIN24(0))
+"""
+import contextlib
+import json
+import threading
+import time
+
+from struct import Struct
+
+from LabJackPython import Device, EmulatedHandle, LabJackException, _monotonic
+
+
+_MAGIC = b"LJCP"
+_VERSION = 1
+_HEADER = Struct("<4sBI")
+_RECORD = Struct("<BdI")
+
+# A record's kind is its channel plus its direction.
+WRITE = 0
+READ = 1
+COMMAND = 0
+MODBUS = 2
+STREAM = 4
+# The last record, which describes the device when the capture stopped.
+DEVICE_STATE = 8
+
+# Device attributes that belong to the connection, not the device.
+_NOT_SAVED = frozenset(["handle", "debug", "changed", "deviceLock"])
+
+
+def _deviceState(device):
+    # The device's public attributes that JSON can hold, with calInfo's.
+    state = dict()
+    for name, value in vars(device).items():
+        if name.startswith("_") or name in _NOT_SAVED:
+            continue
+        if name == "calInfo":
+            value = vars(value)
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            continue
+        state[name] = value
+    return state
+
+
+def _restoreState(device, state):
+    for name, value in state.items():
+        if name == "calInfo" and hasattr(device, "calInfo"):
+            device.calInfo.__dict__.update(value)
+        else:
+            setattr(device, name, value)
+
+
+class RecordingHandle(EmulatedHandle):
+    """
+    RecordingHandle(device, path)
+
+    Passes device's reads and writes on to its handle, and records them in
+    a new capture file at path. Made by startCapture.
+
+    Attributes:
+    device -- the device recorded
+    handle -- the handle that was replaced
+    records -- the number of records written
+    """
+    def __init__(self, device, path):
+        self.device = device
+        self.devType = device.devType
+        self.handle = device.handle
+        # A Device on the original handle does the reads and writes.
+        self.transport = Device(device.handle, devType = device.devType)
+        self.transport.deviceName = device.deviceName
+        self.records = 0
+        self.lock = threading.Lock()
+        self.startTime = _monotonic()
+
+        description = json.dumps(dict(devType = device.devType, created = time.time(), device = _deviceState(device))).encode("utf-8")
+        self.file = open(path, "wb")
+        self.file.write(_HEADER.pack(_MAGIC, _VERSION, len(description)))
+        self.file.write(description)
+
+    def record(self, kind, data):
+        """
+        Name: RecordingHandle.record(kind, data)
+        Args: kind, the channel plus the direction, like STREAM + READ
+              data, the bytes sent or received
+        Desc: Writes a record timed now.
+        """
+        with self.lock:
+            if self.file is None:
+                return
+            self.file.write(_RECORD.pack(kind, _monotonic() - self.startTime, len(data)))
+            self.file.write(data)
+            self.records += 1
+
+    def write(self, data, modbus = False):
+        self.record((MODBUS if modbus else COMMAND) + WRITE, data)
+        self.transport._writeBytes(bytearray(data), modbus)
+
+    def read(self, numBytes, modbus = False):
+        data = self.transport._readBytes(numBytes, False, modbus)
+        self.record((MODBUS if modbus else COMMAND) + READ, data)
+        return data
+
+    def streamRead(self, numBytes, timeout):
+        data = self.transport._readBytes(numBytes, True, False)
+        self.record(STREAM + READ, data)
+        return data
+
+    def finish(self):
+        """
+        Name: RecordingHandle.finish()
+        Args: None
+        Desc: Writes the last record, which describes the device, and
+              closes the file. The handle isn't closed.
+        """
+        state = json.dumps(_deviceState(self.device)).encode("utf-8")
+        self.record(DEVICE_STATE, state)
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def close(self):
+        # The device is closed while it is recorded.
+        self.finish()
+        self.transport.close()
+
+
+def startCapture(device, path):
+    """
+    Name: startCapture(device, path)
+    Args: device, an opened device
+          path, the capture file to write. It is replaced if it exists.
+    Desc: Starts recording everything device sends and receives, and
+          returns the RecordingHandle that now is device.handle.
+    """
+    if isinstance(device.handle, RecordingHandle):
+        raise LabJackException("The %s is already being captured." % device.deviceName)
+    if device.handle is None:
+        raise LabJackException("The device handle is None.")
+
+    with device.deviceLock:
+        device.handle = RecordingHandle(device, path)
+    return device.handle
+
+
+def stopCapture(device):
+    """
+    Name: stopCapture(device)
+    Args: device, a device startCapture was called on
+    Desc: Stops recording, finishes the capture file and gives device its
+          own handle back.
+    """
+    handle = device.handle
+    if not isinstance(handle, RecordingHandle):
+        raise LabJackException("The %s is not being captured." % device.deviceName)
+
+    with device.deviceLock:
+        handle.finish()
+        device.handle = handle.handle
+
+
+@contextlib.contextmanager
+def capture(device, path):
+    """
+    Name: capture(device, path)
+    Args: the same as startCapture
+    Desc: A with statement context that captures device's traffic to path
+          while it runs.
+    """
+    startCapture(device, path)
+    try:
+        yield device.handle
+    finally:
+        if isinstance(device.handle, RecordingHandle):
+            stopCapture(device)
+
+
+class Capture(object):
+    """
+    Capture(path)
+
+    A capture file read into memory.
+
+    Attributes:
+    devType -- the device type captured
+    device -- the device's attributes when the capture started
+    finalDevice -- the device's attributes when it stopped, or None if the
+                   capture wasn't stopped
+    records -- a list of (kind, seconds, data) tuples
+    """
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            contents = f.read()
+
+        if len(contents) < _HEADER.size:
+            raise LabJackException("%s is not a capture file." % path)
+        magic, version, length = _HEADER.unpack_from(contents, 0)
+        if magic != _MAGIC:
+            raise LabJackException("%s is not a capture file." % path)
+        if version != _VERSION:
+            raise LabJackException("%s is a version %s capture file, and version %s files can be read." % (path, version, _VERSION))
+
+        offset = _HEADER.size
+        description = json.loads(contents[offset:offset + length].decode("utf-8"))
+        offset += length
+        self.devType = description["devType"]
+        self.created = description["created"]
+        self.device = description["device"]
+        self.finalDevice = None
+
+        self.records = []
+        while offset + _RECORD.size <= len(contents):
+            kind, seconds, length = _RECORD.unpack_from(contents, offset)
+            offset += _RECORD.size
+            data = contents[offset:offset + length]
+            offset += length
+            if len(data) < length:
+                break  # Cut off while it was written
+            if kind == DEVICE_STATE:
+                self.finalDevice = json.loads(data.decode("utf-8"))
+            else:
+                self.records.append((kind, seconds, data))
+
+    def ofKind(self, kind):
+        """
+        Name: Capture.ofKind(kind)
+        Args: kind, like STREAM + READ
+        Desc: Returns the data of the records of one kind, in order.
+        """
+        return [data for k, seconds, data in self.records if k == kind]
+
+    def duration(self):
+        """
+        Name: Capture.duration()
+        Args: None
+        Desc: Returns the seconds from the first record to the last.
+        """
+        if not self.records:
+            return 0.0
+        return self.records[-1][1] - self.records[0][1]
+
+
+class ReplayHandle(EmulatedHandle):
+    """
+    ReplayHandle(capture, realTime = False, strict = True)
+
+    Answers from a Capture, or the capture file at that path. The command,
+    Modbus and stream channels are replayed separately, each in order.
+
+    realTime, if True, returns each response no sooner after the first one
+    than it originally came. Otherwise responses are returned as soon as
+    they are read.
+    strict, if True, raises a LabJackException when a command written is
+    not the one recorded next. Otherwise the recorded response is returned
+    anyway.
+    """
+    def __init__(self, capture, realTime = False, strict = True):
+        if not isinstance(capture, Capture):
+            capture = Capture(capture)
+        self.capture = capture
+        self.devType = capture.devType
+        self.realTime = realTime
+        self.strict = strict
+        self.lock = threading.Lock()
+        self.offset = None
+
+        self.queues = dict()
+        for channel in (COMMAND, MODBUS, STREAM):
+            self.queues[channel] = [(kind, seconds, data) for kind, seconds, data in capture.records if kind & ~READ == channel]
+            self.queues[channel].reverse()  # Popped from the end
+
+    def remaining(self, channel):
+        """
+        Name: ReplayHandle.remaining(channel)
+        Args: channel, COMMAND, MODBUS or STREAM
+        Desc: Returns the number of records left on a channel.
+        """
+        return len(self.queues[channel])
+
+    def _next(self, channel, direction):
+        with self.lock:
+            queue = self.queues[channel]
+            if not queue:
+                return None
+            kind, seconds, data = queue[-1]
+            if kind != channel + direction:
+                return None
+            queue.pop()
+            if self.offset is None:
+                self.offset = _monotonic() - seconds
+
+        if self.realTime and direction == READ:
+            wait = self.offset + seconds - _monotonic()
+            if wait > 0:
+                time.sleep(wait)
+        return data
+
+    def write(self, data, modbus = False):
+        recorded = self._next(MODBUS if modbus else COMMAND, WRITE)
+        if not self.strict:
+            return
+        if recorded is None:
+            raise LabJackException("The capture has no more commands to replay, or expected a read.")
+        if bytes(data) != recorded:
+            raise LabJackException("The command written is not the one captured.\nWritten: %s\nCaptured: %s" % (list(bytearray(data)), list(bytearray(recorded))))
+
+    def read(self, numBytes, modbus = False):
+        data = self._next(MODBUS if modbus else COMMAND, READ)
+        if data is None:
+            return b""
+        return data[:numBytes]
+
+    def streamRead(self, numBytes, timeout):
+        data = self._next(STREAM, READ)
+        if data is None:
+            return b""
+        return data[:numBytes]
+
+
+def openReplay(device, capture, realTime = False, strict = True, final = False):
+    """
+    Name: openReplay(device, capture, realTime = False, strict = True,
+                     final = False)
+    Args: device, a u3.U3, u6.U6 or ue9.UE9 made with autoOpen = False
+          capture, a Capture or the path of a capture file
+          realTime, strict, the same as for ReplayHandle
+          final, if True, device gets the attributes it had when the
+                 capture stopped, like its stream configuration, instead of
+                 those it had when the capture started
+    Desc: Opens device on a ReplayHandle for capture, and returns device.
+          The device's attributes, like its serial number and calibration,
+          are set to the captured device's. No commands are sent to open
+          it, since a capture starts with the device already open.
+    """
+    if device.handle is not None:
+        raise LabJackException("The device is already open.")
+
+    handle = ReplayHandle(capture, realTime, strict)
+    state = handle.capture.device
+    if final:
+        if handle.capture.finalDevice is None:
+            raise LabJackException("The capture was not stopped, so it doesn't have the device's final attributes.")
+        state = handle.capture.finalDevice
+    _restoreState(device, state)
+    device.handle = handle
+    return device
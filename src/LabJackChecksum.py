@@ -0,0 +1,188 @@
+"""
+Name: LabJackChecksum.py
+Desc: Computes and verifies the checksums of LabJack low-level packets.
+      Packets can be lists of byte values, bytes, bytearrays or
+      memoryviews, and can be checked where they are in a larger buffer
+      with an offset. Verifying never changes the packet.
+
+      A normal command has a checksum8 of bytes 1 and on in byte 0. An
+      extended command, with 0xF8 or 0xF9 in byte 1, has a checksum16 of
+      bytes 6 and on in bytes 4 and 5, and a checksum8 of bytes 1 to 5 in
+      byte 0. Stream data packets are extended packets.
+
+      verifyStreamPackets checks every packet of a block of stream data,
+      with one NumPy pass over the whole block when NumPy is installed.
+
+>>> import LabJackChecksum
+>>> command = bytearray([0, 0xF8, 0x03, 0x0B, 0, 0, 0, 0, 0, 0, 0, 0])
+>>> LabJackChecksum.setChecksum(command)[0]
+7
+>>> LabJackChecksum.verifyChecksum(command)
+True
+"""
+import sys
+
+# Python 2 bytes and memoryviews give one character strings, not ints.
+_PY2 = sys.version_info[0] < 3
+
+# NumPy is optional, and used to verify stream blocks in one pass. It's
+# only imported the first time verifyStreamPackets needs it.
+numpy = None
+_numpyTried = False
+
+
+def _numpy():
+    global numpy, _numpyTried
+    if not _numpyTried:
+        _numpyTried = True
+        try:
+            import numpy as module
+            numpy = module
+        except ImportError:
+            pass
+    return numpy
+
+
+def _sum(buffer, start, stop):
+    # Summing a slice in C is faster than any loop over the bytes, even with
+    # the short-lived slice, and works on every buffer type.
+    if _PY2 and not isinstance(buffer, (list, bytearray)):
+        return sum(bytearray(buffer[start:stop]))
+    return sum(buffer[start:stop])
+
+
+def checksum8(buffer, numBytes = None, offset = 0):
+    """
+    Name: checksum8(buffer, numBytes = None, offset = 0)
+    Args: buffer, the packet, or a buffer it is in
+          numBytes, the number of bytes the checksum is over, counting the
+                    checksum byte. Defaults to the rest of buffer.
+          offset, where the packet starts in buffer
+    Desc: Returns the 8-bit checksum of the bytes after the first: their
+          sum with the carries added back in.
+    """
+    if numBytes is None:
+        numBytes = len(buffer) - offset
+    total = _sum(buffer, offset + 1, offset + numBytes)
+    total = (total & 0xff) + ((total >> 8) & 0xff)
+    return (total & 0xff) + ((total >> 8) & 0xff)
+
+
+def checksum16(buffer, numBytes = None, offset = 0):
+    """
+    Name: checksum16(buffer, numBytes = None, offset = 0)
+    Args: buffer, the packet, or a buffer it is in
+          numBytes, the length of the packet. Defaults to the rest of
+                    buffer.
+          offset, where the packet starts in buffer
+    Desc: Returns the 16-bit checksum of an extended packet: the sum of the
+          bytes after its 6-byte header.
+    """
+    if numBytes is None:
+        numBytes = len(buffer) - offset
+    return _sum(buffer, offset + 6, offset + numBytes) & 0xffff
+
+
+def isExtended(buffer, offset = 0):
+    """
+    Name: isExtended(buffer, offset = 0)
+    Args: buffer, the packet, or a buffer it is in
+          offset, where the packet starts in buffer
+    Desc: Returns True if the packet is an extended one, with a checksum16.
+    """
+    return (buffer[offset + 1] & 0x78) >> 3 == 15
+
+
+def setChecksum8(buffer, numBytes):
+    """
+    Name: setChecksum8(buffer, numBytes)
+    Args: buffer, a list or bytearray
+          numBytes, the number of bytes the checksum is over
+    Desc: Puts the checksum8 in byte 0 and returns buffer.
+    """
+    buffer[0] = checksum8(buffer, numBytes)
+    return buffer
+
+
+def setChecksum16(buffer):
+    """
+    Name: setChecksum16(buffer)
+    Args: buffer, a list or bytearray
+    Desc: Puts the checksum16 in bytes 4 and 5 and returns buffer.
+    """
+    total = checksum16(buffer)
+    buffer[4] = total & 0xff
+    buffer[5] = (total >> 8) & 0xff
+    return buffer
+
+
+def setChecksum(buffer):
+    """
+    Name: setChecksum(buffer)
+    Args: buffer, a list or bytearray of at least 6 bytes
+    Desc: Puts the checksums of a normal or extended command in place and
+          returns buffer.
+    """
+    if isExtended(buffer):
+        setChecksum16(buffer)
+        return setChecksum8(buffer, 6)
+    return setChecksum8(buffer, len(buffer))
+
+
+def _verifyExtended(buffer, numBytes, offset):
+    total = checksum16(buffer, numBytes, offset)
+    if buffer[offset + 4] != (total & 0xff) or buffer[offset + 5] != (total >> 8):
+        return False
+    return buffer[offset] == checksum8(buffer, 6, offset)
+
+
+def verifyChecksum(buffer, numBytes = None, offset = 0):
+    """
+    Name: verifyChecksum(buffer, numBytes = None, offset = 0)
+    Args: buffer, the packet, or a buffer it is in
+          numBytes, the length of the packet. Defaults to the rest of
+                    buffer.
+          offset, where the packet starts in buffer
+    Desc: Returns True if the packet's checksums are right. buffer isn't
+          changed.
+    """
+    if _PY2 and not isinstance(buffer, (list, bytearray)):
+        buffer = bytearray(buffer)
+    if numBytes is None:
+        numBytes = len(buffer) - offset
+    if isExtended(buffer, offset):
+        return _verifyExtended(buffer, numBytes, offset)
+    return buffer[offset] == checksum8(buffer, numBytes, offset)
+
+
+def verifyStreamPackets(data, numBytes, trailerBytes = 0):
+    """
+    Name: verifyStreamPackets(data, numBytes, trailerBytes = 0)
+    Args: data, a block of stream data
+          numBytes, the number of bytes per packet
+          trailerBytes, the number of extra bytes after each packet, which
+                        the checksums don't cover. The UE9 appends 2 bytes
+                        to its USB stream packets.
+    Desc: Verifies both checksums of every packet in data, and returns a
+          mask with True for each packet whose checksums are right. The
+          mask is a NumPy array of bools when NumPy is installed, and a
+          list otherwise. Any partial packet at the end is ignored.
+    """
+    numPackets = len(data) // numBytes
+    end = numBytes - trailerBytes
+
+    numpy = _numpy()
+    if numpy is not None:
+        packets = numpy.frombuffer(data, dtype = numpy.uint8, count = numPackets*numBytes).reshape(numPackets, numBytes)
+        total = packets[:, 6:end].sum(axis = 1, dtype = numpy.uint32)
+        valid = (packets[:, 4] == (total & 0xff)) & (packets[:, 5] == ((total >> 8) & 0xff))
+
+        total = packets[:, 1:6].sum(axis = 1, dtype = numpy.uint32)
+        total = (total & 0xff) + (total >> 8)
+        total = (total & 0xff) + (total >> 8)
+        valid &= packets[:, 0] == total
+        return valid
+
+    if _PY2 and not isinstance(data, bytearray):
+        data = bytearray(data)
+    return [_verifyExtended(data, end, offset) for offset in range(0, numPackets*numBytes, numBytes)]
@@ -14,15 +14,54 @@ A typical user should start with their device's module, such as u3.py.
 from __future__ import with_statement
 
 import atexit  # For auto-closing devices
+import collections
 import socket
 import ctypes  # import after socket or cygwin crashes "Aborted (core dump)"
 import errno
+import importlib
+import json
+import os
+import select
 import sys
 import threading  # For a thread-safe device lock
+import time
 import logging
 
-from struct import pack, unpack
+try:
+    import Queue as queue  # Python 2
+except ImportError:
+    import queue
+
+from struct import pack, unpack, unpack_from, Struct
+
+# Monotonic, and fine enough to time single commands.
+try:
+    _monotonic = time.perf_counter
+except AttributeError:  # Python 2
+    _monotonic = time.time
+
+# NumPy is optional, and used for fast stream data decoding. It's only
+# imported the first time it's needed, by _numpy(), since importing it takes
+# longer than importing LabJackPython.
+numpy = None
+_numpyTried = False
+
+def _numpy():
+    """
+    Imports NumPy the first time it's called, and returns it, or None if it
+    isn't installed.
+    """
+    global numpy, _numpyTried
+    if not _numpyTried:
+        _numpyTried = True
+        try:
+            import numpy as module
+            numpy = module
+        except ImportError:
+            pass
+    return numpy
 
+import LabJackChecksum
 import Modbus
 
 
@@ -31,12 +70,42 @@ __version__ = LABJACKPYTHON_VERSION
 
 SOCKET_TIMEOUT = 3
 LJSOCKET_TIMEOUT = 62
+LJSOCKET_SCAN_TTL = 5  # Seconds an LJSocketClient keeps scan results
 BROADCAST_SOCKET_TIMEOUT = 1
 MAX_USB_PACKET_LENGTH = 64
 
+# The most calibration lookup tables a device keeps. Each is 512 KB.
+CALIBRATION_TABLE_CACHE_SIZE = 16
+
+# The most low-level commands a CommandPipeline has sent before reading
+# their responses.
+PIPELINE_WINDOW = 8
+
+# The most devices opened at the same time by openAllLabJacks, listAll and
+# the openAll functions of u3, u6 and ue9.
+MAX_ENUMERATION_THREADS = 8
+
+# The buckets of the DeviceMetrics latency histograms, and the upper bound
+# of each in microseconds. The last bucket also counts everything longer.
+METRICS_BUCKETS = 24
+METRICS_BUCKET_BOUNDS = tuple([2**i for i in range(METRICS_BUCKETS)])
+
+# The seconds between calls of a DeviceMetrics callback.
+METRICS_EXPORT_INTERVAL = 60
+
+# The most events a ProtocolTrace keeps, and the bytes of each stream read
+# it keeps, which is about one packet.
+TRACE_BUFFER_EVENTS = 1024
+TRACE_STREAM_BYTES = 64
+
 NUMBER_OF_UNIQUE_LABJACK_PRODUCT_IDS = 4
 
-_os_name = ""  # Set to "nt" or "posix" in _loadLibrary.
+# "nt" where the UD driver is used, "posix" where the Exodriver is used.
+# Known from the platform, without loading either driver.
+if sys.platform.startswith("win32") or sys.platform.startswith("cygwin"):
+    _os_name = "nt"
+else:
+    _os_name = "posix"
 
 _use_ptr = True  # Set to True or False in _loadLibrary. Indicates whether to use
                  # the Ptr version of certain UD calls or not. Windows only.
@@ -64,13 +133,16 @@ class LabJackException(Exception):
         self.errorCode = ec
         self.errorString = errorString
 
-        if not self.errorString:
+        if not self.errorString and _os_name == 'nt':
+            # Only the UD driver has ErrorToString.
             try:
                 pString = ctypes.create_string_buffer(256)
                 staticLib.ErrorToString(ctypes.c_long(self.errorCode), ctypes.byref(pString))
                 self.errorString = pString.value.decode("ascii").split("\0", 1)[0]
             except:
-                self.errorString = str(self.errorCode)
+                pass
+        if not self.errorString:
+            self.errorString = str(self.errorCode)
 
     def __str__(self):
           return self.errorString
@@ -137,10 +209,8 @@ def _loadLibrary():
     """_loadLibrary()
     Returns a ctypes dll pointer to the library.
     """
-    global _os_name
     global _use_ptr
 
-    _os_name = "nt"
     try:
         wlib = None
         if sys.platform.startswith("win32"):
@@ -157,7 +227,6 @@ def _loadLibrary():
         e = sys.exc_info()[1]
         raise LabJackException("Could not load the LabJackUD driver. Only Ethernet connectivity is available.\n\n    The error was: %s" % e)
 
-    _os_name = "posix"
     addStr = "Exodriver"
     try:
         if sys.platform.startswith("linux"):
@@ -178,12 +247,53 @@ def _loadLibrary():
         e = sys.exc_info()[1]
         raise LabJackException("Could not load the %s for some reason other than it not being installed. Only Ethernet connectivity is available.\n\n    The error was: %s" % (addStr, e))
 
-try:
-    staticLib = _loadLibrary()
-except LabJackException:
-    e = sys.exc_info()[1]
-    print("%s: %s" % (type(e), e))
-    staticLib = None
+class _LazyLibrary(object):
+    """
+    Stands in for the driver library until it is first used, so importing
+    LabJackPython doesn't load the Exodriver or UD driver. The first
+    attribute lookup, like staticLib.LJUSB_OpenDevice, loads it with
+    _loadLibrary(). If the driver can't be loaded, the LabJackException is
+    kept, and every lookup raises it.
+    """
+    def __init__(self):
+        self._lib = None
+        self._error = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Name: staticLib.load()
+        Args: None
+        Desc: Loads the driver if it isn't loaded yet, and returns the
+              ctypes library. Raises a LabJackException if it can't be
+              loaded.
+        """
+        if self._lib is None:
+            with self._lock:
+                if self._lib is None and self._error is None:
+                    try:
+                        self._lib = _loadLibrary()
+                    except LabJackException:
+                        self._error = sys.exc_info()[1]
+            if self._lib is None:
+                raise self._error
+        return self._lib
+
+    def isLoaded(self):
+        """
+        Name: staticLib.isLoaded()
+        Args: None
+        Desc: Returns True if the driver has been loaded.
+        """
+        return self._lib is not None
+
+    def __getattr__(self, name):
+        # Kept on the instance, so later lookups don't come back here.
+        value = getattr(self.load(), name)
+        self.__dict__[name] = value
+        return value
+
+staticLib = _LazyLibrary()
 
 
 class Device(object):
@@ -216,44 +326,46 @@ class Device(object):
         self.modbusPrependZeros = True
         self.deviceLock = threading.Lock()
         self.deviceName = "LabJack"
-        
+        self._streamReader = None
+        self._streamLastPacketCounter = None
+        self._calibrationTables = collections.OrderedDict()
+        self._calibrationTableKeys = set()  # The keys of the block being decoded
+        self._calibrationTableLastKeys = 0  # How many keys the block before used
+        self.calibrationTableCacheSize = CALIBRATION_TABLE_CACHE_SIZE
+        self.metrics = None
+        self.trace = None
+        self.verifyStreamChecksums = False
+
 
     def _writeToLJSocketHandle(self, writeBuffer, modbus):
         #if modbus is True and self.modbusPrependZeros:
         #        writeBuffer = [ 0, 0 ] + writeBuffer
-            
-        packFormat = "B" * len(writeBuffer)
-        tempString = pack(packFormat, *writeBuffer)
         
         if modbus:
-            self.handle.modbusSocket.send(tempString)
+            self.handle.modbusSocket.sendall(writeBuffer)
         else:
-            self.handle.crSocket.send(tempString)
+            self.handle.crSocket.sendall(writeBuffer)
         
         return writeBuffer
 
     def _writeToUE9TCPHandle(self, writeBuffer, modbus):
-        packFormat = "B" * len(writeBuffer)
-        tempString = pack(packFormat, *writeBuffer)
-        
         if modbus is True:
             if self.handle.modbus is None:
                 raise LabJackException("Modbus port is not available.  Please upgrade to UE9 Comm firmware 1.43 or higher.")
-            self.handle.modbus.send(tempString)
+            self.handle.modbus.sendall(writeBuffer)
         else:
-            self.handle.data.send(tempString)
+            self.handle.data.sendall(writeBuffer)
         
         return writeBuffer
 
     def _writeToExodriver(self, writeBuffer, modbus):
         if modbus is True and self.modbusPrependZeros:
-            writeBuffer = [ 0, 0 ] + writeBuffer
+            writeBuffer = bytearray(2) + writeBuffer
         
-        newA = (ctypes.c_byte*len(writeBuffer))(0) 
-        for i in range(len(writeBuffer)):
-            newA[i] = ctypes.c_byte(writeBuffer[i])
-        
-        writeBytes = staticLib.LJUSB_Write(self.handle, ctypes.byref(newA), len(writeBuffer))
+        # The Exodriver reads straight from the bytearray's memory.
+        cBuffer = (ctypes.c_char*len(writeBuffer)).from_buffer(writeBuffer)
+        writeBytes = staticLib.LJUSB_Write(self.handle, cBuffer, len(writeBuffer))
+        del cBuffer
         
         if writeBytes != len(writeBuffer):
             raise LabJackException( "Could only write %s of %s bytes." % (writeBytes, len(writeBuffer) ) )
@@ -261,6 +373,10 @@ class Device(object):
         return writeBuffer
 
     def _writeToUDDriver(self, writeBuffer, modbus):
+        # The module __getattr__ only resolves attributes used from
+        # outside, so the UD functions are imported where they're used.
+        from LabJackUD import eGetRaw
+
         if modbus is True and self.devType == 9:
             dataWords = len(writeBuffer)
             writeBuffer = [0, 0xF8, 0, 0x07, 0, 0] + writeBuffer  # Modbus low-level function
@@ -292,99 +408,131 @@ class Device(object):
             else:
                 print(msg)
 
+    def _traceEvent(self, channel, direction, data):
+        """
+        Records data sent or received in self.trace, and prints it if
+        self.debug is set. Only called when one of them is, so nothing is
+        formatted when both are off.
+        """
+        if self.trace is not None:
+            self.trace.record(channel, direction, self.handle, data)
+        if self.debug and channel != ProtocolTrace.STREAM:
+            self._debugprint(("Sent: " if direction == ProtocolTrace.SENT else "Response: ") + hexWithoutQuotes(bytearray(data)))
+
     def write(self, writeBuffer, modbus = False, checksum = True):
         """write([writeBuffer], modbus = False)
 
         Writes the data contained in writeBuffer to the device.  writeBuffer must be a list of 
         byte values.
         """
-        if self.handle is None:
-            raise LabJackException("The device handle is None.")
-
         if checksum:
             setChecksum(writeBuffer)
 
+        self._writeBytes(bytearray(writeBuffer), modbus)
+
+    def _writeBytes(self, writeBuffer, modbus = False):
+        """
+        Writes writeBuffer, a bytearray, to the device as it is. No
+        checksums are set. write() is a list based wrapper of this.
+        """
+        if self.handle is None:
+            raise LabJackException("The device handle is None.")
+
         if isinstance(self.handle, LJSocketHandle):
             wb = self._writeToLJSocketHandle(writeBuffer, modbus)
         elif isinstance(self.handle, UE9TCPHandle):
             wb = self._writeToUE9TCPHandle(writeBuffer, modbus)
+        elif isinstance(self.handle, EmulatedHandle):
+            self.handle.write(bytes(writeBuffer), modbus)
+            wb = writeBuffer
         else:
             if _os_name == 'posix':
                 wb = self._writeToExodriver(writeBuffer, modbus)
             elif _os_name == 'nt':
-                wb = self._writeToUDDriver(writeBuffer, modbus)
-        
-        self._debugprint("Sent: " + hexWithoutQuotes(wb))
+                wb = self._writeToUDDriver(list(writeBuffer), modbus)
+
+        if self.metrics is not None:
+            self.metrics.sent(DeviceMetrics.MODBUS if modbus else DeviceMetrics.COMMAND, len(writeBuffer))
+
+        if self.trace is not None or self.debug:
+            self._traceEvent(ProtocolTrace.MODBUS if modbus else ProtocolTrace.COMMAND, ProtocolTrace.SENT, wb)
 
     def read(self, numBytes, stream = False, modbus = False):
         """read(numBytes, stream = False, modbus = False)
 
         Blocking read until a packet is received. Returns a list of
-        byte values when modbus is False. When modbus is true, returns
-        a string in Python 2.x, or a bytes object in Python 3+.
+        byte values. When stream is True, returns a string in Python
+        2.x, or a bytes object in Python 3+.
+        """
+        result = self._readBytes(numBytes, stream, modbus)
+        if stream:
+            return result
+        return list(bytearray(result))
+
+    def _readBytes(self, numBytes, stream = False, modbus = False):
+        """
+        Blocking read until a packet is received. Returns the bytes read as
+        a string in Python 2.x, or a bytes object in Python 3+. read() is a
+        list based wrapper of this.
         """
         if self.handle is None:
             raise LabJackException("The device handle is None.")
 
-        result = []
         if isinstance(self.handle, LJSocketHandle):
             result = self._readFromLJSocketHandle(numBytes, modbus, stream)
         elif isinstance(self.handle, UE9TCPHandle):
             result = self._readFromUE9TCPHandle(numBytes, stream, modbus)
+        elif isinstance(self.handle, EmulatedHandle):
+            if stream:
+                result = self.handle.streamRead(numBytes, 1.5)
+            else:
+                result = self.handle.read(numBytes, modbus)
+        elif _os_name == 'posix':
+            result = self._readFromExodriver(numBytes, stream, modbus)
+        elif _os_name == 'nt':
+            result = bytes(bytearray(self._readFromUDDriver(numBytes, stream, modbus)))
         else:
-            if _os_name == 'posix':
-                result = self._readFromExodriver(numBytes, stream, modbus)
-            elif _os_name == 'nt':
-                result = self._readFromUDDriver(numBytes, stream, modbus)
+            result = bytes()
 
+        if self.metrics is not None:
+            self.metrics.received(DeviceMetrics.STREAM if stream else (DeviceMetrics.MODBUS if modbus else DeviceMetrics.COMMAND), len(result))
+        if self.trace is not None or self.debug:
+            self._traceEvent(ProtocolTrace.STREAM if stream else (ProtocolTrace.MODBUS if modbus else ProtocolTrace.COMMAND), ProtocolTrace.RECEIVED, result)
         return result
 
     def _readFromLJSocketHandle(self, numBytes, modbus, spont = False):
         """
-        Reads from LJSocket. Returns the result as a list.
+        Reads from LJSocket. Returns the result as bytes.
         """
         if modbus:
-            rcvString = self.handle.modbusSocket.recv(numBytes)
+            return self.handle.modbusSocket.recv(numBytes)
         elif spont:
-            rcvString = self.handle.spontSocket.recv(numBytes)
+            return self.handle.spontSocket.recv(numBytes)
         else:
-            rcvString = self.handle.crSocket.recv(numBytes)
-        readBytes = len(rcvString)
-        packFormat = "B" * readBytes
-        rcvDataBuff = unpack(packFormat, rcvString)
-        return list(rcvDataBuff)
+            return self.handle.crSocket.recv(numBytes)
 
     def _readFromUE9TCPHandle(self, numBytes, stream, modbus):
         if stream is True:
-            rcvString = self.handle.stream.recv(numBytes)
-            return rcvString
+            return self.handle.stream.recv(numBytes)
+        elif modbus is True:
+            if self.handle.modbus is None:
+                raise LabJackException("Modbus port is not available.  Please upgrade to UE9 Comm firmware 1.43 or higher.")
+            return self.handle.modbus.recv(numBytes)
         else:
-            if modbus is True:
-                if self.handle.modbus is None:
-                    raise LabJackException("Modbus port is not available.  Please upgrade to UE9 Comm firmware 1.43 or higher.")
-                rcvString = self.handle.modbus.recv(numBytes)
-            else:
-                rcvString = self.handle.data.recv(numBytes)
-        readBytes = len(rcvString)
-        packFormat = "B" * readBytes
-        rcvDataBuff = unpack(packFormat, rcvString)
-        return list(rcvDataBuff)
+            return self.handle.data.recv(numBytes)
 
     def _readFromExodriver(self, numBytes, stream, modbus):
-        newA = (ctypes.c_byte*numBytes)()
+        newA = ctypes.create_string_buffer(numBytes)
         
         if stream:
-            readBytes = staticLib.LJUSB_StreamTO(self.handle, ctypes.byref(newA), numBytes, 1500)
-            if readBytes == 0:
-                return ''
-            # return the byte string in stream mode
-            return pack('b' * readBytes, *newA)
+            readBytes = staticLib.LJUSB_StreamTO(self.handle, newA, numBytes, 1500)
         else:
-            readBytes = staticLib.LJUSB_Read(self.handle, ctypes.byref(newA), numBytes)
-            # return a list of integers in command/response mode
-            return [(newA[i] & 0xff) for i in range(readBytes)]
+            readBytes = staticLib.LJUSB_Read(self.handle, newA, numBytes)
+        return ctypes.string_at(newA, readBytes)
 
     def _readFromUDDriver(self, numBytes, stream, modbus):
+        from LabJackUD import eGetRaw
+
         if modbus is True and self.devType == 9:
             tempBuff = [0] * (8 + numBytes + numBytes%2)
             eGetBuff = list()
@@ -408,6 +556,60 @@ class Device(object):
             return eGetRaw(self.handle, LJ_ioRAW_IN, 1, numBytes, tempBuff)[1]
         return eGetRaw(self.handle, LJ_ioRAW_IN, 0, numBytes, tempBuff)[1]
 
+    def streamDataInto(self, buffer, numBytes = None):
+        """
+        Name: Device.streamDataInto(buffer, numBytes = None)
+        Args: buffer, a writable buffer such as a bytearray or a buffer from
+                      a StreamBufferPool
+              numBytes, the number of bytes to read. Defaults to len(buffer).
+        Desc: Reads raw stream data directly into buffer. Over USB on
+              Linux/Mac the Exodriver writes straight into the buffer, and
+              over TCP the socket receives into it, so no new objects are
+              allocated and nothing is copied. Returns a memoryview of the
+              bytes read, which is empty if the read timed out.
+
+        >>> buf = bytearray(d.packetsPerRequest * 64)
+        >>> data = d.streamDataInto(buf)
+        >>> d.processStreamData(data)
+        """
+        if self.handle is None:
+            raise LabJackException("The device handle is None.")
+
+        if numBytes is None:
+            numBytes = len(buffer)
+
+        if isinstance(self.handle, LJSocketHandle):
+            readBytes = self.handle.spontSocket.recv_into(buffer, numBytes)
+        elif isinstance(self.handle, UE9TCPHandle):
+            readBytes = self.handle.stream.recv_into(buffer, numBytes)
+        elif isinstance(self.handle, EmulatedHandle):
+            data = self.handle.streamRead(numBytes, 1.5)
+            readBytes = len(data)
+            buffer[:readBytes] = data
+        elif _os_name == 'posix':
+            cBuffer = (ctypes.c_char * numBytes).from_buffer(buffer)
+            readBytes = staticLib.LJUSB_StreamTO(self.handle, cBuffer, numBytes, 1500)
+            del cBuffer
+        else:
+            # The UD driver returns a list, so it has to be copied.
+            data = self._readFromUDDriver(numBytes, True, False)
+            readBytes = len(data)
+            buffer[:readBytes] = bytearray(data)
+
+        if self.metrics is not None or self.trace is not None:
+            self._streamReceived(buffer, readBytes)
+        return memoryview(buffer)[:readBytes]
+
+    def _streamReceived(self, buffer, numBytes):
+        """
+        Records stream data read into buffer, its first numBytes, in the
+        metrics and the trace.
+        """
+        if self.metrics is not None:
+            self.metrics.received(DeviceMetrics.STREAM, numBytes)
+        if self.trace is not None:
+            self.trace.record(ProtocolTrace.STREAM, ProtocolTrace.RECEIVED, self.handle, memoryview(buffer)[:numBytes])
+
     def readRegister(self, addr, numReg = None, format = None, unitId = None):
         """Reads a specific register from the device and returns the value.
         Requires Modbus.py
@@ -535,14 +737,10 @@ class Device(object):
         with self.deviceLock:
             self.write(request, modbus = True, checksum = False)
             try:
-                result = self.read(numBytes, modbus = True)
-                self._debugprint("Response: " + hexWithoutQuotes(result))
-                return result
+                return self.read(numBytes, modbus = True)
             except LabJackException:
                 self.write(request, modbus = True, checksum = False)
-                result = self.read(numBytes, modbus = True)
-                self._debugprint("Response: " + hexWithoutQuotes(result))
-                return result
+                return self.read(numBytes, modbus = True)
 
     def _checkCommandBytes(self, results, commandBytes):
         """
@@ -553,7 +751,7 @@ class Device(object):
             raise LabJackException("Communication Failure: Low-level response has no bytes. %s" % _troubleshoot_comm_msg)
         elif results[0] == 0xB8 and results[1] == 0xB8:
             raise LabJackException("Low-level command with bad checksum detected. Verify the low-level command's checksums are valid.")
-        elif results[1:(size+1)] != commandBytes:
+        elif bytearray(results[1:(size+1)]) != bytearray(commandBytes):
             raise LabJackException("Communication Failure: Low-level response has incorrect command bytes.\nExpected: %s\nReceived: %s\nFull packet: %s\n%s" % (hexWithoutQuotes(commandBytes), hexWithoutQuotes(results[1:(size+1)]), hexWithoutQuotes(results), _troubleshoot_comm_msg))
         elif not verifyChecksum(results):
             raise LabJackException("Communication Failure: Low-level response has incorrect checksum. %s" % _troubleshoot_comm_msg)
@@ -564,16 +762,163 @@ class Device(object):
     
         # Acquire the device lock.
         with self.deviceLock:
+            metrics = self.metrics
+            if metrics is not None:
+                start = _monotonic()
             self.write(command, checksum = checksum)
             
             result = self.read(readLen, stream=False)
-            self._debugprint("Response: " + hexWithoutQuotes(result))
+            if metrics is not None:
+                metrics.commandDone(command, _monotonic() - start)
             if checkBytes:
                 self._checkCommandBytes(result, commandBytes)
                         
             return result
-    
-    
+
+    def _writeReadBytes(self, command, readLen, commandBytes, checkBytes = True, checksum = True):
+        """
+        Like _writeRead, but command is a bytearray and the response is
+        returned as a bytearray, without converting either to or from a
+        list.
+        """
+        with self.deviceLock:
+            metrics = self.metrics
+            if metrics is not None:
+                start = _monotonic()
+            if checksum:
+                setChecksum(command)
+            self._writeBytes(command)
+
+            result = bytearray(self._readBytes(readLen))
+            if metrics is not None:
+                metrics.commandDone(command, _monotonic() - start)
+            if checkBytes:
+                self._checkCommandBytes(result, commandBytes)
+
+            return result
+
+    def _commandSocket(self):
+        """
+        Returns the socket low-level commands and their responses go over,
+        or None if the connection isn't a socket.
+        """
+        if isinstance(self.handle, LJSocketHandle):
+            return self.handle.crSocket
+        elif isinstance(self.handle, UE9TCPHandle):
+            return self.handle.data
+        return None
+
+    def enableMetrics(self, callback = None, interval = METRICS_EXPORT_INTERVAL):
+        """
+        Name: Device.enableMetrics(callback = None,
+                                   interval = METRICS_EXPORT_INTERVAL)
+        Args: callback, a function called with a metrics snapshot at most
+                        every interval seconds
+              interval, the seconds between calls of callback
+        Desc: Starts recording command latencies by command type, the bytes
+              and packets sent and received, and stream block read, decode
+              and inter-arrival times, errors, missed scans and backlog.
+              Returns the DeviceMetrics they are recorded in, which is also
+              self.metrics. Metrics are off by default.
+
+        >>> d.enableMetrics()
+        >>> d.getFeedback(u6.AIN24(0))
+        >>> d.metrics.snapshot()['commands']['0xF8/0x00']['mean']
+        0.00052
+        """
+        if isinstance(self.handle, LJSocketHandle):
+            transport = "LJSocket"
+        elif isinstance(self.handle, UE9TCPHandle):
+            transport = "UE9TCP"
+        elif isinstance(self.handle, EmulatedHandle):
+            transport = type(self.handle).__name__
+        elif _os_name == 'nt':
+            transport = "UD"
+        else:
+            transport = "Exodriver"
+        self.metrics = DeviceMetrics(transport, callback, interval)
+        return self.metrics
+
+    def disableMetrics(self):
+        """
+        Name: Device.disableMetrics()
+        Args: None
+        Desc: Stops recording metrics and returns their last snapshot, or
+              None if they weren't on.
+        """
+        metrics = self.metrics
+        self.metrics = None
+        if metrics is None:
+            return None
+        return metrics.snapshot()
+
+    def enableTrace(self, maxEvents = TRACE_BUFFER_EVENTS, streamBytes = TRACE_STREAM_BYTES):
+        """
+        Name: Device.enableTrace(maxEvents = TRACE_BUFFER_EVENTS,
+                                 streamBytes = TRACE_STREAM_BYTES)
+        Args: maxEvents, the most events kept. The oldest are dropped.
+              streamBytes, the bytes kept of each stream read
+        Desc: Starts recording every command, Modbus request, response and
+              stream read in a ProtocolTrace, which is returned and is also
+              self.trace. Events are kept as bytes and formatted only when
+              the trace is dumped, so it can be left on. Tracing is off by
+              default. Setting debug still prints commands and responses as
+              they happen, with or without a trace.
+
+        >>> d.enableTrace()
+        >>> d.getFeedback(u6.AIN24(0))
+        >>> d.trace.dump()
+        """
+        self.trace = ProtocolTrace(maxEvents, streamBytes)
+        return self.trace
+
+    def disableTrace(self):
+        """
+        Name: Device.disableTrace()
+        Args: None
+        Desc: Stops tracing and returns the ProtocolTrace, or None if
+              tracing wasn't on.
+        """
+        trace = self.trace
+        self.trace = None
+        return trace
+
+    def commandPipeline(self, window = PIPELINE_WINDOW):
+        """
+        Name: Device.commandPipeline(window = PIPELINE_WINDOW)
+        Args: window, the most commands sent before their responses are read
+        Desc: Returns a CommandPipeline for sending low-level commands
+              without waiting for each response. Use it in a with
+              statement.
+
+        >>> with d.commandPipeline() as pipeline:
+        ...     futures = [pipeline.submit(command, readLen, [0xF8]) for command in commands]
+        >>> responses = [future.result() for future in futures]
+        """
+        return CommandPipeline(self, window)
+
+    def writeReadMany(self, commands, window = PIPELINE_WINDOW, checkBytes = True, checksum = True):
+        """
+        Name: Device.writeReadMany(commands, window = PIPELINE_WINDOW,
+                                   checkBytes = True, checksum = True)
+        Args: commands, a list of (command, readLen, commandBytes) tuples.
+                        command is the low-level command, readLen the exact
+                        length of its response, and commandBytes the bytes
+                        the response must echo after the checksum.
+              window, the most commands sent before their responses are read
+              checkBytes, check the checksums, command and error bytes of
+                          each response
+              checksum, set the checksums of each command
+        Desc: Sends low-level commands and returns their responses as a list
+              of bytearrays, in order. Over UE9 Ethernet and LJSocket up to
+              window commands are sent ahead, so the network round trips
+              overlap. Over USB they are sent one at a time. Every response
+              is read before the first error is raised.
+        """
+        with self.commandPipeline(window) as pipeline:
+            futures = [pipeline.submit(command, readLen, commandBytes, checkBytes, checksum) for command, readLen, commandBytes in commands]
+        return [future.result() for future in futures]
+
     def ping(self):
         try:
             if self.devType == LJ_dtUE9:
@@ -671,9 +1016,9 @@ class Device(object):
 
         For Windows, Linux, and Mac
         """
-        if isinstance(self.handle, UE9TCPHandle) or isinstance(self.handle, LJSocketHandle):
+        if isinstance(self.handle, (UE9TCPHandle, LJSocketHandle, EmulatedHandle)):
             self.handle.close()
-        elif _os_name == 'posix':
+        elif _os_name == 'posix' and self.handle is not None:
             staticLib.LJUSB_CloseDevice(self.handle)
 
         self.handle = None
@@ -754,6 +1099,312 @@ class Device(object):
         for i in range(0, len(l), BYTES_PER_PACKET):
             yield l[i:i+BYTES_PER_PACKET]
 
+    def _streamSampleConverter(self, channelIndex):
+        """
+        Returns a function that takes a NumPy array of 16-bit stream samples
+        from the analog channel at channelIndex of the stream channel list and
+        returns the calibrated values, or None to leave the samples as binary.
+        Device classes override this to plug their calibrations into
+        _decodeStreamData, usually through _calibrationTableConverter.
+        """
+        return None
+
+    def _calibrationTableConverter(self, key, convert):
+        """
+        Returns a function that calibrates a NumPy array of 16-bit samples by
+        looking them up in a 65536 entry table of convert's result for every
+        code. Tables are built the first time a key is used and cached, up
+        to calibrationTableCacheSize tables, dropping the least recently
+        used. The key must include the calibration constants convert uses.
+
+        If blocks of stream data need more tables than the cache holds, keys
+        that aren't cached are converted with convert directly instead,
+        since building tables that are dropped again before the next block
+        would be slower than not using tables at all.
+        """
+        numpy = _numpy()
+        self._calibrationTableKeys.add(key)
+        table = self._calibrationTables.pop(key, None)
+        if table is None:
+            if max(len(self._calibrationTableKeys), self._calibrationTableLastKeys) > max(self.calibrationTableCacheSize, 1):
+                return lambda values: numpy.asarray(convert(values), dtype = numpy.float64)
+            table = numpy.asarray(convert(numpy.arange(65536, dtype = numpy.uint16)), dtype = numpy.float64)
+        self._calibrationTables[key] = table
+
+        while len(self._calibrationTables) > max(self.calibrationTableCacheSize, 1):
+            self._calibrationTables.popitem(last = False)
+
+        return table.take
+
+    def calibrationTableCacheInfo(self):
+        """
+        Name: Device.calibrationTableCacheInfo()
+        Args: None
+        Desc: Returns a dictionary describing the cache of calibration lookup
+              tables used to convert stream data:
+              * tables: The number of tables in the cache.
+              * bytes: The memory used by the tables.
+              * maxTables: The most tables kept, calibrationTableCacheSize.
+              * keys: The number of tables the last block of stream data
+                      used. Those past maxTables were converted without a
+                      table.
+        """
+        return dict(tables = len(self._calibrationTables), bytes = sum([table.nbytes for table in self._calibrationTables.values()]), maxTables = self.calibrationTableCacheSize, keys = len(self._calibrationTableKeys))
+
+    def clearCalibrationTables(self):
+        """
+        Name: Device.clearCalibrationTables()
+        Args: None
+        Desc: Empties the cache of calibration lookup tables. Called when new
+              calibration constants are read.
+        """
+        self._calibrationTables.clear()
+
+    def _loadCalibrationCache(self, readFirstBlock):
+        """
+        Looks up this device's calibration constants in the cache set with
+        setCalibrationCacheDir. readFirstBlock is a function that reads the
+        first calibration block, called to check the cache is still right.
+        Returns (fingerprint, calibration, firstBlock), where calibration is
+        None if the cache is off or doesn't match, and firstBlock is what
+        readFirstBlock returned, or None if it wasn't called. Pass
+        fingerprint to _saveCalibrationCache after reading the constants
+        from the device, and use firstBlock instead of reading it again.
+        """
+        if _calibrationCacheDir is None or not self.serialNumber:
+            return None, None, None
+
+        fingerprint = dict(firmwareVersion = str(getattr(self, 'firmwareVersion', None)))
+        firstBlock = None
+        if _calibrationCacheVerify:
+            firstBlock = readFirstBlock()
+            fingerprint['firstBlock'] = "".join(["%02x" % b for b in bytearray(firstBlock)])
+
+        try:
+            with open(self._calibrationCacheFile()) as f:
+                saved = json.load(f)
+        except (IOError, OSError, ValueError):
+            return fingerprint, None, firstBlock
+
+        if not isinstance(saved, dict) or not isinstance(saved.get('fingerprint'), dict):
+            return fingerprint, None, firstBlock
+        for key, value in fingerprint.items():
+            if saved['fingerprint'].get(key) != value:
+                return fingerprint, None, firstBlock
+        return fingerprint, saved.get('calibration'), firstBlock
+
+    def _saveCalibrationCache(self, fingerprint, calibration):
+        """
+        Saves calibration constants read from the device in the cache, if
+        fingerprint from _loadCalibrationCache isn't None.
+        """
+        if fingerprint is None or _calibrationCacheDir is None:
+            return
+        try:
+            if not os.path.isdir(_calibrationCacheDir):
+                os.makedirs(_calibrationCacheDir)
+            _writeFileAtomically(self._calibrationCacheFile(), json.dumps(dict(fingerprint = fingerprint, calibration = calibration)))
+        except (IOError, OSError):
+            # Not being able to cache the constants is only slower.
+            pass
+
+    def _calibrationCacheFile(self):
+        return os.path.join(_calibrationCacheDir, "%s-%s.json" % (self.devType, self.serialNumber))
+
+    def _decodeStreamData(self, result, numBytes, asArrays = False, trailerBytes = 0):
+        """
+        Decodes a block of stream data in bulk with NumPy. Headers and footers
+        are stripped with a strided view of the block, the samples are split
+        into channels by slicing with the streamPacketOffset, and each analog
+        channel is calibrated with the function returned by
+        _streamSampleConverter.
+
+        Returns the same dictionary as processStreamData. If asArrays is True
+        the values are NumPy arrays instead of lists: float64 for analog
+        channels, uint16 for timers and counters, and an Nx2 uint8 array for
+        the digital port channels 193 and 194.
+        """
+        numpy = _numpy()
+        samples = unpackStreamSamples(result, numBytes, trailerBytes)
+        numChannels = len(self.streamChannelNumbers)
+        self._calibrationTableLastKeys = len(self._calibrationTableKeys)
+        self._calibrationTableKeys = set()
+
+        if self.streamPacketOffset >= numChannels:
+            self.streamPacketOffset = 0
+
+        # Channel number -> list of arrays in sample order. More than one
+        # array means the channel is in the scan list more than once.
+        channelParts = collections.OrderedDict()
+        for i in range(min(len(samples), numChannels)):
+            channelIndex = (self.streamPacketOffset + i) % numChannels
+            channelNumber = self.streamChannelNumbers[channelIndex]
+            values = samples[i::numChannels]
+
+            if channelNumber in (193, 194):
+                values = numpy.ascontiguousarray(values).view(numpy.uint8).reshape(-1, 2)
+            elif channelNumber < 200:
+                convert = self._streamSampleConverter(channelIndex)
+                if convert is not None:
+                    values = convert(values)
+
+            channelParts.setdefault(channelNumber, []).append(values)
+
+        returnDict = collections.defaultdict(list)
+        for channelNumber, parts in channelParts.items():
+            if len(parts) == 1:
+                values = parts[0]
+            else:
+                # Interleave a duplicate channel's data into one array.
+                total = sum([len(part) for part in parts])
+                values = numpy.empty((total,) + parts[0].shape[1:], dtype = parts[0].dtype)
+                for j, part in enumerate(parts):
+                    values[j::len(parts)] = part
+
+            if not asArrays:
+                if channelNumber in (193, 194):
+                    values = [tuple(v) for v in values.tolist()]
+                else:
+                    values = values.tolist()
+
+            returnDict["AIN%s" % channelNumber] = values
+
+        self.streamPacketOffset = (self.streamPacketOffset + len(samples)) % numChannels
+        return returnDict
+
+    # Attributes saved by streamConfigSnapshot. Device classes add the
+    # stream settings and calibration their processStreamData uses.
+    _streamSnapshotAttributes = ('streamSamplesPerPacket', 'streamChannelNumbers', 'packetsPerRequest', 'streamPacketOffset')
+
+    def _streamPacketBytes(self):
+        """
+        Returns the size in bytes of one stream packet in the data returned
+        by streamData.
+        """
+        return 14 + (self.streamSamplesPerPacket * 2)
+
+    def streamConfigSnapshot(self):
+        """
+        Name: Device.streamConfigSnapshot()
+        Args: None
+        Desc: Returns a dictionary with everything processStreamData needs to
+              convert this device's stream data: the stream configuration
+              and the calibration constants. It only holds lists,
+              dictionaries, strings and numbers, so it can be pickled or
+              saved as JSON. Use deviceFromStreamConfigSnapshot to make an
+              unopened device that converts stream data like this one.
+        Note: You must call streamConfig() and getCalibrationData() before
+              calling this function.
+        """
+        if not self.streamConfiged:
+            raise LabJackException("Stream must be configured before taking a snapshot of its configuration.")
+
+        attributes = dict()
+        for name in self._streamSnapshotAttributes:
+            if not hasattr(self, name):
+                continue
+            value = getattr(self, name)
+            if hasattr(value, '__dict__'):
+                # Calibration objects, like the U6's CalibrationInfo.
+                value = dict(value.__dict__)
+            attributes[name] = value
+
+        return dict(module = self.__class__.__module__, className = self.__class__.__name__, attributes = attributes)
+
+    def loadStreamConfigSnapshot(self, snapshot):
+        """
+        Name: Device.loadStreamConfigSnapshot(snapshot)
+        Args: snapshot, a dictionary from streamConfigSnapshot()
+        Desc: Sets this device's stream configuration and calibration
+              constants from a snapshot, so processStreamData converts data
+              the same way as on the device the snapshot was taken from.
+              Nothing is sent to the device.
+        """
+        for name, value in snapshot['attributes'].items():
+            current = getattr(self, name, None)
+            if hasattr(current, '__dict__') and isinstance(value, dict):
+                current.__dict__.update(value)
+            else:
+                setattr(self, name, value)
+
+        self.clearCalibrationTables()
+        if hasattr(self, 'streamChannelNumbers'):
+            self.streamChannelDuplicates = collections.Counter({key:cnt for key, cnt in collections.Counter(self.streamChannelNumbers).items() if cnt > 1})
+        self.streamConfiged = True
+
+    def _streamTrailerBytes(self):
+        """
+        Returns the number of extra bytes after the footer of each stream
+        packet.
+        """
+        return 0
+
+    def _streamBlockInfo(self, result, numBytes):
+        """
+        Parses the packet headers of a block of stream data and returns the
+        block's errors, missed, firstPacket, packetGaps, droppedPackets and
+        backlog values for streamData, and badChecksums if
+        verifyStreamChecksums is set. The PacketCounter is followed from
+        block to block, so a gap between blocks is found too.
+        """
+        numpy = _numpy()
+        trailerBytes = self._streamTrailerBytes()
+        headers = parseStreamPacketHeaders(result, numBytes, trailerBytes)
+        errorCodes = headers['errors']
+        counters = headers['packetCounters']
+        numPackets = len(counters)
+        if numPackets == 0:
+            info = dict(errors = 0, missed = 0, firstPacket = None, packetGaps = [], droppedPackets = 0, backlog = 0)
+            if self.verifyStreamChecksums:
+                info['badChecksums'] = []
+            return info
+
+        # A packet's PacketCounter should be one more than the last one's,
+        # wrapping at 255. packetGaps has the index of every packet that
+        # doesn't follow on.
+        last = self._streamLastPacketCounter
+        if numpy is not None:
+            previous = numpy.empty(numPackets, dtype = numpy.int64)
+            previous[0] = (int(counters[0]) - 1) if last is None else last
+            previous[1:] = counters[:-1]
+            steps = (counters.astype(numpy.int64) - previous) % 256
+            gaps = numpy.nonzero(steps != 1)[0]
+            droppedPackets = int(((steps[gaps] - 1) % 256).sum())
+            packetGaps = gaps.tolist()
+
+            errors = int(numpy.count_nonzero(errorCodes))
+            missed = int(headers['missed'].sum())
+            backlog = int(headers['backlog'].max())
+            unexpected = errorCodes[(errorCodes != 0) & (errorCodes != 59) & (errorCodes != 60)].tolist()
+        else:
+            packetGaps = []
+            droppedPackets = 0
+            previous = (counters[0] - 1) if last is None else last
+            for i, counter in enumerate(counters):
+                step = (counter - previous) % 256
+                if step != 1:
+                    packetGaps.append(i)
+                    droppedPackets += (step - 1) % 256
+                previous = counter
+
+            errors = len([e for e in errorCodes if e != 0])
+            missed = sum(headers['missed'])
+            backlog = max(headers['backlog'])
+            unexpected = [e for e in errorCodes if e not in (0, 59, 60)]
+
+        for e in unexpected:
+            self._debugprint(e)
+
+        self._streamLastPacketCounter = int(counters[-1])
+        info = dict(errors = errors, missed = missed, firstPacket = int(counters[0]), packetGaps = packetGaps, droppedPackets = droppedPackets, backlog = backlog)
+        if self.verifyStreamChecksums:
+            valid = LabJackChecksum.verifyStreamPackets(result, numBytes, trailerBytes)
+            if not isinstance(valid, list):
+                info['badChecksums'] = numpy.nonzero(~valid)[0].tolist()
+            else:
+                info['badChecksums'] = [i for i, ok in enumerate(valid) if not ok]
+        return info
+
     def streamStart(self):
         """
         Name: Device.streamStart()
@@ -774,14 +1425,22 @@ class Device(object):
             raise LowlevelErrorException(results[2], "StreamStart returned an error:\n    %s" % lowlevelErrorToString(results[2]))
 
         self.streamPacketOffset = 0
+        self._streamLastPacketCounter = None
         self.streamStarted = True
 
-    def streamData(self, convert=True):
+    def streamData(self, convert=True, asArrays=False, bufferPool=None):
         """
-        Name: Device.streamData()
+        Name: Device.streamData(convert = True, asArrays = False,
+                                bufferPool = None)
         Args: convert, should the packets be converted as they are read.
                        set to False to get much faster speeds, but you will
                        have to process the results later.
+              asArrays, if True and convert is True, the AINi values are
+                        NumPy arrays instead of lists. Requires NumPy.
+              bufferPool, a StreamBufferPool to read the raw data into. The
+                          result is then a memoryview of one of the pool's
+                          buffers, which is reused after the pool has gone
+                          around once. Use it or copy it before then.
         Desc: Reads stream data from a LabJack device. See our stream example
               to get an idea of how this function should be called. The return
               value of streamData is a dictionary with the following keys:
@@ -791,6 +1450,15 @@ class Device(object):
               * missed: The number of readings that were missed because of
                         buffer overflow on the LabJack.
               * firstPacket: The PacketCounter value in the first USB packet.
+              * packetGaps: The indexes of the packets whose PacketCounter
+                            does not follow the packet before, including the
+                            last packet of the previous block.
+              * droppedPackets: The number of packets missing from the
+                                PacketCounter sequence.
+              * backlog: The largest backlog byte in this block.
+              * badChecksums: The indexes of the packets with bad
+                              checksums. Only there if
+                              verifyStreamChecksums is set to True.
               * result: The raw bytes returned from read(). The only way to get
                         data if called with convert = False. In Python 2 this
                         is a string, and in Python 3+ is a bytes object.
@@ -805,33 +1473,110 @@ class Device(object):
 
         numBytes = 14 + (self.streamSamplesPerPacket * 2)
         while True:
-            result = self.read(numBytes * self.packetsPerRequest, stream = True)
+            metrics = self.metrics
+            if metrics is not None:
+                start = _monotonic()
+            if bufferPool is not None:
+                result = self.streamDataInto(bufferPool.nextBuffer(numBytes * self.packetsPerRequest))
+            else:
+                result = self.read(numBytes * self.packetsPerRequest, stream = True)
 
             if len(result) == 0:
                 yield None
                 continue
 
+            if metrics is not None:
+                readDone = _monotonic()
             numPackets = len(result) // numBytes
 
-            errors = 0
-            missed = 0
-            firstPacket = streamByteToInt(result[10])
-            for i in range(numPackets):
-                e = streamByteToInt(result[11+(i*numBytes)])
-                if e != 0:
-                    errors += 1
-                    if e != 60 and e != 59:
-                        self._debugprint(e)
-                    if e == 60:
-                        missed += unpack('<I', result[6+(i*numBytes):10+(i*numBytes)])[0]
-
-            returnDict = dict(numPackets = numPackets, result = result, errors = errors, missed = missed, firstPacket = firstPacket)
+            returnDict = self._streamBlockInfo(result, numBytes)
+            returnDict.update(numPackets = numPackets, result = result)
 
             if convert:
-                returnDict.update(self.processStreamData(result, numBytes = numBytes))
+                returnDict.update(self.processStreamData(result, numBytes = numBytes, asArrays = asArrays))
 
+            if metrics is not None:
+                metrics.streamBlock(start, readDone, _monotonic(), returnDict)
             yield returnDict
 
+    def streamStartBackground(self, queueDepth = 16):
+        """
+        Name: Device.streamStartBackground(queueDepth = 16)
+        Args: queueDepth, the number of raw blocks that can wait to be
+                          consumed before new blocks are dropped
+        Desc: Starts streaming and a background thread that does nothing but
+              read raw stream data into a queue. Get the blocks with
+              streamReadBackground() and convert them with
+              processStreamData() in your own thread. Stop with
+              streamStopBackground().
+
+              The blocks are read into preallocated buffers and are not
+              copied, so process each block before getting the next one. If
+              the consumer falls behind and the queue is full, new blocks are
+              dropped and counted instead of letting the device's buffer
+              overflow. See streamBackgroundStats().
+        Note: You must call streamConfig() before calling this function.
+
+        >>> d.streamStartBackground()
+        >>> block = d.streamReadBackground()
+        >>> d.processStreamData(block['result'])
+        >>> d.streamStopBackground()
+        """
+        if self._streamReader is not None:
+            raise LabJackException("Background streaming is already running.")
+        if queueDepth < 1:
+            raise LabJackException("queueDepth must be at least 1.")
+
+        self.streamStart()
+        self._streamReader = _StreamReaderThread(self, queueDepth)
+        self._streamReader.start()
+
+    def streamReadBackground(self, timeout = None):
+        """
+        Name: Device.streamReadBackground(timeout = None)
+        Args: timeout, seconds to wait for a block. None waits forever.
+        Desc: Returns the next raw block read by the background thread, which
+              is the same dictionary streamData(convert = False) returns, or
+              None if the timeout passed. Raises the reader thread's
+              exception if it stopped because of an error.
+        """
+        if self._streamReader is None:
+            raise LabJackException("Background streaming has not been started.")
+        return self._streamReader.get(timeout)
+
+    def streamBackgroundStats(self):
+        """
+        Name: Device.streamBackgroundStats()
+        Args: None
+        Desc: Returns a dictionary of background stream statistics:
+              * blocks: The number of blocks read from the device.
+              * dropped: The number of blocks dropped because the queue was
+                         full.
+              * queued: The number of blocks waiting in the queue now.
+              * highWaterMark: The most blocks that have waited in the queue.
+              * queueDepth: The size of the queue.
+              * emptyReads: The number of reads that returned no data.
+        """
+        if self._streamReader is None:
+            raise LabJackException("Background streaming has not been started.")
+        return self._streamReader.stats()
+
+    def streamStopBackground(self):
+        """
+        Name: Device.streamStopBackground()
+        Args: None
+        Desc: Stops the background reader thread and stops streaming.
+              Returns the final streamBackgroundStats().
+        """
+        if self._streamReader is None:
+            raise LabJackException("Background streaming has not been started.")
+
+        reader = self._streamReader
+        reader.stop()
+        self._streamReader = None
+        self.streamStop()
+        return reader.stats()
+
     def streamStop(self):
         """
         Name: Device.streamStop()
@@ -1019,19 +1764,8 @@ def setChecksum(command):
     if len(command) < 6:
         raise LabJackException("Low-level command does not contain enough bytes.")
     
-    try:        
-        a = command[1]
-        
-        a = (a & 0x78) >> 3
-        
-        #Check if the command is an extended command
-        if a == 15:
-            command = setChecksum16(command)
-            command = setChecksum8(command, 6)
-            return command
-        else:
-            command = setChecksum8(command, len(command))
-            return command
+    try:
+        return LabJackChecksum.setChecksum(command)
     except LabJackException:
         e = sys.exc_info()[1]
         raise e
@@ -1043,57 +1777,30 @@ def setChecksum(command):
 
 def verifyChecksum(buffer):
     """Verifies the checksum of a given buffer using the traditional U3/UE9 Command Structure.
-    """
-    
-    buff0 = buffer[0]
-    buff4 = buffer[4]
-    buff5 = buffer[5]
 
-    tempBuffer = setChecksum(buffer)
-    
-    if (buff0 == tempBuffer[0]) and (buff4 == tempBuffer[4]) \
-    and (buff5 == tempBuffer[5]):
-        return True
+    buffer can be a list, bytes, bytearray or memoryview, and isn't changed.
+    """
+    if len(buffer) < 6:
+        raise LabJackException("Low-level command does not contain enough bytes.")
 
-    return False
+    return LabJackChecksum.verifyChecksum(buffer)
 
 # 1 = LJ_ctUSB
-def listAll(deviceType, connectionType = 1):
-    """listAll(deviceType, connectionType) -> [[local ID, Serial Number, IP Address], ...]
+def listAll(deviceType, connectionType = 1, errors = None):
+    """listAll(deviceType, connectionType, errors = None) -> [[local ID, Serial Number, IP Address], ...]
 
     Searches for all devices of a given type over a given connection
     type and returns a list of all devices found.
 
+    On Mac and Linux, USB devices are opened and queried at the same time.
+    A device that can't be opened is left out. If errors is a list, a
+    (devNumber, exception) tuple is appended to it for each of them.
+
     WORKS on WINDOWS, MAC, UNIX
     """
     if connectionType == LJ_ctLJSOCKET:
         ipAddress, port = deviceType.split(":")
-        port = int(port)
-
-        serverSocket = socket.socket()
-        serverSocket.connect((ipAddress, port))
-        serverSocket.settimeout(10)
-
-        f = serverSocket.makefile(bufsize = 0)
-        f.write("scan\r\n")
-
-        l = f.readline().strip()
-        try:
-            status, numLines = l.split(' ')
-        except ValueError:
-            raise Exception("Received invalid line from LJSocket server: %s" % l)
-
-        if status.lower().startswith('ok'):
-            lines = []
-            for i in range(int(numLines)):
-                l = f.readline().strip()
-                dev = parseline(l)
-                lines.append(dev)
-
-            f.close()
-            serverSocket.close()
-
-            return lines
+        return getLJSocketClient(ipAddress, port).scan()
 
     if deviceType == 12:
         if U12DriverPresent():
@@ -1156,11 +1863,11 @@ def listAll(deviceType, connectionType = 1):
 
     if _os_name == 'posix':
         if deviceType == LJ_dtUE9:
-            return __listAllUE9Unix(connectionType)
+            return __listAllUE9Unix(connectionType, errors)
         if deviceType == LJ_dtU3:
-            return __listAllU3Unix()
+            return __listAllU3Unix(errors)
         if deviceType == 6:
-            return __listAllU6Unix()
+            return __listAllU6Unix(errors)
 
 def isHandleValid(handle):
     if _os_name == 'nt':
@@ -1205,42 +1912,126 @@ def getDevCounts():
 
         return returnDict
 
-def openAllLabJacks():
+def openAllLabJacks(errors = None):
+    """
+    Opens every connected U3, U6 and UE9, configuring MAX_ENUMERATION_THREADS
+    of them at a time, and returns a list of the devices.
+
+    If errors is a list, a (device, exception) tuple is appended to it for
+    each device that couldn't be opened, and the rest are returned.
+    Otherwise the first error is raised, after closing the devices that
+    were opened.
+    """
     if _os_name == "nt":
         # Windows doesn't provide a nice way to open all the devices.
         devs = dict()
         devs[3] = listAll(3)
         devs[6] = listAll(6)
         devs[9] = listAll(9)
-        devices = list()
+        toOpen = list()
         for prodId, numConnected in devs.items():
-            for i, serial in enumerate(numConnected.keys()):
-                d = Device(None, devType = prodId)
-                d.open(prodId, serial = serial)
-                d = _makeDeviceFromHandle(d.handle, prodId)
-                devices.append(d)
+            for serial in numConnected.keys():
+                toOpen.append((prodId, serial))
+
+        def openOne(item):
+            prodId, serial = item
+            d = Device(None, devType = prodId)
+            d.open(prodId, serial = serial)
+            return _makeDeviceFromHandle(d.handle, prodId)
     else:
         maxHandles = 10
         devHandles = (ctypes.c_void_p*maxHandles)()
         devIds = (ctypes.c_uint*maxHandles)()
         n = ctypes.c_uint(maxHandles)
         numOpened = staticLib.LJUSB_OpenAllDevices(ctypes.byref(devHandles), ctypes.byref(devIds), n)
+        toOpen = [(int(devIds[i]), devHandles[i]) for i in range(numOpened)]
+
+        def openOne(item):
+            prodId, handle = item
+            return _makeDeviceFromHandle(handle, prodId)
+
+    results = _runConcurrently(openOne, toOpen)
+    return [d for item, d in _checkEnumerationResults(results, errors)]
+
+def _runConcurrently(function, items, maxThreads = None):
+    """
+    Calls function on each of items using at most maxThreads threads, which
+    defaults to MAX_ENUMERATION_THREADS. The driver calls release the GIL, so
+    opening devices this way takes about as long as the slowest device.
+    Returns a list of (item, result, exception) tuples in the order of
+    items, where exception is None if function returned.
+    """
+    if maxThreads is None:
+        maxThreads = MAX_ENUMERATION_THREADS
 
-        devices = list()
-        for i in range(numOpened):
-            devices.append(_makeDeviceFromHandle(devHandles[i], int(devIds[i])))
+    results = [None] * len(items)
+    todo = queue.Queue()
+    for i in range(len(items)):
+        todo.put(i)
+
+    def worker():
+        while True:
+            try:
+                i = todo.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                results[i] = (items[i], function(items[i]), None)
+            except Exception:
+                results[i] = (items[i], None, sys.exc_info()[1])
+
+    numThreads = min(maxThreads, len(items))
+    if numThreads <= 1:
+        worker()
+    else:
+        threads = [threading.Thread(target = worker) for i in range(numThreads)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        for thread in threads:
+            thread.join()
+    return results
+
+def _checkEnumerationResults(results, errors):
+    """
+    Returns the (item, device) pairs of results from _runConcurrently that
+    opened. The failures are appended to errors if it is a list. Otherwise
+    the opened devices are closed and the first failure is raised.
+    """
+    opened = [(item, d) for item, d, e in results if e is None]
+    failures = [(item, e) for item, d, e in results if e is not None]
+    if failures:
+        if errors is None:
+            for item, d in opened:
+                d.close()
+            raise failures[0][1]
+        errors.extend(failures)
+    return opened
+
+def _openAllDevices(deviceClass, deviceType, errors = None):
+    """
+    The openAllU3, openAllU6 and openAllUE9 functions. Opens every device of
+    deviceType with deviceClass at the same time, and returns a dictionary
+    of the devices by serial number.
+    """
+    devNumbers = list(range(1, deviceCount(deviceType) + 1))
+    results = _runConcurrently(lambda devNumber: deviceClass(firstFound = False, devNumber = devNumber), devNumbers)
+    opened = _checkEnumerationResults(results, errors)
+    _indexOpenedDevices(deviceType, opened)
 
-    return devices
+    returnDict = dict()
+    for devNumber, d in opened:
+        returnDict[str(d.serialNumber)] = d
+    return returnDict
 
 def _openLabJackUsingLJSocket(deviceType, firstFound, pAddress, LJSocket, handleOnly):
     if LJSocket is not None and LJSocket != '':
         ip, port = LJSocket.split(":")
-        port = int(port)
-        handle = LJSocketHandle(ip, port, deviceType, firstFound, pAddress)
+        client = getLJSocketClient(ip, port)
     else:
-        handle = LJSocketHandle('localhost', 6000, deviceType, firstFound, pAddress)
+        client = getLJSocketClient('localhost', 6000)
 
-    return handle
+    return client.openHandle(deviceType, firstFound, pAddress)
 
 def _openLabJackUsingUDDriver(deviceType, connectionType, firstFound, pAddress, devNumber):
     if devNumber is not None:
@@ -1274,21 +2065,181 @@ def _isOpenAccessError():
     else:
         return False
 
-def _openLabJackUsingExodriver(deviceType, firstFound, pAddress, devNumber):
-    devType = ctypes.c_ulong(deviceType)
-    openDev = staticLib.LJUSB_OpenDevice
-    openDev.restype = ctypes.c_void_p
+# The serial number, local ID and IP address of each Exodriver device
+# number seen when opening devices by serial number or local ID, by device
+# type. Each type's index is only used while the USB devices are the same.
+_deviceIndex = dict()
+_deviceIndexLock = threading.RLock()
+_deviceIndexFile = None
 
-    accessInfoPart = "is not already open in another or the current process"
-    accessInfoFull = "Device access or claim error. Please check that the device " + accessInfoPart + "."
-    info = None
+USB_VENDOR_ID = 0x0cd5
 
-    if devNumber is not None:
-        handle = openDev(devNumber, 0, devType)
-        if handle is None or handle <= 0:
-            if _isOpenAccessError():
-                info = accessInfoFull
-            raise NullHandleException(info)
+
+def setDeviceIndexFile(filename):
+    """
+    Name: setDeviceIndexFile(filename)
+    Args: filename, the file to keep the device index in, or None to keep it
+                    in memory only
+    Desc: Keeps the index of which Exodriver device number has which serial
+          number and local ID in a file, so opening a device by serial
+          number in a new process doesn't have to open every device first.
+          The index in the file is loaded now, and is only used while the
+          same devices are connected to the same USB ports.
+    """
+    global _deviceIndexFile
+    with _deviceIndexLock:
+        _deviceIndexFile = filename
+        _deviceIndex.clear()
+        if filename is None or not os.path.exists(filename):
+            return
+
+        try:
+            with open(filename) as f:
+                saved = json.load(f)
+            for deviceType, entry in saved.items():
+                devices = dict([(int(i), tuple(info)) for i, info in entry['devices'].items()])
+                _deviceIndex[int(deviceType)] = dict(topology = entry['topology'], devices = devices)
+        except (ValueError, KeyError, TypeError, IOError):
+            # A bad index file is only a missed shortcut.
+            _deviceIndex.clear()
+
+
+def clearDeviceIndex():
+    """
+    Name: clearDeviceIndex()
+    Args: None
+    Desc: Forgets the device index, so the next open by serial number or
+          local ID looks at every device.
+    """
+    with _deviceIndexLock:
+        _deviceIndex.clear()
+        _saveDeviceIndex()
+
+
+def _usbTopology(deviceType, numDevices):
+    """
+    Returns something that changes when devices of deviceType are plugged in
+    or out: the bus and device numbers from sysfs on Linux, which change on
+    every reconnect, and otherwise just the device count.
+    """
+    topology = []
+    try:
+        for name in os.listdir("/sys/bus/usb/devices"):
+            path = os.path.join("/sys/bus/usb/devices", name)
+            try:
+                with open(os.path.join(path, "idVendor")) as f:
+                    vendor = int(f.read(), 16)
+                with open(os.path.join(path, "idProduct")) as f:
+                    product = int(f.read(), 16)
+                if vendor != USB_VENDOR_ID or product != deviceType:
+                    continue
+                with open(os.path.join(path, "busnum")) as f:
+                    busnum = int(f.read())
+                with open(os.path.join(path, "devnum")) as f:
+                    devnum = int(f.read())
+            except (IOError, OSError, ValueError):
+                continue
+            topology.append([busnum, devnum])
+    except OSError:
+        pass
+
+    if len(topology) != numDevices:
+        return ["count", numDevices]
+    return sorted(topology)
+
+
+def _indexOpenedDevices(deviceType, opened):
+    """
+    Adds the devices opened by device number, a list of (devNumber, device)
+    pairs, to the device index.
+    """
+    if _os_name != 'posix' or not opened:
+        return
+    with _deviceIndexLock:
+        index = _deviceIndexFor(deviceType, staticLib.LJUSB_GetDevCount(deviceType))
+        for devNumber, device in opened:
+            index[devNumber] = (device.serialNumber, device.localId, device.ipAddress)
+        _saveDeviceIndex()
+
+
+def _deviceIndexFor(deviceType, numDevices):
+    topology = _usbTopology(deviceType, numDevices)
+    entry = _deviceIndex.get(deviceType)
+    if entry is None or entry['topology'] != topology:
+        entry = _deviceIndex[deviceType] = dict(topology = topology, devices = dict())
+    return entry['devices']
+
+
+def _saveDeviceIndex():
+    if _deviceIndexFile is None:
+        return
+
+    saved = dict()
+    for deviceType, entry in _deviceIndex.items():
+        devices = dict([(str(i), list(info)) for i, info in entry['devices'].items()])
+        saved[str(deviceType)] = dict(topology = entry['topology'], devices = devices)
+    try:
+        _writeFileAtomically(_deviceIndexFile, json.dumps(saved))
+    except (IOError, OSError):
+        # Like a bad index file, only a missed shortcut.
+        pass
+
+
+_calibrationCacheDir = None
+_calibrationCacheVerify = True
+
+
+def setCalibrationCacheDir(directory, verify = True):
+    """
+    Name: setCalibrationCacheDir(directory, verify = True)
+    Args: directory, where to keep the calibration constants of each device,
+                     or None to stop caching them
+          verify, if True, the first calibration block is read and the cache
+                  is only used if it hasn't changed. If False, the cache is
+                  used as long as the firmware version is the same, and no
+                  calibration blocks are read at all.
+    Desc: Caches the calibration constants getCalibrationData reads, in one
+          file per device named by product ID and serial number. The next
+          getCalibrationData call for the device, in any process, loads them
+          from the file instead of reading every calibration block. Files
+          are replaced atomically, so processes can share a directory.
+    """
+    global _calibrationCacheDir, _calibrationCacheVerify
+    _calibrationCacheDir = directory
+    _calibrationCacheVerify = verify
+
+
+def _writeFileAtomically(filename, data):
+    """
+    Writes data, a string, to a temporary file next to filename and then
+    renames it over filename, so readers never see a partial file.
+    """
+    tempName = "%s.%s.tmp" % (filename, os.getpid())
+    with open(tempName, "w") as f:
+        f.write(data)
+    try:
+        os.replace(tempName, filename)
+    except AttributeError:  # Python 2
+        if os.path.exists(filename) and os.name == 'nt':
+            os.remove(filename)
+        os.rename(tempName, filename)
+
+
+def _openLabJackUsingExodriver(deviceType, firstFound, pAddress, devNumber):
+    devType = ctypes.c_ulong(deviceType)
+    openDev = staticLib.LJUSB_OpenDevice
+    openDev.restype = ctypes.c_void_p
+
+    accessInfoPart = "is not already open in another or the current process"
+    accessInfoFull = "Device access or claim error. Please check that the device " + accessInfoPart + "."
+    info = None
+
+    if devNumber is not None:
+        handle = openDev(devNumber, 0, devType)
+        if handle is None or handle <= 0:
+            if _isOpenAccessError():
+                info = accessInfoFull
+            raise NullHandleException(info)
         return handle
     elif firstFound:
         handle = openDev(1, 0, devType)
@@ -1299,26 +2250,63 @@ def _openLabJackUsingExodriver(deviceType, firstFound, pAddress, devNumber):
         return handle
     else:
         numDevices = staticLib.LJUSB_GetDevCount(deviceType)
-
-        noAccessDetected = False
-        for i in range(numDevices):
-            handle = openDev(i + 1, 0, devType)
+        with _deviceIndexLock:
+            indexed = sorted(_deviceIndexFor(deviceType, numDevices).items())
+
+        # The devices opened here, by device number. Only they are updated
+        # in the index, so devices that weren't opened keep their entries.
+        # The devices are opened without holding _deviceIndexLock, which is
+        # only held to put the entries in.
+        verified = dict()
+        accessErrors = []
+
+        def openNumber(i):
+            handle = openDev(i, 0, devType)
             try:
                 if handle is None or handle <= 0:
                     if _isOpenAccessError():
-                        noAccessDetected = True
+                        accessErrors.append(i)
                     raise NullHandleException()
                 device = _makeDeviceFromHandle(handle, deviceType)
-            except:
+            except LabJackException:
+                return None
+            verified[i] = (device.serialNumber, device.localId, device.ipAddress)
+            return device
+
+        def updateIndex():
+            with _deviceIndexLock:
+                _deviceIndexFor(deviceType, numDevices).update(verified)
+                _saveDeviceIndex()
+
+        # Open only the device the index has for pAddress.
+        for i, info in indexed:
+            if pAddress in info:
+                device = openNumber(i)
+                if device is not None:
+                    if pAddress in (device.serialNumber, device.localId, device.ipAddress):
+                        updateIndex()
+                        return device
+                    device.close()
+                break
+
+        # A miss. Devices can have a new local ID or IP address, or another
+        # device's number, since they were indexed, so look at the others.
+        for i in range(1, numDevices + 1):
+            if i in verified:
+                continue
+            device = openNumber(i)
+            if device is None:
                 continue
 
             if device.localId == pAddress or device.serialNumber == pAddress or device.ipAddress == pAddress:
+                updateIndex()
                 return device
-            else:
-                device.close()
+            device.close()
+
+        updateIndex()
 
         info = "Please check that the device you are trying to open is connected"
-        if noAccessDetected:
+        if accessErrors:
             info += ", or " + accessInfoPart
         info += "."
         raise LabJackException(LJE_LABJACK_NOT_FOUND, "Couldn't open device. " + info)
@@ -1334,65 +2322,82 @@ def _openUE9OverEthernet(firstFound, pAddress, devNumber):
         except:
             pass
 
-    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-    s.settimeout(BROADCAST_SOCKET_TIMEOUT)
+    def matches(dev, number):
+        # Check if we have found the device we are looking for.
+        # pAddress represents either Local ID, Serial Number, or the
+        # IP Address. This is so there are no conflicting identifiers.
+        return firstFound \
+            or devNumber == number \
+            or pAddress in [dev['localId'], dev['serialNumber'], dev['ipAddress']]
+
+    try:
+        found = _discoverUE9s(match = matches)
+    except socket.error:
+        e = sys.exc_info()[1]
+        raise LabJackException(LJE_LABJACK_NOT_FOUND, "Couldn't search for UE9s: %s" % e)
 
-    sndDataBuff = [0] * 6
-    sndDataBuff[0] = 0x22
-    sndDataBuff[1] = 0x78
-    sndDataBuff[3] = 0xa9
+    if found and matches(found[-1], len(found)):
+        return UE9TCPHandle(found[-1]['ipAddress'])
 
-    outBuff = ""
-    for item in sndDataBuff:
-        outBuff += chr(item)
-    s.sendto(outBuff, ("255.255.255.255", 52362))
+    raise LabJackException("LJE_LABJACK_NOT_FOUND: Couldn't find the specified LabJack.")
+
+def _discoverUE9s(timeout = None, match = None):
+    """
+    Broadcasts the UE9 discovery packet and collects every response that
+    arrives within timeout seconds, BROADCAST_SOCKET_TIMEOUT by default.
+    Returns a list of dictionaries with devType, localId, serialNumber and
+    ipAddress, in the order the UE9s answered.
+
+    If match is given, it's called with each UE9 found and its number,
+    counting from 1, and the search stops at the first one it returns True
+    for, which is the last one in the list. Listing every UE9 has to wait
+    the full timeout.
+    """
+    if timeout is None:
+        timeout = BROADCAST_SOCKET_TIMEOUT
 
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     try:
-        count = 1
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+        s.sendto(b"\x22\x78\x00\xa9\x00\x00", ("255.255.255.255", 52362))
+
+        found = []
+        serials = set()
+        deadline = _monotonic() + timeout
         while True:
-            rcvDataBuff = s.recv(128)
-            rcvDataBuff = [ord(val) for val in rcvDataBuff]
-            if verifyChecksum(rcvDataBuff):
-                #Parse the packet
-                macAddress = rcvDataBuff[28:34]
-                macAddress.reverse()
-
-                # The serial number is four bytes:
-                # 0x10 and the last three bytes of the MAC address
-                serialBytes = chr(0x10)
-                for j in macAddress[3:]:
-                    serialBytes += chr(j)
-                serialNumber = unpack(">I", serialBytes)[0]
-
-                #Parse out the IP address
-                ipAddress = ""
-                for j in range(13, 9, -1):
-                    ipAddress += str(int(rcvDataBuff[j]))
-                    ipAddress += "." 
-                ipAddress = ipAddress[0:-1]
-
-                #Local ID
-                localId = rcvDataBuff[8] & 0xff
-                
-                # Check if we have found the device we are looking for.
-                # pAddress represents either Local ID, Serial Number, or the
-                # IP Address. This is so there are no conflicting identifiers.
-                if firstFound \
-                or devNumber == count \
-                or pAddress in [localId, serialNumber, ipAddress]:
-                    handle = UE9TCPHandle(ipAddress)
-                    return handle
-                
-                count += 1
-            else:
-                # Got a bad checksum.
-                pass
-    except LabJackException:
-        e = sys.exc_info()[1]
-        raise LabJackException(LJE_LABJACK_NOT_FOUND, "%s" % e)
-    except:
-        raise LabJackException("LJE_LABJACK_NOT_FOUND: Couldn't find the specified LabJack.")
+            remaining = deadline - _monotonic()
+            if remaining <= 0:
+                break
+            s.settimeout(remaining)
+            try:
+                dev = _parseUE9DiscoveryResponse(s.recv(128))
+            except socket.timeout:
+                break
+            if dev is not None and dev['serialNumber'] not in serials:
+                # A UE9 can answer more than once, like on two interfaces.
+                serials.add(dev['serialNumber'])
+                found.append(dev)
+                if match is not None and match(dev, len(found)):
+                    break
+        return found
+    finally:
+        s.close()
+
+def _parseUE9DiscoveryResponse(data):
+    """
+    Returns the device in a UE9 discovery response, or None if the response
+    is too short or its checksum is bad.
+    """
+    data = bytearray(data)
+    if len(data) < 38 or not verifyChecksum(data):
+        return None
+
+    # The serial number is four bytes: 0x10 and the last three bytes of the
+    # MAC address.
+    serialNumber = unpack(">I", pack("BBBB", 0x10, data[30], data[29], data[28]))[0]
+    ipAddress = "%s.%s.%s.%s" % (data[13], data[12], data[11], data[10])
+    localId = data[8] & 0xff
+    return dict(devType = LJ_dtUE9, localId = localId, serialNumber = serialNumber, ipAddress = ipAddress)
 
 #Windows, Linux, and Mac
 def openLabJack(deviceType, connectionType, firstFound = True, pAddress = None, devNumber = None, handleOnly = False, LJSocket = None):
@@ -1564,1083 +2569,55 @@ def _makeDeviceFromHandle(handle, deviceType):
     return device
 
 #Windows
-def AddRequest(Handle, IOType, Channel, Value, x1, UserData):
-    """AddRequest(handle, ioType, channel, value, x1, userData)
-        
-    Windows Only
-    """
-    if _os_name == 'nt':
-        v = ctypes.c_double(Value)
-        ud = ctypes.c_double(UserData)
-        
-        ec = staticLib.AddRequest(Handle, IOType, Channel, v, x1, ud)
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-
-#Windows
-def AddRequestS(Handle, pIOType, Channel, Value, x1, UserData):
-    """Add a request to the LabJackUD request stack
-    
-    For Windows
-    
-    Sample Usage to get the AIN value from channel 0:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequestS(u3Handle,"LJ_ioGET_AIN", 0, 0.0, 0, 0.0)
-    >>> Go()
-    >>> value = GetResult(u3Handle, LJ_ioGET_AIN, 0)
-    >>> print("Value: " + str(value))
-    Value: 0.366420765873
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: String
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    @type  UserData: number
-    @param UserData: Used for some requests
-    
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        v = ctypes.c_double(Value)
-        ud = ctypes.c_double(UserData)
-        
-        ec = staticLib.AddRequestS(Handle, pIOType, Channel, v, x1, ud)
-
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def AddRequestSS(Handle, pIOType, pChannel, Value, x1, UserData):
-    """Add a request to the LabJackUD request stack
+def DoubleToStringAddress(number):
+    """Converts a number (base 10) to an IP string.
     
     For Windows
-    
-    Sample Usage to get the AIN value from channel 0:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
-    >>> Go()
-    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
-    >>> print("Value: " + str(value))
-    Value: 1.27
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: String
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: String
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    @type  UserData: number
-    @param UserData: Used for some requests
-    
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':      
-        v = ctypes.c_double(Value)
-        ud = ctypes.c_double(UserData)
-        
-        ec = staticLib.AddRequestSS(Handle, pIOType, pChannel, v, x1, ud)
-
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
 
-#Windows
-def Go():
-    """Complete all requests currently on the LabJackUD request stack
-
-    For Windows Only
-    
     Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
-    >>> Go()
-    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
-    >>> print("Value: " + str(value))
-    Value: 1.27
-    
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    
-    if _os_name == 'nt':
-        ec = staticLib.Go()
-
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException("Function only supported for Windows")
 
-#Windows
-def GoOne(Handle):
-    """Performs the next request on the LabJackUD request stack
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
-    >>> GoOne(u3Handle)
-    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
-    >>> print("Value: " + str(value))
-    Value: 1.27
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
+    >>> DoubleToStringAddress(3232235985)
+    '192.168.1.209'
     
-    @rtype: None
-    @return: Function returns nothing.
+    @type  number: number
+    @param number: Number to be converted.
     
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        ec = staticLib.GoOne(Handle)
+    @rtype: String
+    @return: The IP string converted from the number (base 10).
+        
+    @raise LabJackException: 
+    """ 
+    number = int(number)
+    address = "%i.%i.%i.%i" % ((number >> 8*3 & 0xFF), (number >> 8*2 & 0xFF), (number >> 8 & 0xFF), (number & 0xFF))
+    return address
 
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
+def StringToDoubleAddress(pString):
+    """Converts an IP string to a number (base 10).
 
-#Windows
-def eGet(Handle, IOType, Channel, pValue, x1):
-    """Perform one call to the LabJack Device
-    
-    eGet is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
     Sample Usage:
-    
-    >>> eGet(u3Handle, LJ_ioGET_AIN, 0, 0, 0)
-    0.39392614550888538
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: number
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    
-    @rtype: number
-    @return: Returns the value requested.
-        - value
-        
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double(pValue)
-        #ppv = ctypes.pointer(pv)
-        ec = staticLib.eGet(Handle, IOType, Channel, ctypes.byref(pv), x1)
-        #staticLib.eGet.argtypes = [ctypes.c_long, ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_long]
-        #ec = staticLib.eGet(Handle, IOType, Channel, pValue, x1)
-        
-        if ec != 0: raise LabJackException(ec)
-        #print("EGet:" + str(ppv))
-        #print("Other:" + str(ppv.contents))
-        return pv.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
 
+    >>> StringToDoubleAddress("192.168.1.209")
+    3232235985L
 
-#Windows
-#Raw method -- Used because x1 is an output
-def eGetRaw(Handle, IOType, Channel, pValue, x1):
-    """Perform one call to the LabJack Device as a raw command
-    
-    eGetRaw is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage (Calling a echo command):
-    
-    >>> sendBuff = [0] * 2
-    >>> sendBuff[0] = 0x70
-    >>> sendBuff[1] = 0x70
-    >>> eGetRaw(ue9Handle, LJ_ioRAW_OUT, 0, len(sendBuff), sendBuff)
-    (2.0, [112, 112])
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: number
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    @type  pValue: number
-    @param Value: Length of the buffer.
-    @type  x1: number
-    @param x1: Buffer to send.
-    
-    @rtype: Tuple
-    @return: The tuple (numBytes, returnBuffer)
-        - numBytes (number)
-        - returnBuffer (List)
-        
-    @raise LabJackException:
-    """
-    ec = 0
-    x1Type = "int"
-    if _os_name == 'nt':
-        digitalConst = [35, 36, 37, 45]
-        pv = ctypes.c_double(pValue)
-
-        #If IOType is digital then call eget with x1 as a long
-        if IOType in digitalConst:
-            ec = staticLib.eGet(Handle, IOType, Channel, ctypes.byref(pv), x1)
-        else: #Otherwise as an array
-            
-            try:
-                #Verify x1 is an array
-                if len(x1) < 1:
-                    raise LabJackException(0, "x1 is not a valid variable for the given IOType") 
-            except Exception:
-                raise LabJackException(0, "x1 is not a valid variable for the given IOType")  
-            
-            #Initialize newA
-            newA = None
-            if type(x1[0]) == int:
-                newA = (ctypes.c_byte*len(x1))()
-                for i in range(len(x1)):
-                    newA[i] = ctypes.c_byte(x1[i])
-            else:
-                x1Type = "float"
-                newA = (ctypes.c_double*len(x1))()
-                for i in range(len(x1)):
-                    newA[i] = ctypes.c_double(x1[i])
-
-            #Use eGetPtr when x1 is a pointer. x1 is a void*, and can accept 32
-            #and 64-bit pointer addresses safely.
-            if _use_ptr:
-                ec = staticLib.eGetPtr(Handle, IOType, Channel, ctypes.byref(pv), ctypes.byref(newA))
-            else:
-                #Using eGet if eGetPtr is not available.
-                ec = staticLib.eGet(Handle, IOType, Channel, ctypes.byref(pv), ctypes.byref(newA))
-            
-            if IOType == LJ_ioRAW_IN and Channel == 1:
-                # We return the raw byte string if we are streaming
-                x1 = pack('b' * len(x1), *newA)
-            elif IOType == LJ_ioRAW_IN and Channel == 0:
-                x1 = [0] * int(pv.value)
-                for i in range(len(x1)):
-                    x1[i] = newA[i] & 0xff
-                
-            else:
-                x1 = [0] * len(x1)
-                for i in range(len(x1)):
-                    x1[i] = newA[i]
-                    if x1Type == "int":
-                        x1[i] = x1[i] & 0xff
-            
-        if ec != 0: raise LabJackException(ec)
-        return pv.value, x1
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
+    @type  pString: String
+    @param pString: String to be converted.
 
-#Windows
-def eGetS(Handle, pIOType, Channel, pValue, x1):
-    """Perform one call to the LabJack Device
-    
-    eGet is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> eGet(u3Handle, "LJ_ioGET_AIN", 0, 0, 0)
-    0.39392614550888538
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  pIOType: String
-    @param pIOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    
     @rtype: number
-    @return: Returns the value requested.
-        - value
-        
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double(pValue)
-        ec = staticLib.eGetS(Handle, pIOType, Channel, ctypes.byref(pv), x1)
-
-        if ec != 0: raise LabJackException(ec)
-        return pv.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
+    @return: The number (base 10) that represents the IP string.
 
-#Windows
-def eGetSS(Handle, pIOType, pChannel, pValue, x1):
-    """Perform one call to the LabJack Device
-    
-    eGet is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> eGetSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0, 0)
-    1.27
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  pIOType: String
-    @param pIOType: IO Request to the LabJack.
-    @type  Channel: String
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    
-    @rtype: number
-    @return: Returns the value requested.
-        - value
-        
     @raise LabJackException:
     """
-    if _os_name == 'nt':
-        pv = ctypes.c_double(pValue)
-        ec = staticLib.eGetSS(Handle, pIOType, pChannel, ctypes.byref(pv), x1)
-
-        if ec != 0: raise LabJackException(ec)
-        return pv.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-
-#Windows
-#Not currently implemented
-def eGetRawS(Handle, pIOType, Channel, pValue, x1):
-    """Function not yet implemented.
-    
-    For Windows only.
-    """
-    pass
+    parts = pString.split('.')
 
-#Windows
-def ePut(Handle, IOType, Channel, Value, x1):
-    """Put one value to the LabJack device
-    
-    ePut is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
-    0.0
-    >>> ePut(u3Handle, LJ_ioPUT_CONFIG, LJ_chLOCALID, 8, 0)
-    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
-    8.0
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: number
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double(Value)
-        ec = staticLib.ePut(Handle, IOType, Channel, pv, x1)
+    if len(parts) != 4:
+        raise LabJackException(0, "IP address not correctly formatted")
 
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
+    try:
+        value = (int(parts[0]) << 8*3) + (int(parts[1]) << 8*2) + (int(parts[2]) << 8) + int(parts[3])
+    except ValueError:
+        raise LabJackException(0, "IP address not correctly formatted")
 
-#Windows
-def ePutS(Handle, pIOType, Channel, Value, x1):
-    """Put one value to the LabJack device
-    
-    ePut is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
-    0.0
-    >>> ePutS(u3Handle, "LJ_ioPUT_CONFIG", LJ_chLOCALID, 8, 0)
-    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
-    8.0
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: String
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double(Value)
-        ec = staticLib.ePutS(Handle, pIOType, Channel, pv, x1)
-
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def ePutSS(Handle, pIOType, pChannel, Value, x1):
-    """Put one value to the LabJack device
-    
-    ePut is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
-    0.0
-    >>> ePutSS(u3Handle, "LJ_ioPUT_CONFIG", "LJ_chLOCALID", 8, 0)
-    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
-    8.0
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: String
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: String
-    @param Channel: Channel for the IO request.
-    @type  Value: number
-    @param Value: Used for some requests
-    @type  x1: number
-    @param x1: Used for some requests
-    
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double(Value)
-        ec = staticLib.ePutSS(Handle, pIOType, pChannel, pv, x1)
-
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def GetResult(Handle, IOType, Channel):
-    """Put one value to the LabJack device
-    
-    ePut is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
-    >>> GoOne(u3Handle)
-    >>> value = GetResult(u3Handle, LJ_ioGET_CONFIG, LJ_chFIRMWARE_VERSION)
-    >>> print("Value: " + str(value))
-    Value: 1.27
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  IOType: number
-    @param IOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    
-    @rtype: number
-    @return: The value requested.
-        - value
-        
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double()
-        ec = staticLib.GetResult(Handle, IOType, Channel, ctypes.byref(pv))
-
-        if ec != 0: raise LabJackException(ec)          
-        return pv.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def GetResultS(Handle, pIOType, Channel):
-    """Put one value to the LabJack device
-    
-    ePut is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
-    >>> GoOne(u3Handle)
-    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
-    >>> print("Value: " + str(value))
-    Value: 1.27
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  pIOType: String
-    @param pIOType: IO Request to the LabJack.
-    @type  Channel: number
-    @param Channel: Channel for the IO request.
-    
-    @rtype: number
-    @return: The value requested.
-        - value
-        
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double()
-        ec = staticLib.GetResultS(Handle, pIOType, Channel, ctypes.byref(pv))
-
-        if ec != 0: raise LabJackException(ec)          
-        return pv.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def GetResultSS(Handle, pIOType, pChannel):
-    """Put one value to the LabJack device
-    
-    ePut is equivilent to an AddRequest followed by a GoOne.
-    
-    For Windows Only
-    
-    Sample Usage:
-    
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
-    >>> GoOne(u3Handle)
-    >>> value = GetResultSS(u3Handle, "LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION")
-    >>> print("Value:" + str(value))
-    Value: 1.27
-    
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  pIOType: String
-    @param pIOType: IO Request to the LabJack.
-    @type  Channel: String
-    @param Channel: Channel for the IO request.
-    
-    @rtype: number
-    @return: The value requested.
-        - value
-        
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pv = ctypes.c_double()
-        ec = staticLib.GetResultSS(Handle, pIOType, pChannel, ctypes.byref(pv))
-
-        if ec != 0: raise LabJackException(ec)
-        return pv.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def GetFirstResult(Handle):
-    """List All LabJack devices of a specific type over a specific connection type.
-
-    For Windows only.
-
-    Sample Usage (Shows getting the localID (8) and firmware version (1.27) of a U3 device):
-
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0, 0)
-    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chFIRMWARE_VERSION, 0, 0, 0)
-    >>> Go()
-    >>> GetFirstResult(u3Handle)
-    (1001, 0, 8.0, 0, 0.0)
-    >>> GetNextResult(u3Handle)
-    (1001, 11, 1.27, 0, 0.0)
-
-    @type  DeviceType: number
-    @param DeviceType: The LabJack device.
-    @type  ConnectionType: number
-    @param ConnectionType: The connection method (Ethernet/USB).
-    
-    @rtype: Tuple
-    @return: The tuple (ioType, channel, value, x1, userData)
-        - ioType (number): The io of the result.
-        - serialNumber (number): The channel of the result.
-        - value (number): The requested result.
-        - x1 (number):  Used only in certain requests.
-        - userData (number): Used only in certain requests.
-        
-    @raise LabJackException: 
-    """   
-    if _os_name == 'nt':     
-        pio = ctypes.c_long()
-        pchan = ctypes.c_long()
-        pv = ctypes.c_double()
-        px = ctypes.c_long()
-        pud = ctypes.c_double()
-        ec = staticLib.GetFirstResult(Handle, ctypes.byref(pio), 
-                                       ctypes.byref(pchan), ctypes.byref(pv), 
-                                       ctypes.byref(px), ctypes.byref(pud))
-
-        if ec != 0: raise LabJackException(ec)          
-        return pio.value, pchan.value, pv.value, px.value, pud.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def GetNextResult(Handle):
-    """List All LabJack devices of a specific type over a specific connection type.
-
-    For Windows only.
-
-    Sample Usage (Shows getting the localID (8) and firmware version (1.27) of a U3 device):
-
-    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
-    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0, 0)
-    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chFIRMWARE_VERSION, 0, 0, 0)
-    >>> Go()
-    >>> GetFirstResult(u3Handle)
-    (1001, 0, 8.0, 0, 0.0)
-    >>> GetNextResult(u3Handle)
-    (1001, 11, 1.27, 0, 0.0)
-
-    @type  DeviceType: number
-    @param DeviceType: The LabJack device.
-    @type  ConnectionType: number
-    @param ConnectionType: The connection method (Ethernet/USB).
-    
-    @rtype: Tuple
-    @return: The tuple (ioType, channel, value, x1, userData)
-        - ioType (number): The io of the result.
-        - serialNumber (number): The channel of the result.
-        - value (number): The requested result.
-        - x1 (number):  Used only in certain requests.
-        - userData (number): Used only in certain requests.
-        
-    @raise LabJackException: 
-    """ 
-    if _os_name == 'nt':
-        pio = ctypes.c_long()
-        pchan = ctypes.c_long()
-        pv = ctypes.c_double()
-        px = ctypes.c_long()
-        pud = ctypes.c_double()
-        ec = staticLib.GetNextResult(Handle, ctypes.byref(pio), 
-                                       ctypes.byref(pchan), ctypes.byref(pv), 
-                                       ctypes.byref(px), ctypes.byref(pud))
-
-        if ec != 0: raise LabJackException(ec)          
-        return pio.value, pchan.value, pv.value, px.value, pud.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def DoubleToStringAddress(number):
-    """Converts a number (base 10) to an IP string.
-    
-    For Windows
-
-    Sample Usage:
-
-    >>> DoubleToStringAddress(3232235985)
-    '192.168.1.209'
-    
-    @type  number: number
-    @param number: Number to be converted.
-    
-    @rtype: String
-    @return: The IP string converted from the number (base 10).
-        
-    @raise LabJackException: 
-    """ 
-    number = int(number)
-    address = "%i.%i.%i.%i" % ((number >> 8*3 & 0xFF), (number >> 8*2 & 0xFF), (number >> 8 & 0xFF), (number & 0xFF))
-    return address
-
-def StringToDoubleAddress(pString):
-    """Converts an IP string to a number (base 10).
-
-    Sample Usage:
-
-    >>> StringToDoubleAddress("192.168.1.209")
-    3232235985L
-
-    @type  pString: String
-    @param pString: String to be converted.
-
-    @rtype: number
-    @return: The number (base 10) that represents the IP string.
-
-    @raise LabJackException:
-    """
-    parts = pString.split('.')
-
-    if len(parts) != 4:
-        raise LabJackException(0, "IP address not correctly formatted")
-
-    try:
-        value = (int(parts[0]) << 8*3) + (int(parts[1]) << 8*2) + (int(parts[2]) << 8) + int(parts[3])
-    except ValueError:
-        raise LabJackException(0, "IP address not correctly formatted")
-
-    return value
-
-#Windows
-def StringToConstant(pString):
-    """Converts an LabJackUD valid string to its constant value.
-
-    For Windows
-
-    Sample Usage:
-
-    >>> StringToConstant("LJ_dtU3")
-    3
-    
-    @type  pString: String
-    @param pString: String to be converted.
-    
-    @rtype: number
-    @return: The number (base 10) that represents the LabJackUD string.
-    """
-    if _os_name == 'nt':
-        a = ctypes.create_string_buffer(pString, 256)
-        return staticLib.StringToConstant(a)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def eAIN(Handle, ChannelP, ChannelN=199, Range=0, Resolution=0, Settling=0, Binary=False):
-    """An easy function that returns a reading from one analog input.
-        
-    Windows Only
-
-    Sample Usage:
-    
-    >>> import LabJackPython as LJUD
-    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
-    >>> AIN1Val = LJUD.eAIN(d.handle, 1)
-
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  ChannelP: number
-    @param ChannelP: The positive AIN channel to acquire.
-    @type  ChannelN: number
-    @param ChannelN: The negative AIN channel to acquire.
-    @type  Range: number
-    @param Range: Input range setting. Ignored on the U3.
-    @type  Resolution: number
-    @param Resolution: See Datasheet Section 2.6 and the eAIN function reference.
-    @type  Settling: number
-    @param Settling: See Datasheet Section 2.6 and the eAIN function reference.
-    @type  Binary: boolean
-    @param Binary: Setting to True or a non-zero value will return 
-                   'Voltage' as a binary value.
-
-    @rtype: number
-    @return: Returns the analog input reading, which is generally a voltage.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        chp = ctypes.c_long(ChannelP)
-        chn = ctypes.c_long(ChannelN)
-        volts = ctypes.c_double()
-        rng = ctypes.c_long(Range)
-        res = ctypes.c_long(Resolution)
-        settling = ctypes.c_long(Settling)
-        binary = ctypes.c_long(Binary)
-        ec = staticLib.eAIN(Handle, chp, chn, ctypes.byref(volts), rng, res, settling, binary, 0, 0)
-        if ec != 0: raise LabJackException(ec)
-        return volts.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def eDAC(Handle, Channel, Voltage, Binary=False):
-    """An easy function that writes a value to one analog output.
-        
-    Windows Only
-
-    Sample Usage:
-    
-    >>> import LabJackPython as LJUD
-    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
-    >>> channel = 1 # Target DAC1
-    >>> voltage = 3.5   # Set the output to 3.5V
-    >>> LJUD.eDAC(d.handle, channel, voltage)
-
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  Channel: number
-    @param Channel: DAC channel number.
-    @type  Voltage: number
-    @param Voltage: Desired voltage to output.
-    @type  Binary: boolean
-    @param Binary: Setting to True or a non-zero value will pass 
-                   'Voltage' as a binary value.
-
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        ch = ctypes.c_long(Channel)
-        val = ctypes.c_double(Voltage)
-        binary = ctypes.c_long(Binary)
-        ec = staticLib.eDAC(Handle, ch, val, binary, 0, 0)
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def eDI(Handle, Channel):
-    """An easy function that reads the state of one digital input.
-        
-    Windows Only
-
-    Sample Usage:
-    
-    >>> import LabJackPython as LJUD
-    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
-    >>> FIO4State = LJUD.eDI(d.handle, 4)
-
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  Channel: number
-    @param Channel: DIO channel number.
-
-    @rtype: number
-    @return: Returns the state of the digital input. 0=False=Low, 1=True=High.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        ch = ctypes.c_long(Channel)
-        state = ctypes.c_long()
-        ec = staticLib.eDI(Handle, ch, ctypes.byref(state))
-        if ec != 0: raise LabJackException(ec)
-        return state.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-#Windows
-def eDO(Handle, Channel, State):
-    """An easy function that writes the state of one digital output.
-        
-    Windows Only
-
-    Sample Usage:
-    
-    >>> import LabJackPython as LJUD
-    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
-    >>> channel = 4 # Target FIO4
-    >>> state = 1   # Set the state to 1
-    >>> LJUD.eDO(d.handle, channel, state)
-
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  Channel: number
-    @param Channel: DIO channel number.
-    @type  State: number
-    @param State: Desired state for the DIO.
-
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        ch = ctypes.c_long(Channel)
-        state = ctypes.c_long(State)
-        ec = staticLib.eDO(Handle, ch, state)
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-def _convertListToCtypeArray(li, cType):
-    """Returns a ctypes list converted from a normal list."""
-    return (cType*len(li))(*li)
-
-#Windows
-def eTCConfig(Handle, aEnableTimers, aEnableCounters, TCPinOffset, TimerClockBaseIndex, TimerClockDivisor, aTimerModes, aTimerValues):
-    """An easy function that configures and initializes all the timers and counters.
-        
-    Windows Only
-
-    Sample Usage:
-    
-    >>> import LabJackPython as LJUD
-    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
-    >>> aEnableTimers = [1,0] # Enable Timer0
-    >>> aEnableCounters = [0,1] # Enable Counter1 (Counter0 unavailable when using clock with divisor)
-    >>> pinOffset = 4 # Put Timer0 on FIO4 (Counter1 will be on FIO5)
-    >>> clockBase = LJUD.LJ_tc48MHZ_DIV # 48MHz clock (allows divisor)
-    >>> clockDivisor = 2 # Clock will be 24MHz. This will allow a 24MHz/65535 = 366.217Hz PWM16
-    >>> aTimerModes = [LJUD.LJ_tmPWM16, 0] # Set up PWM16
-    >>> aTimerValues = [32768, 0] # Set 50% duty on the PWM16
-    >>> LJUD.eTCConfig(d.handle, aEnableTimers, aEnableCounters, pinOffset, clockBase, clockDivisor, aTimerModes, aTimerValues)
-    >>> aReadTimers = [0,0]
-    >>> aUpdateResetTimers = [1,0] # Update Timer0
-    >>> aReadCounters = [0,1] # Read Counter1
-    >>> aResetCounters = [0,1] # Reset Counter1 after reading
-    >>> aTimerValues = [16384,0] # Set PWM16 duty cycle to 75%
-    >>> LJUD.eTCValues(d.handle, aReadTimers, aUpdateResetTimers, aReadCounters, aResetCounters, aTimerValues)
-
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  aEnableTimers: list
-    @param aEnableTimers: A list where each element specifies whether that timer is enabled.
-                          A nonzero value for a list element specifies to enable that timer. 
-                          List size must be equal to the number of timers available on the device.
-    @type  aEnableCounters: list
-    @param aEnableCounters: A list where each element specifies whether that counter is enabled.
-                            A nonzero value for a list element specifies to enable that counter. 
-                            List size must be equal to the number of counters available on the device.
-    @type  TCPinOffset: number
-    @param TCPinOffset: Value specifies where to start assigning timers and counters.
-    @type  TimerClockBaseIndex: number
-    @param TimerClockBaseIndex: Pass a constant to set the timer base clock. The default is device specific.
-    @type  TimerClockDivisor: number
-    @param TimerClockDivisor: Pass a divisor from 0-255 where 0 is a divisor of 256.
-    @type  aTimerModes: list
-    @param aTimerModes: A list where each element is a constant specifying the mode for that timer.
-                        List size must be equal to the number of timers available on the device.
-    @type  aTimerValues: list
-    @param aTimerValues: A list where each element is specifies the initial value for that timer.
-                         List size must be equal to the number of timers available on the device.
-
-    @rtype: None
-    @return: Function returns nothing.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        numTimers = len(aEnableTimers)
-        if numTimers != len(aTimerModes) or numTimers != len(aTimerValues):
-            raise Exception("eTCConfig: Inconsistent timer list sizes. Timer list sizes must equal the number of timers on the device")
-
-        enTimers = _convertListToCtypeArray(aEnableTimers, ctypes.c_long)
-        enCounters = _convertListToCtypeArray(aEnableCounters, ctypes.c_long)
-        pinOffset = ctypes.c_long(TCPinOffset)
-        clockBase = ctypes.c_long(TimerClockBaseIndex)
-        clockDivisor = ctypes.c_long(TimerClockDivisor)
-        tModes = _convertListToCtypeArray(aTimerModes, ctypes.c_long)
-        tVals = _convertListToCtypeArray(aTimerValues, ctypes.c_double)
-        ec = staticLib.eTCConfig(Handle, ctypes.byref(enTimers), ctypes.byref(enCounters), pinOffset, clockBase, clockDivisor, ctypes.byref(tModes), ctypes.byref(tVals), 0, 0)
-        if ec != 0: raise LabJackException(ec)
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-def _convertCtypeArrayToList(listCtype):
-    """Returns a normal list from a ctypes list."""
-    return listCtype[:]
-
-#Windows
-def eTCValues(Handle, aReadTimers, aUpdateResetTimers, aReadCounters, aResetCounters, aTimerValues):
-    """An easy function that updates and reads all the timers and counters. 
-        
-    Windows Only
-
-    For sample usage, see the eTCConfig definition.
-
-    @type  Handle: number
-    @param Handle: Handle to the LabJack device.
-    @type  aReadTimers: list
-    @param aReadTimers: A list where each element specifies whether to read that timer.
-                        A nonzero value for a list element specifies to read that timer. 
-    @type  aUpdateResetTimers: list
-    @param aUpdateResetTimers: A list where each element specifies whether to update/reset that timer.
-                               A nonzero value for a list element specifies to update/reset that timer.
-    @type  aReadCounters: list
-    @param aReadCounters: A list where each element specifies whether to read that counter.
-                          A nonzero value for a list element specifies to read that counter. 
-    @type  aResetCounters: list
-    @param aResetCounters: A list where each element specifies whether to reset that counter.
-                           A nonzero value for a list element specifies to reset that counter.
-    @type  aTimerValues: list
-    @param aTimerValues: A list where each element is specifies the initial value for that timer.
-                         List size must be equal to the number of timers available on the device.
-
-    @rtype: Tuple
-    @return: The tuple (aTimerValues, aCounterValues)
-        - aTimerValues: List where each element is the value read from that timer if the appropriate element is set in the aReadTimers array.
-        - aCounterValues: List where each element is the value read from that counter if the appropriate element is set in the aReadCounters array.
-    
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        numTimers = len(aReadTimers)
-        numCounters = len(aReadCounters)
-
-        if numTimers != len(aUpdateResetTimers) or numTimers != len(aTimerValues):
-            raise Exception("eTCValues: Inconsistent timer list sizes. Timer list sizes must equal the number of timers on the device")
-        if numCounters != len(aResetCounters):
-            raise Exception("eTCValues: Inconsistent counter list sizes. Counter list sizes must equal the number of Counters on the device")
-
-        readTimers = _convertListToCtypeArray(aReadTimers, ctypes.c_long)
-        updateTimers = _convertListToCtypeArray(aUpdateResetTimers, ctypes.c_long)
-        readCounters = _convertListToCtypeArray(aReadCounters, ctypes.c_long)
-        resetCounters = _convertListToCtypeArray(aResetCounters, ctypes.c_long)
-        timerValues = _convertListToCtypeArray(aTimerValues, ctypes.c_double)
-        aCounterValues = (ctypes.c_double*numCounters)()
-        counterValues = _convertListToCtypeArray(aCounterValues, ctypes.c_double)
-        ec = staticLib.eTCValues(Handle, ctypes.byref(readTimers), ctypes.byref(updateTimers), ctypes.byref(readCounters), ctypes.byref(resetCounters), ctypes.byref(timerValues), ctypes.byref(counterValues), 0, 0)
-        if ec != 0: raise LabJackException(ec)
-        tVals = _convertCtypeArrayToList(timerValues)
-        cVals = _convertCtypeArrayToList(counterValues)
-        return tVals, cVals
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
+    return value
 
 # To hold all the error codes and what they mean:
 ERROR_TO_STRING_DICT = dict()
@@ -2726,30 +2703,6 @@ def lowlevelErrorToString(errorcode):
 
     return msg
 
-#Windows
-def ErrorToString(ErrorCode):
-    """Converts an LabJackUD valid error code to a String.
-
-    For Windows
-
-    Sample Usage:
-
-    >>> ErrorToString(1007)
-    'LabJack not found'
-    
-    @type  ErrorCode: number
-    @param ErrorCode: Valid LabJackUD error code.
-    
-    @rtype: String
-    @return: The string that represents the valid LabJackUD error code
-    """
-    if _os_name == 'nt':
-        pString = ctypes.create_string_buffer(256)
-        staticLib.ErrorToString(ctypes.c_long(ErrorCode), ctypes.byref(pString))
-        return pString.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
 #Windows, Linux, and Mac
 def GetDriverVersion():
     """Gets the version of the UD driver on Windows or the Exodriver on
@@ -2773,59 +2726,6 @@ def GetDriverVersion():
         staticLib.LJUSB_GetLibraryVersion.restype = ctypes.c_float
         return "%.4f" % staticLib.LJUSB_GetLibraryVersion()
 
-#Windows
-def TCVoltsToTemp(TCType, TCVolts, CJTempK):
-    """Converts a thermo couple voltage reading to an appropriate temperature reading.
-
-    For Windows
-
-    Sample Usage:
-
-    >>> TCVoltsToTemp(LJ_ttK, 0.003141592, 297.038889)
-    373.13353222244825
-            
-    @type  TCType: number
-    @param TCType: The type of thermo couple used.
-    @type  TCVolts: number
-    @param TCVolts: The voltage reading from the thermo couple
-    @type  CJTempK: number
-    @param CJTempK: The cold junction temperature reading in Kelvin
-    
-    @rtype: number
-    @return: The thermo couples temperature reading
-        - pTCTempK
-        
-    @raise LabJackException:
-    """
-    if _os_name == 'nt':
-        pTCTempK = ctypes.c_double()
-        ec = staticLib.TCVoltsToTemp(ctypes.c_long(TCType), ctypes.c_double(TCVolts), 
-                                     ctypes.c_double(CJTempK), ctypes.byref(pTCTempK))
-
-        if ec != 0: raise LabJackException(ec)          
-        return pTCTempK.value
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
-
-#Windows 
-def Close():
-    """Resets the driver and closes all open handles.
-
-    For Windows
-
-    Sample Usage:
-
-    >>> Close()
-            
-    @rtype: None
-    @return: The function returns nothing.
-    """    
-    if _os_name == 'nt':
-        staticLib.Close()
-    else:
-       raise LabJackException(0, "Function only supported for Windows")
-
 #Windows, Linux and Mac
 def DriverPresent():
     try:
@@ -2865,245 +2765,1124 @@ def U12DriverPresent():
     return False
 
 
-#Windows only
-def LJHash(hashStr, size):
-    """An approximation of the md5 hashing algorithms.  
+def __listAllUE9Unix(connectionType, errors = None):
+    """Private listAll function for use on unix and mac machines to find UE9s.
+    """
+
+    deviceList = {}
+
+    if connectionType == LJ_ctUSB:
+        deviceList = _listAllUSBUnix(LJ_dtUE9, errors)
+
+    elif connectionType == LJ_ctETHERNET:
+        try:
+            found = _discoverUE9s()
+        except socket.error:
+            e = sys.exc_info()[1]
+            if errors is not None:
+                errors.append((None, e))
+            found = []
+
+        for dev in found:
+            deviceList[dev['serialNumber']] = dev
+
+    return deviceList
+
+
+def __listAllU3Unix(errors = None):
+    """Private listAll function for unix and mac machines.  Works on the U3 only.
+    """
+    return _listAllUSBUnix(LJ_dtU3, errors)
+
+
+def __listAllU6Unix(errors = None):
+    """ List all for U6s """
+    return _listAllUSBUnix(LJ_dtU6, errors)
+
+
+def _listAllUSBUnix(deviceType, errors = None):
+    """
+    Opens and queries every USB device of deviceType at the same time, and
+    returns a dictionary of their attributes by serial number.
+    """
+    def openAndClose(devNumber):
+        device = openLabJack(deviceType, 1, firstFound = False, devNumber = devNumber)
+        device.close()
+        return device
+
+    numDevices = staticLib.LJUSB_GetDevCount(deviceType)
+    results = _runConcurrently(openAndClose, list(range(1, numDevices + 1)))
+
+    deviceList = {}
+    opened = []
+    for devNumber, device, e in results:
+        if e is None:
+            opened.append((devNumber, device))
+            deviceList[str(device.serialNumber)] = device.__dict__
+        elif errors is not None:
+            errors.append((devNumber, e))
+
+    _indexOpenedDevices(deviceType, opened)
+    return deviceList
+
+def setChecksum16(buffer):
+    return LabJackChecksum.setChecksum16(buffer)
+
+
+def setChecksum8(buffer, numBytes):
+    return LabJackChecksum.setChecksum8(buffer, numBytes)
+
+
+class StreamBufferPool(object):
+    """
+    StreamBufferPool(numBuffers = 4)
+
+    A small ring of preallocated bytearrays for reading stream data into.
+    Each call to nextBuffer hands out the next buffer in the ring, so a
+    buffer is written again numBuffers reads later. Pass one to
+    Device.streamData(bufferPool = ...) to stop allocating a new object for
+    every block.
+    """
+    def __init__(self, numBuffers = 4):
+        if numBuffers < 1:
+            raise LabJackException("A StreamBufferPool needs at least one buffer.")
+        self.buffers = [bytearray() for i in range(numBuffers)]
+        self.index = 0
+        self.handedOut = 0  # Calls of nextBuffer
+
+    def nextBuffer(self, size):
+        """
+        Returns the next buffer in the ring, sized to size bytes. Buffers are
+        only reallocated when the requested size changes.
+        """
+        buf = self.buffers[self.index]
+        if len(buf) != size:
+            buf = bytearray(size)
+            self.buffers[self.index] = buf
+        self.index = (self.index + 1) % len(self.buffers)
+        self.handedOut += 1
+        return buf
+
+    def reuseLast(self):
+        """
+        Makes the next call to nextBuffer return the buffer handed out last,
+        for when the data read into it was thrown away.
+        """
+        self.index = (self.index - 1) % len(self.buffers)
+
+
+class _StreamReaderThread(threading.Thread):
+    """
+    The thread behind Device.streamStartBackground. It only reads raw stream
+    blocks and puts them in a bounded queue.
+    """
+    def __init__(self, device, queueDepth):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.device = device
+        self.queue = queue.Queue(maxsize = queueDepth)
+        self.queueDepth = queueDepth
+        # Every buffer in the pool can be in use at once: one per queued
+        # block, one held by the consumer and one being read into.
+        self.bufferPool = StreamBufferPool(queueDepth + 2)
+        self.running = True
+        self.error = None
+        self.blocks = 0
+        self.dropped = 0
+        self.emptyReads = 0
+        self.highWaterMark = 0
+
+    def run(self):
+        try:
+            handedOut = self.bufferPool.handedOut
+            for block in self.device.streamData(convert = False, bufferPool = self.bufferPool):
+                if not self.running:
+                    break
+                # Whether this read used a buffer from the pool. UE9 Ethernet
+                # blocks come from its UE9StreamFramer instead.
+                fromPool = self.bufferPool.handedOut != handedOut
+                handedOut = self.bufferPool.handedOut
+
+                if block is None:
+                    self.emptyReads += 1
+                    # Nothing is in the buffer, read into it again.
+                    if fromPool:
+                        self.bufferPool.reuseLast()
+                    continue
+
+                self.blocks += 1
+                try:
+                    self.queue.put_nowait(block)
+                except queue.Full:
+                    self.dropped += 1
+                    # The dropped block's buffer is free, read into it again.
+                    if fromPool:
+                        self.bufferPool.reuseLast()
+                    continue
+
+                self.highWaterMark = max(self.highWaterMark, self.queue.qsize())
+        except Exception:
+            self.error = sys.exc_info()[1]
+
+    def get(self, timeout):
+        if self.error is not None and self.queue.empty():
+            raise self.error
+        try:
+            return self.queue.get(timeout = timeout)
+        except queue.Empty:
+            if self.error is not None:
+                raise self.error
+            return None
+
+    def stop(self):
+        self.running = False
+        self.join()
+
+    def stats(self):
+        return dict(blocks = self.blocks, dropped = self.dropped, queued = self.queue.qsize(), highWaterMark = self.highWaterMark, queueDepth = self.queueDepth, emptyReads = self.emptyReads)
+
+
+class DeviceMetrics(object):
+    """
+    DeviceMetrics(transport, callback = None, interval = METRICS_EXPORT_INTERVAL)
+
+    Counters and latency histograms for one device, made by
+    Device.enableMetrics. Everything is allocated when it's made, so
+    recording a command or stream block only adds to numbers.
+
+    Each histogram has METRICS_BUCKETS buckets. Bucket 0 counts durations
+    under 1 microsecond, bucket i from 2**(i-1) to 2**i microseconds, and
+    the last bucket everything longer. Command latencies are kept per
+    command type: the command number of extended commands, like 0xF8/0x00
+    for Feedback, or the command byte of the others, like 0xA8 for
+    StreamStart.
+
+    callback, if set, is called with a snapshot() at most every interval
+    seconds, when a command or stream block is recorded.
+    """
+    COMMAND = 0
+    MODBUS = 1
+    STREAM = 2
+    CHANNELS = ("command", "modbus", "stream")
+
+    def __init__(self, transport, callback = None, interval = METRICS_EXPORT_INTERVAL):
+        self.transport = transport
+        self.callback = callback
+        self.interval = interval
+        self.reset()
+
+    def reset(self):
+        """
+        Name: DeviceMetrics.reset()
+        Args: None
+        Desc: Sets every counter and histogram back to zero.
+        """
+        # Extended commands are types 0-255, the others 256-511.
+        self.commandCounts = [0] * 512
+        self.commandSeconds = [0.0] * 512
+        self.commandHistograms = [0] * (512 * METRICS_BUCKETS)
+
+        # Indexed by COMMAND, MODBUS and STREAM.
+        self.bytesOut = [0] * 3
+        self.bytesIn = [0] * 3
+        self.packetsOut = [0] * 3
+        self.packetsIn = [0] * 3
+
+        # Stream block read, decode and inter-arrival times.
+        self.streamCounts = [0] * 3
+        self.streamSeconds = [0.0] * 3
+        self.streamHistograms = [0] * (3 * METRICS_BUCKETS)
+
+        self.streamBlocks = 0
+        self.streamPackets = 0
+        self.streamErrors = 0
+        self.streamMissed = 0
+        self.streamDroppedPackets = 0
+        self.streamBadChecksums = 0
+        self.streamBacklog = 0
+        self.streamMaxBacklog = 0
+        self.lastArrival = None
+        self.startTime = _monotonic()
+        self.nextExport = self.startTime + (self.interval or 0)
+
+    def sent(self, channel, numBytes):
+        self.bytesOut[channel] += numBytes
+        self.packetsOut[channel] += 1
+
+    def received(self, channel, numBytes):
+        self.bytesIn[channel] += numBytes
+        self.packetsIn[channel] += 1
+
+    def commandDone(self, command, seconds):
+        """
+        Name: DeviceMetrics.commandDone(command, seconds)
+        Args: command, the low-level command sent
+              seconds, the time from sending it to reading its response
+        Desc: Records a command's latency.
+        """
+        if len(command) > 3 and command[1] == 0xF8:
+            commandType = command[3]
+        else:
+            commandType = 256 + command[1]
+        self.commandCounts[commandType] += 1
+        self.commandSeconds[commandType] += seconds
+        self.commandHistograms[commandType * METRICS_BUCKETS + _metricsBucket(seconds)] += 1
+        if self.callback is not None:
+            self._maybeExport()
+
+    def _addStream(self, index, seconds):
+        self.streamCounts[index] += 1
+        self.streamSeconds[index] += seconds
+        self.streamHistograms[index * METRICS_BUCKETS + _metricsBucket(seconds)] += 1
+
+    def streamBlock(self, start, readDone, end, block):
+        """
+        Name: DeviceMetrics.streamBlock(start, readDone, end, block)
+        Args: start, readDone, end, the clock when the block's read started,
+                                    when it finished and when decoding it
+                                    finished
+              block, the block's dictionary from streamData
+        Desc: Records a stream block's times and counters.
+        """
+        self._addStream(0, readDone - start)
+        self._addStream(1, end - readDone)
+        if self.lastArrival is not None:
+            self._addStream(2, readDone - self.lastArrival)
+        self.lastArrival = readDone
+
+        self.streamBlocks += 1
+        self.streamPackets += block['numPackets']
+        self.streamErrors += block['errors']
+        self.streamMissed += block['missed']
+        self.streamDroppedPackets += block['droppedPackets']
+        self.streamBadChecksums += len(block.get('badChecksums', ()))
+        self.streamBacklog = block['backlog']
+        if self.streamBacklog > self.streamMaxBacklog:
+            self.streamMaxBacklog = self.streamBacklog
+        if self.callback is not None:
+            self._maybeExport()
+
+    def _maybeExport(self):
+        now = _monotonic()
+        if now >= self.nextExport:
+            self.nextExport = now + (self.interval or 0)
+            self.callback(self.snapshot())
+
+    def _histogram(self, histograms, index, count, seconds):
+        buckets = histograms[index * METRICS_BUCKETS:(index + 1) * METRICS_BUCKETS]
+
+        def percentile(p):
+            # The upper bound of the bucket the percentile is in.
+            target = p * count
+            total = 0
+            for i, bucketCount in enumerate(buckets):
+                total += bucketCount
+                if total >= target:
+                    return METRICS_BUCKET_BOUNDS[i]
+            return METRICS_BUCKET_BOUNDS[-1]
+
+        return dict(count = count, seconds = seconds, mean = seconds / count if count else 0.0, p50 = percentile(0.5), p99 = percentile(0.99), buckets = buckets)
+
+    def snapshot(self):
+        """
+        Name: DeviceMetrics.snapshot()
+        Args: None
+        Desc: Returns all the metrics as a dictionary. The latency
+              histograms have count, seconds, mean, the p50 and p99 bucket
+              bounds in microseconds, and the bucket counts. Command types
+              that were never sent are left out.
+        """
+        commands = dict()
+        for commandType, count in enumerate(self.commandCounts):
+            if count:
+                name = ("0xF8/0x%02X" % commandType) if commandType < 256 else ("0x%02X" % (commandType - 256))
+                commands[name] = self._histogram(self.commandHistograms, commandType, count, self.commandSeconds[commandType])
+
+        io = dict()
+        for i, channel in enumerate(self.CHANNELS):
+            io[channel] = dict(bytesOut = self.bytesOut[i], bytesIn = self.bytesIn[i], packetsOut = self.packetsOut[i], packetsIn = self.packetsIn[i])
+
+        stream = dict(blocks = self.streamBlocks, packets = self.streamPackets, errors = self.streamErrors, missed = self.streamMissed, droppedPackets = self.streamDroppedPackets, badChecksums = self.streamBadChecksums, backlog = self.streamBacklog, maxBacklog = self.streamMaxBacklog)
+        for i, name in enumerate(("readTime", "decodeTime", "interArrival")):
+            stream[name] = self._histogram(self.streamHistograms, i, self.streamCounts[i], self.streamSeconds[i])
+
+        return dict(transport = self.transport, seconds = _monotonic() - self.startTime, bucketBounds = list(METRICS_BUCKET_BOUNDS), commands = commands, io = io, stream = stream)
+
+
+def _metricsBucket(seconds):
+    return min(int(seconds * 1000000).bit_length(), METRICS_BUCKETS - 1)
+
+
+class ProtocolTrace(object):
+    """
+    ProtocolTrace(maxEvents = TRACE_BUFFER_EVENTS,
+                  streamBytes = TRACE_STREAM_BYTES)
+
+    The last maxEvents packets a device sent and received, made by
+    Device.enableTrace. Recording an event only copies its bytes into a
+    ring buffer. The time, channel, handle and checksum status are
+    formatted when the trace is dumped.
+
+    Each event is a (clock, channel, direction, handle, data, length)
+    tuple. channel is COMMAND, MODBUS or STREAM and direction SENT or
+    RECEIVED. Only the first streamBytes of a stream read are kept, so data
+    can be shorter than length.
+    """
+    COMMAND = 0
+    MODBUS = 1
+    STREAM = 2
+    CHANNELS = ("command", "modbus", "stream")
+
+    SENT = 0
+    RECEIVED = 1
+    DIRECTIONS = ("sent", "received")
+
+    def __init__(self, maxEvents = TRACE_BUFFER_EVENTS, streamBytes = TRACE_STREAM_BYTES):
+        self.streamBytes = streamBytes
+        self.events = collections.deque(maxlen = maxEvents)
+        self.recorded = 0
+        # For showing event times as times of day.
+        self.startClock = _monotonic()
+        self.startTime = time.time()
+
+    def record(self, channel, direction, handle, data):
+        """
+        Name: ProtocolTrace.record(channel, direction, handle, data)
+        Args: channel, COMMAND, MODBUS or STREAM
+              direction, SENT or RECEIVED
+              handle, the handle the data went through
+              data, the bytes sent or received
+        Desc: Adds an event timed now, dropping the oldest if the trace is
+              full.
+        """
+        length = len(data)
+        if channel == self.STREAM and length > self.streamBytes:
+            data = data[:self.streamBytes]
+        if _use_py2:
+            # bytes() of a list or memoryview isn't its bytes in Python 2.
+            data = bytes(bytearray(data))
+        else:
+            data = bytes(data)
+        self.events.append((_monotonic(), channel, direction, handle, data, length))
+        self.recorded += 1
+
+    def clear(self):
+        self.events.clear()
+        self.recorded = 0
+
+    def dropped(self):
+        """
+        Name: ProtocolTrace.dropped()
+        Args: None
+        Desc: Returns the number of events recorded that are no longer kept.
+        """
+        return self.recorded - len(self.events)
+
+    def format(self, event):
+        """
+        Name: ProtocolTrace.format(event)
+        Args: event, one of the trace's events
+        Desc: Returns the event as a line of text, like
+              12:00:01.250113 command sent 0x1f 14 bytes checksum ok [0x..]
+        """
+        clock, channel, direction, handle, data, length = event
+        seconds = self.startTime + (clock - self.startClock)
+        when = time.strftime("%H:%M:%S", time.localtime(seconds)) + (".%06d" % int((seconds % 1) * 1000000))
+        size = "%d bytes" % length
+        if len(data) < length:
+            size += " (%d kept)" % len(data)
+        return "%s %s %s %s %s checksum %s %s" % (when, self.CHANNELS[channel], self.DIRECTIONS[direction], _traceHandleName(handle), size, _traceChecksumStatus(channel, data), hexWithoutQuotes(bytearray(data)))
+
+    def lines(self, last = None):
+        """
+        Name: ProtocolTrace.lines(last = None)
+        Args: last, the number of most recent events to format, or None for
+                    all of them
+        Desc: Returns the events formatted, oldest first.
+        """
+        events = list(self.events)
+        if last is not None:
+            events = events[-last:] if last > 0 else []
+        return [self.format(event) for event in events]
+
+    def dump(self, output = None, last = None):
+        """
+        Name: ProtocolTrace.dump(output = None, last = None)
+        Args: output, a logging.Logger to log the events to with DEBUG
+                      priority, a file to write them to, or None to print
+                      them
+              last, the same as for lines()
+        Desc: Writes the events out, oldest first.
+        """
+        lines = self.lines(last)
+        if self.dropped():
+            lines.insert(0, "%d earlier events were dropped" % self.dropped())
+        for line in lines:
+            if isinstance(output, logging.Logger):
+                output.debug(line)
+            elif output is not None:
+                output.write(line + "\n")
+            else:
+                print(line)
+
+
+def _traceHandleName(handle):
+    if isinstance(handle, ctypes.c_void_p):
+        return "0x%x" % (handle.value or 0)
+    if isinstance(handle, int):
+        return "0x%x" % handle
+    if handle is None:
+        return "-"
+    return type(handle).__name__
+
+
+def _traceChecksumStatus(channel, data):
+    # "ok", "bad" or "-" when there is no LabJack checksum to verify: Modbus
+    # packets, error frames and stream reads cut off before their first
+    # packet ended.
+    if channel == ProtocolTrace.MODBUS or len(data) < 2:
+        return "-"
+    packet = bytearray(data)
+    packetBytes = len(packet)
+    if channel == ProtocolTrace.STREAM:
+        # A stream packet's byte 2 is its number of words after byte 6.
+        packetBytes = 6 + 2 * packet[2] if len(packet) > 2 else 0
+        if packetBytes < 6 or len(packet) < packetBytes:
+            return "-"
+    elif packetBytes < 6 and packet[0] == 0xB8 and packet[1] == 0xB8:
+        return "-"
+    if packetBytes < 6:
+        valid = LabJackChecksum.checksum8(packet) == packet[0]
+    else:
+        valid = LabJackChecksum.verifyChecksum(packet, packetBytes)
+    return "ok" if valid else "bad"
+
+
+class CommandFuture(object):
+    """
+    The response to a command submitted to a CommandPipeline.
+    """
+    def __init__(self, pipeline, readLen, commandBytes, checkBytes):
+        self.pipeline = pipeline
+        self.readLen = readLen
+        self.commandBytes = commandBytes
+        self.checkBytes = checkBytes
+        self.response = None
+        self.error = None
+        # Set when the device has metrics on.
+        self.command = None
+        self.sentAt = None
+
+    def done(self):
+        """
+        Name: CommandFuture.done()
+        Args: None
+        Desc: Returns True if the response has been read.
+        """
+        return self.response is not None or self.error is not None
+
+    def result(self):
+        """
+        Name: CommandFuture.result()
+        Args: None
+        Desc: Returns the response as a bytearray, reading the responses up
+              to it first if needed. Raises the response's error, if it has
+              one.
+        """
+        while not self.done():
+            self.pipeline._receive()
+        if self.error is not None:
+            raise self.error
+
+        if self.checkBytes:
+            self.pipeline.device._checkCommandBytes(self.response, self.commandBytes)
+        return self.response
+
+
+class CommandPipeline(object):
+    """
+    CommandPipeline(device, window = PIPELINE_WINDOW)
+
+    Sends low-level commands without waiting for each response. Over UE9
+    Ethernet and LJSocket, up to window commands are sent before their
+    responses are read, and the responses are matched to the commands in
+    order. Over USB each command is answered before the next is sent, so
+    it works the same, only without the overlap. Make pipelines with
+    Device.commandPipeline.
+
+    The device is locked from when the pipeline is opened until it's
+    closed, and closing reads every response still on the way. Don't call
+    other methods of the device in between.
+
+    Each command's response must be exactly readLen bytes, or the
+    responses after it won't line up.
+
+    >>> with d.commandPipeline(window = 16) as pipeline:
+    ...     futures = [pipeline.submit(command, 10, [0xF8, 0x02]) for command in commands]
+    ...     first = futures[0].result()
+    """
+    def __init__(self, device, window = PIPELINE_WINDOW):
+        if window < 1:
+            raise LabJackException("The pipeline window must be at least 1.")
+        self.device = device
+        self.window = window
+        self.sock = None
+        self.outstanding = collections.deque()
+        self.isOpen = False
+
+    def open(self):
+        """
+        Name: CommandPipeline.open()
+        Args: None
+        Desc: Locks the device so commands can be submitted. Returns the
+              pipeline.
+        """
+        self.device.deviceLock.acquire()
+        self.sock = self.device._commandSocket()
+        self.isOpen = True
+        return self
+
+    def submit(self, command, readLen, commandBytes, checkBytes = True, checksum = True):
+        """
+        Name: CommandPipeline.submit(command, readLen, commandBytes,
+                                     checkBytes = True, checksum = True)
+        Args: command, the low-level command, a list or bytearray
+              readLen, the exact length of the response
+              commandBytes, the bytes the response must echo after the
+                            checksum
+              checkBytes, check the response's checksums, command and error
+                          bytes in result()
+              checksum, set the command's checksums. command isn't changed.
+        Desc: Sends a command, first reading the oldest response if window
+              commands are already waiting. Returns a CommandFuture.
+        """
+        if not self.isOpen:
+            raise LabJackException("Open the CommandPipeline before submitting commands.")
+
+        command = bytearray(command)
+        if checksum:
+            setChecksum(command)
+
+        future = CommandFuture(self, readLen, commandBytes, checkBytes)
+        metrics = self.device.metrics
+        if metrics is not None:
+            future.command = command
+            future.sentAt = _monotonic()
+        if self.sock is None:
+            self.device._writeBytes(command)
+            future.response = bytearray(self.device._readBytes(readLen))
+            if metrics is not None:
+                metrics.commandDone(command, _monotonic() - future.sentAt)
+            return future
+
+        while len(self.outstanding) >= self.window:
+            self._receive()
+        self.device._writeBytes(command)
+        self.outstanding.append(future)
+        return future
+
+    def _receive(self):
+        future = self.outstanding.popleft()
+        try:
+            future.response = _recvExactly(self.sock, future.readLen)
+            metrics = self.device.metrics
+            if metrics is not None and future.sentAt is not None:
+                metrics.received(DeviceMetrics.COMMAND, len(future.response))
+                metrics.commandDone(future.command, _monotonic() - future.sentAt)
+            if self.device.trace is not None or self.device.debug:
+                self.device._traceEvent(ProtocolTrace.COMMAND, ProtocolTrace.RECEIVED, future.response)
+        except Exception:
+            # The responses after this one can't be matched anymore.
+            future.error = sys.exc_info()[1]
+            while self.outstanding:
+                self.outstanding.popleft().error = future.error
+            raise
+
+    def flush(self):
+        """
+        Name: CommandPipeline.flush()
+        Args: None
+        Desc: Reads every response still on the way.
+        """
+        while self.outstanding:
+            self._receive()
+
+    def close(self):
+        """
+        Name: CommandPipeline.close()
+        Args: None
+        Desc: Reads every response still on the way and unlocks the device.
+        """
+        if not self.isOpen:
+            return
+        try:
+            self.flush()
+        finally:
+            self.isOpen = False
+            self.device.deviceLock.release()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class FeedbackCommand(object):
+    """
+    The base of the U3 and U6 Feedback commands.
+
+    cmdBytes is the command's part of the Feedback request, and readLen the
+    number of bytes of its response. fields is the struct format of the
+    response, like "H" for a 16-bit value, so FeedbackPlan can decode every
+    command's response with one struct call. A command whose fields are one
+    value returns it, and one with more returns fromFields(values). A
+    command without fields returns handle() of its response bytes.
+    """
+    readLen = 0
+    fields = None
 
-    For Windows
-    
-    An approximation of the md5 hashing algorithm.  Used 
-    for authorizations on UE9 version 1.73 and higher and u3 
-    version 1.35 and higher.
-
-    @type  hashStr: String
-    @param hashStr: String to be hashed.
-    @type  size: number
-    @param size: Amount of bytes to hash from the hashStr
-            
-    @rtype: String
-    @return: The hashed string.
-    """  
-    
-    outBuff = (ctypes.c_char * 16)()
-    retBuff = ''
-    
-    ec = staticLib.LJHash(ctypes.cast(hashStr, ctypes.POINTER(ctypes.c_char)),
-                          size, 
-                          ctypes.cast(outBuff, ctypes.POINTER(ctypes.c_char)), 
-                          0)
-    if ec != 0: raise LabJackException(ec)
-
-    for i in range(16):
-        retBuff += outBuff[i]
-        
-    return retBuff
+    def fromFields(self, values):
+        return values
 
-def __listAllUE9Unix(connectionType):
-    """Private listAll function for use on unix and mac machines to find UE9s.
+    def handle(self, input):
+        return None
+
+
+class FeedbackPlan(object):
     """
+    FeedbackPlan(device, commandlist)
 
-    deviceList = {}
-    rcvDataBuff = []
+    A Feedback request for a U3 or U6 that is built once and sent as many
+    times as needed. The request packet is put together and checksummed
+    when the plan is made, and the response is decoded with one struct
+    call into each command's fields, so running the plan costs little more
+    than the USB round trip. Make plans with U3.compileFeedback or
+    U6.compileFeedback.
 
-    if connectionType == LJ_ctUSB:
-        numDevices = staticLib.LJUSB_GetDevCount(LJ_dtUE9)
-    
-        for i in range(numDevices):
-            try:
-                device = openLabJack(LJ_dtUE9, 1, firstFound = False, devNumber = i+1)
-                device.close()
-            
-                deviceList[str(device.serialNumber)] = device.__dict__
-            except LabJackException:
-                pass
+    The commands are not copied. Make a new plan if a command is changed.
 
-    elif connectionType == LJ_ctETHERNET:
-        #Create a socket
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        s.settimeout(BROADCAST_SOCKET_TIMEOUT)
+    >>> plan = d.compileFeedback(u6.AIN24(0), u6.AIN24(1))
+    >>> while True:
+    ...     ain0, ain1 = plan.run()
+    """
+    def __init__(self, device, commandlist):
+        self.device = device
+        self.commands = _flattenFeedbackCommands(commandlist)
+
+        request = bytearray(7)
+        request[1] = 0xF8
+        readLen = 9
+        for cmd in self.commands:
+            request += bytearray(cmd.cmdBytes)
+            readLen += cmd.readLen
+
+        if len(request) % 2:
+            request.append(0)
+        request[2] = len(request) // 2 - 3
+
+        # Responses are padded to an even length.
+        self.dataLen = readLen - 9
+        if readLen % 2:
+            readLen += 1
+
+        if len(request) > MAX_USB_PACKET_LENGTH:
+            raise LabJackException("ERROR: The Feedback command you are attempting to send is bigger than 64 bytes ( %s bytes ). Break your commands up into separate calls to getFeedback()." % len(request))
+
+        if readLen > MAX_USB_PACKET_LENGTH:
+            raise LabJackException("ERROR: The Feedback command you are attempting to send would yield a response that is greater than 64 bytes ( %s bytes ). Break your commands up into separate calls to getFeedback()." % readLen)
+
+        setChecksum(request)
+        self.request = request
+        self.readLen = readLen
+
+        # One format for the whole response, from each command's fields,
+        # or its bytes for handle(). slices has the function that makes
+        # each command's result from its values, or None if the result is
+        # its one value, and where its values are.
+        fmt = ["<"]
+        self.slices = []
+        i = 0
+        for cmd in self.commands:
+            if cmd.fields is None:
+                fmt.append("%sB" % cmd.readLen)
+                numValues = cmd.readLen
+                handle = cmd.handle
+            else:
+                fmt.append(cmd.fields)
+                numValues = len(Struct("<" + cmd.fields).unpack(bytes(bytearray(cmd.readLen))))
+                handle = None if numValues == 1 else cmd.fromFields
+            self.slices.append((handle, i, i + numValues))
+            i += numValues
+        self.parser = Struct("".join(fmt))
 
-        sndDataBuff = [0] * 6
-        sndDataBuff[0] = 0x22
-        sndDataBuff[1] = 0x78
-        sndDataBuff[3] = 0xa9
+        # Every result is one value, so the values are the results.
+        self.direct = all([handle is None for handle, start, end in self.slices])
+
+    def __len__(self):
+        return len(self.commands)
 
-        outBuff = ""
-        for item in sndDataBuff:
-            outBuff += chr(item)
-        s.sendto(outBuff, ("255.255.255.255", 52362))
+    def run(self):
+        """
+        Name: FeedbackPlan.run()
+        Args: None
+        Desc: Sends the request, and returns the list of results just like
+              getFeedback.
+        """
+        return self.parse(self.device._writeReadBytes(self.request, self.readLen, [], checkBytes = False, checksum = False))
 
+    def parse(self, rcvBuffer):
+        """
+        Name: FeedbackPlan.parse(rcvBuffer)
+        Args: rcvBuffer, the Feedback response to the plan's request
+        Desc: Checks the response for errors and returns the list of
+              results.
+        """
         try:
-            while True:
-                rcvDataBuff = s.recv(128)
-                try:
-                    rcvDataBuff = [ord(val) for val in rcvDataBuff]
-                    if verifyChecksum(rcvDataBuff):
-                        #Parse the packet
-                        macAddress = rcvDataBuff[28:34]
-                        macAddress.reverse()
-
-                        # The serial number is four bytes:
-                        # 0x10 and the last three bytes of the MAC address
-                        serialBytes = chr(0x10)
-                        for j in macAddress[3:]:
-                            serialBytes += chr(j)
-                        serial = unpack(">I", serialBytes)[0]
-
-                        #Parse out the IP address
-                        ipAddress = ""
-                        for j in range(13, 9, -1):
-                            ipAddress += str(int(rcvDataBuff[j]))
-                            ipAddress += "." 
-                        ipAddress = ipAddress[0:-1]
-
-                        #Local ID
-                        localId = rcvDataBuff[8] & 0xff
-
-                        deviceList[serial] = dict(devType = LJ_dtUE9, localId = localId, \
-                                                    serialNumber = serial, ipAddress = ipAddress)
-                except Exception:
-                    pass
-        except:
-            pass
+            self.device._checkCommandBytes(rcvBuffer, [0xF8])
 
-    return deviceList
+            if rcvBuffer[3] != 0x00:
+                raise LabJackException("Communication Failure: The Feedback response has incorrect command bytes. %s" % _troubleshoot_comm_msg)
+        except LowlevelErrorException:
+            culprit = self.commands[ (rcvBuffer[7] - 1) ]
+            raise LowlevelErrorException("\nThis Feedback Command\n    %s\nreturned an error:\n    %s" % ( culprit, lowlevelErrorToString(rcvBuffer[6]) ) )
 
+        if len(rcvBuffer) < 9 + self.dataLen:
+            raise LabJackException("Communication Failure: The Feedback response is %s bytes, expected %s. %s" % (len(rcvBuffer), self.readLen, _troubleshoot_comm_msg))
 
+        values = self.parser.unpack_from(rcvBuffer, 9)
+        if self.direct:
+            return list(values)
+        return [values[start] if handle is None else handle(values[start:end]) for handle, start, end in self.slices]
 
-def __listAllU3Unix():
-    """Private listAll function for unix and mac machines.  Works on the U3 only.
+
+class FeedbackPlanGroup(object):
     """
-    deviceList = {}
-    numDevices = staticLib.LJUSB_GetDevCount(LJ_dtU3)
+    FeedbackPlanGroup(device, commandlist)
+
+    Any number of Feedback commands for a U3 or U6, split in order into the
+    fewest Feedback packets that fit in MAX_USB_PACKET_LENGTH, both for the
+    request and the response. Each packet is a FeedbackPlan, and run()
+    returns all the results in the order of the commands. Over LJSocket
+    every request is sent with writeReadMany before the responses are
+    read, so the network round trips overlap. Make groups with U3.compileFeedbackMany or
+    U6.compileFeedbackMany.
+
+    >>> group = d.compileFeedbackMany([u6.AIN24(i) for i in range(16)])
+    >>> len(group.plans)
+    2
+    >>> group.run()
+    [8388608, 8388609, ...]
+    """
+    def __init__(self, device, commandlist):
+        self.device = device
+        self.plans = [FeedbackPlan(device, commands) for commands in _packFeedbackCommands(_flattenFeedbackCommands(commandlist))]
+        self.requests = [(plan.request, plan.readLen, []) for plan in self.plans]
 
-    for i in range(numDevices):
-        try:
-            device = openLabJack(LJ_dtU3, 1, firstFound = False, devNumber = i+1)
-            device.close()
-            
-            deviceList[str(device.serialNumber)] = device.__dict__
-        except LabJackException:
-            pass
-        
+    def __len__(self):
+        return sum([len(plan) for plan in self.plans])
 
-    return deviceList
+    def run(self):
+        """
+        Name: FeedbackPlanGroup.run()
+        Args: None
+        Desc: Sends every packet, and returns the list of results of all the
+              commands in order, just like getFeedback.
+        """
+        if len(self.plans) < 2:
+            return self.plans[0].run() if self.plans else []
 
+        responses = self.device.writeReadMany(self.requests, window = len(self.plans), checkBytes = False, checksum = False)
+        results = []
+        for plan, response in zip(self.plans, responses):
+            results.extend(plan.parse(response))
+        return results
 
-def __listAllU6Unix():
-    """ List all for U6s """
-    deviceList = {}
-    numDevices = staticLib.LJUSB_GetDevCount(LJ_dtU6)
 
-    for i in range(numDevices):
-        try:
-            device = openLabJack(LJ_dtU6, 1, firstFound = False, devNumber = i+1)
-            device.close()
-        
-            deviceList[str(device.serialNumber)] = device.__dict__
-        except LabJackException:
-            pass
+def _packFeedbackCommands(commands):
+    """
+    Splits a list of FeedbackCommands into the fewest groups, keeping their
+    order, whose Feedback request and response both fit in a packet. A
+    command that doesn't fit in a packet by itself gets its own group, and
+    FeedbackPlan raises the error.
+    """
+    groups = []
+    current = []
+    sendLen = 7
+    readLen = 9
+    for cmd in commands:
+        cmdSendLen = len(cmd.cmdBytes)
+        newSendLen = sendLen + cmdSendLen + ((sendLen + cmdSendLen) % 2)
+        newReadLen = readLen + cmd.readLen + ((readLen + cmd.readLen) % 2)
+        if current and (newSendLen > MAX_USB_PACKET_LENGTH or newReadLen > MAX_USB_PACKET_LENGTH):
+            groups.append(current)
+            current = []
+            sendLen = 7
+            readLen = 9
+        current.append(cmd)
+        sendLen += cmdSendLen
+        readLen += cmd.readLen
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _recvExactly(sock, numBytes):
+    """
+    Receives exactly numBytes from sock, and returns them as a bytearray.
+    """
+    buffer = bytearray(numBytes)
+    view = memoryview(buffer)
+    received = 0
+    while received < numBytes:
+        count = sock.recv_into(view[received:], numBytes - received)
+        if count == 0:
+            raise LabJackException("Communication Failure: The connection closed after %s of %s bytes." % (received, numBytes))
+        received += count
+    return buffer
 
-    return deviceList
 
-def setChecksum16(buffer):
-    total = 0;
+def _flattenFeedbackCommands(commandlist):
+    """
+    Returns the FeedbackCommands in commandlist and the lists in it, in
+    order. Anything else is ignored, as getFeedback always has.
+    """
+    commands = []
+    for cmd in commandlist:
+        if isinstance(cmd, FeedbackCommand):
+            commands.append(cmd)
+        elif isinstance(cmd, list):
+            commands.extend(_flattenFeedbackCommands(cmd))
+    return commands
 
-    for i in range(6, len(buffer)):
-        total += (buffer[i] & 0xff)
 
-    buffer[4] = (total & 0xff)
-    buffer[5] = ((total >> 8) & 0xff)
+def deviceFromStreamConfigSnapshot(snapshot):
+    """
+    Name: deviceFromStreamConfigSnapshot(snapshot)
+    Args: snapshot, a dictionary from Device.streamConfigSnapshot()
+    Desc: Makes an unopened device of the snapshot's class with the stream
+          configuration and calibration constants loaded, for converting
+          stream data with processStreamData without the device attached.
+    """
+    module = importlib.import_module(snapshot['module'])
+    deviceClass = getattr(module, snapshot['className'])
+    device = deviceClass(autoOpen = False)
+    device.loadStreamConfigSnapshot(snapshot)
+    return device
 
-    return buffer
 
+# Per worker process state of a StreamDecoderPool.
+_decoderDevice = None
+_decoderSlots = {}
 
-def setChecksum8(buffer, numBytes):
-    total = 0
 
-    for i in range(1, numBytes):
-        total += (buffer[i] & 0xff)
+def _decoderPoolInit(snapshot):
+    global _decoderDevice
+    _decoderDevice = deviceFromStreamConfigSnapshot(snapshot)
 
-    buffer[0] = (total & 0xff) + ((total >> 8) & 0xff)
-    buffer[0] = (buffer[0] & 0xff) + ((buffer[0] >> 8) & 0xff)
 
-    return buffer
+def _decoderPoolDecode(job):
+    slotName, data, length, offset, numBytes, asArrays = job
+    if slotName is not None:
+        slot = _decoderSlots.get(slotName)
+        if slot is None:
+            from multiprocessing import shared_memory
+            slot = _decoderSlots[slotName] = shared_memory.SharedMemory(name = slotName)
+        # A view, not a copy. The slot isn't reused until the result is
+        # back.
+        data = slot.buf[:length]
+
+    _decoderDevice.streamPacketOffset = offset
+    return dict(_decoderDevice.processStreamData(data, numBytes = numBytes, asArrays = asArrays))
+
+
+class StreamDecoderPool(object):
+    """
+    StreamDecoderPool(device, processes = None, asArrays = False,
+                      maxPending = None)
+
+    Converts raw stream blocks from device.streamData(convert = False) in a
+    pool of worker processes, so the conversion of several streaming devices
+    is not limited to one core by the GIL. Each worker gets a
+    streamConfigSnapshot() of the device and runs processStreamData on the
+    blocks it is sent. Blocks are passed through shared memory slots when
+    the Python version has multiprocessing.shared_memory (3.8+), and pickled
+    otherwise.
+
+    Results come back in the order the blocks were submitted. At most
+    maxPending blocks (default two per process) are converted at once;
+    submit waits for the oldest block when all are busy.
+
+    Take the pool's snapshot after streamConfig() and getCalibrationData(),
+    and make the pool before streamStart() or before the first block.
+
+    >>> pool = StreamDecoderPool(d)
+    >>> d.streamStart()
+    >>> for block in d.streamData(convert = False):
+    ...     pool.submit(block['result'])
+    ...     for r in pool.results():
+    ...         print(r['AIN0'][0])
+    >>> pool.close()
+    """
+    def __init__(self, device, processes = None, asArrays = False, maxPending = None):
+        import multiprocessing
+        try:
+            from multiprocessing import shared_memory
+        except ImportError:
+            shared_memory = None
+
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        if maxPending is None:
+            maxPending = 2 * processes
+        if maxPending < 1:
+            raise LabJackException("maxPending must be at least 1.")
+
+        snapshot = device.streamConfigSnapshot()
+        self.numBytes = device._streamPacketBytes()
+        self.samplesPerPacket = device.streamSamplesPerPacket
+        self.numChannels = len(device.streamChannelNumbers)
+        self.streamPacketOffset = device.streamPacketOffset
+        self.asArrays = asArrays
+
+        self.slots = []
+        self.slotSize = self.numBytes * device.packetsPerRequest
+        if shared_memory is not None:
+            self.slots = [shared_memory.SharedMemory(create = True, size = self.slotSize) for i in range(maxPending)]
+        self.freeSlots = collections.deque(range(maxPending))
+        self.pending = collections.deque()
+        self.ready = collections.deque()
+
+        self.pool = multiprocessing.Pool(processes, _decoderPoolInit, (snapshot,))
+
+    def submit(self, result):
+        """
+        Name: StreamDecoderPool.submit(result)
+        Args: result, the raw bytes of a stream block, the 'result' entry of
+                      a block returned by streamData(convert = False)
+        Desc: Sends a block to be converted. Blocks must be submitted in the
+              order they were read so the channels line up.
+        """
+        if not self.freeSlots:
+            self._collect(self.pending.popleft())
+
+        slotIndex = self.freeSlots.popleft()
+        length = len(result)
+        if self.slots and length <= self.slotSize:
+            slot = self.slots[slotIndex]
+            slot.buf[:length] = result
+            job = (slot.name, None, length, self.streamPacketOffset, self.numBytes, self.asArrays)
+        else:
+            job = (None, bytes(result), length, self.streamPacketOffset, self.numBytes, self.asArrays)
+
+        numSamples = (length // self.numBytes) * self.samplesPerPacket
+        self.streamPacketOffset = (self.streamPacketOffset + numSamples) % self.numChannels
+
+        self.pending.append((slotIndex, self.pool.apply_async(_decoderPoolDecode, (job,))))
+
+    def _collect(self, job):
+        slotIndex, asyncResult = job
+        try:
+            self.ready.append(asyncResult.get())
+        finally:
+            self.freeSlots.append(slotIndex)
+
+    def results(self, wait = False):
+        """
+        Name: StreamDecoderPool.results(wait = False)
+        Args: wait, if True wait for every submitted block to be converted
+        Desc: Yields the processStreamData dictionaries of the converted
+              blocks in submission order. Without wait it stops at the first
+              block that is still being converted.
+        """
+        while True:
+            if self.ready:
+                yield self.ready.popleft()
+            elif self.pending and (wait or self.pending[0][1].ready()):
+                self._collect(self.pending.popleft())
+            else:
+                return
+
+    def close(self):
+        """
+        Name: StreamDecoderPool.close()
+        Args: None
+        Desc: Waits for the submitted blocks, stops the worker processes
+              and frees the shared memory. Returns the results that had not
+              been read yet, in order.
+        """
+        try:
+            remaining = list(self.results(wait = True))
+            self.pool.close()
+            self.pool.join()
+        except Exception:
+            self.terminate()
+            raise
+        self._freeSlots()
+        return remaining
+
+    def terminate(self):
+        """
+        Name: StreamDecoderPool.terminate()
+        Args: None
+        Desc: Stops the worker processes right away, dropping the blocks
+              that have not been converted, and frees the shared memory.
+        """
+        self.pool.terminate()
+        self.pool.join()
+        self.pending.clear()
+        self._freeSlots()
+
+    def _freeSlots(self):
+        for slot in self.slots:
+            slot.close()
+            slot.unlink()
+        self.slots = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()
 
 
 class LJSocketHandle(object):
     """
     Class to replace a device handle with a socket to a LJSocket server.
+
+    scanResult is the device's entry from a scan, as returned by
+    parseline. Without one, the server is scanned for the device first.
+    Handles opened through an LJSocketClient are given back to it when
+    closed, so their connections can be used again.
     """
-    def __init__(self, ipAddress, port, devType, firstFound, pAddress):
+    def __init__(self, ipAddress, port, devType, firstFound, pAddress, scanResult = None, client = None):
+        self.crSocket = self.modbusSocket = self.spontSocket = None
+        self.client = client
         try:
-            serverSocket = socket.socket()
-            serverSocket.connect((ipAddress, port))
-            serverSocket.settimeout(SOCKET_TIMEOUT)
-            
-            f = serverSocket.makefile(bufsize = 0)
-            f.write("scan\r\n")
-            
-            l = f.readline().strip()
-            try:
-                status, numLines = l.split(' ')
-            except ValueError:
-                raise Exception("Received invalid line from LJSocket server: %s" % l)
-                
-            if status.lower().startswith('ok'):
-                lines = []
-                marked = None
-                for i in range(int(numLines)):
-                    l = f.readline().strip()
-                    dev = parseline(l)
-                    
-                    if devType == dev['prodId']:
-                        lines.append(dev)
-                        
-                        if not firstFound and (dev['localId'] == pAddress or dev['serial'] == pAddress):
-                            marked = dev                 
-                
-                f.close()
-                serverSocket.close()
-                
-                #print("Result of scan:")
-                #print(lines)
-                
-                if firstFound and len(lines) > 0:
-                    marked = lines[0]
-                elif marked is not None:
-                    pass
-                else:
-                    raise Exception("LabJack not found.")
-                    
-                if marked['crPort'] != 'x':
-                    self.crSocket = socket.socket()
-                    self.crSocket.connect((ipAddress, marked['crPort']))
-                    self.crSocket.settimeout(LJSOCKET_TIMEOUT)
-                else:
-                    self.crSocket = None
-                    
-                if marked['modbusPort'] != 'x':
-                    self.modbusSocket = socket.socket()
-                    self.modbusSocket.connect((ipAddress, marked['modbusPort']))
-                    self.modbusSocket.settimeout(LJSOCKET_TIMEOUT)
-                else:
-                    self.modbusSocket = None
-                    
-                if marked['spontPort'] != 'x':
-                    self.spontSocket = socket.socket()
-                    self.spontSocket.connect((ipAddress, marked['spontPort']))
-                    self.spontSocket.settimeout(LJSOCKET_TIMEOUT)
-                else:
-                    self.spontSocket = None
-                
-            else:
-                raise Exception("Received an error from LJSocket. It said '%s'" % l)
-            
+            if scanResult is None:
+                scanResult = _findLJSocketDevice(_scanLJSocket(ipAddress, port), devType, firstFound, pAddress)
+            self.scanResult = scanResult
+
+            self.crSocket = self._connect(ipAddress, scanResult['crPort'])
+            self.modbusSocket = self._connect(ipAddress, scanResult['modbusPort'])
+            self.spontSocket = self._connect(ipAddress, scanResult['spontPort'])
         except Exception:
             e = sys.exc_info()[1]
+            self._closeSockets()
             raise LabJackException(ec = LJE_LABJACK_NOT_FOUND, errorString = "Couldn't connect to a LabJack at %s:%s. The error was: %s" % (ipAddress, port, str(e)))
-    
-    def close(self):
+
+    def _connect(self, ipAddress, port):
+        if port == 'x':
+            return None
+        sock = socket.socket()
+        sock.connect((ipAddress, port))
+        sock.settimeout(LJSOCKET_TIMEOUT)
+        return sock
+
+    def _closeSockets(self):
         if self.crSocket is not None:
             self.crSocket.close()
             
@@ -3113,6 +3892,271 @@ class LJSocketHandle(object):
         if self.spontSocket is not None:
             self.spontSocket.close()
 
+    def isIdle(self):
+        """
+        Returns True if no socket has anything waiting to be read and none
+        was closed by the server, so the connections can be used again.
+        """
+        sockets = [sock for sock in (self.crSocket, self.modbusSocket, self.spontSocket) if sock is not None]
+        try:
+            readable = select.select(sockets, [], [], 0)[0]
+        except (socket.error, ValueError, select.error):
+            return False
+        return len(readable) == 0
+
+    def close(self):
+        if self.client is not None:
+            self.client.release(self)
+        else:
+            self._closeSockets()
+
+
+class LJSocketClient(object):
+    """
+    LJSocketClient(ipAddress = 'localhost', port = 6000, scanTTL = LJSOCKET_SCAN_TTL)
+
+    A client for one LJSocket server. It keeps its control connection open
+    between scans, and keeps the scan results for scanTTL seconds. The
+    connections to a device are kept when the device is closed, and used
+    again if the device is opened within scanTTL seconds, as long as
+    nothing was left unread on them. Opening a device again then needs no
+    round trips to the server. Connections idle for longer are closed.
+
+    listAll and Device.open(LJSocket = "host:port") use the client from
+    getLJSocketClient, so every device opened against a server shares it.
+
+    >>> client = getLJSocketClient("localhost", 6000)
+    >>> client.scan()
+    [{'prodId': 6, 'crPort': 6001, ...}]
+    >>> client.refresh()  # Scan again now
+    """
+    def __init__(self, ipAddress = 'localhost', port = 6000, scanTTL = LJSOCKET_SCAN_TTL):
+        self.ipAddress = ipAddress
+        self.port = int(port)
+        self.scanTTL = scanTTL
+        self.controlSocket = None
+        self.controlFile = None
+        self.scanResults = None
+        self.scanTime = None
+        self.idleHandles = dict()  # (prodId, serial) -> (LJSocketHandle, time released)
+        self.lock = threading.Lock()
+
+    def _connect(self):
+        self._disconnect()
+        self.controlSocket = socket.socket()
+        self.controlSocket.settimeout(SOCKET_TIMEOUT)
+        self.controlSocket.connect((self.ipAddress, self.port))
+        self.controlFile = self.controlSocket.makefile("rb")
+
+    def _disconnect(self):
+        if self.controlFile is not None:
+            self.controlFile.close()
+        if self.controlSocket is not None:
+            self.controlSocket.close()
+        self.controlSocket = self.controlFile = None
+
+    def _scan(self):
+        # The server may have closed the connection since the last scan,
+        # so try once more on a new connection.
+        for attempt in range(2):
+            if self.controlSocket is None:
+                self._connect()
+            try:
+                return _readLJSocketScan(self.controlSocket, self.controlFile)
+            except (socket.error, EOFError):
+                e = sys.exc_info()[1]
+                self._disconnect()
+                if attempt:
+                    raise e
+
+    def scan(self, refresh = False):
+        """
+        Name: LJSocketClient.scan(refresh = False)
+        Args: refresh, if True scan the server even if the last results
+                       haven't expired
+        Desc: Returns a list of the devices on the server, as dictionaries
+              from parseline. Results less than scanTTL seconds old are
+              returned without asking the server.
+        """
+        with self.lock:
+            now = _monotonic()
+            if refresh or self.scanResults is None or now - self.scanTime >= self.scanTTL:
+                self.scanResults = self._scan()
+                self.scanTime = now
+            return [dict(dev) for dev in self.scanResults]
+
+    def refresh(self):
+        """
+        Name: LJSocketClient.refresh()
+        Args: None
+        Desc: Scans the server now and returns the results, like
+              scan(refresh = True).
+        """
+        return self.scan(refresh = True)
+
+    def openHandle(self, devType, firstFound = True, pAddress = None):
+        """
+        Name: LJSocketClient.openHandle(devType, firstFound = True,
+                                        pAddress = None)
+        Args: devType, the product ID of the device
+              firstFound, open the first device of devType
+              pAddress, the local ID or serial number of the device to open
+                        if firstFound is False
+        Desc: Returns an LJSocketHandle to the device, using the idle
+              connections from when it was last closed if there are any.
+              Cached scan results that don't have the device are refreshed
+              once before giving up.
+        """
+        try:
+            dev = _findLJSocketDevice(self.scan(), devType, firstFound, pAddress)
+        except LabJackException:
+            dev = _findLJSocketDevice(self.refresh(), devType, firstFound, pAddress)
+
+        self._closeExpiredHandles()
+        with self.lock:
+            handle, released = self.idleHandles.pop((dev['prodId'], dev['serial']), (None, None))
+        if handle is not None:
+            if handle.scanResult == dev and handle.isIdle():
+                return handle
+            handle._closeSockets()
+
+        return LJSocketHandle(self.ipAddress, self.port, devType, firstFound, pAddress, scanResult = dev, client = self)
+
+    def release(self, handle):
+        """
+        Name: LJSocketClient.release(handle)
+        Args: handle, an LJSocketHandle from openHandle
+        Desc: Keeps the handle's connections for the next time its device is
+              opened, or closes them if something was left unread on them.
+              Called by LJSocketHandle.close.
+        """
+        key = (handle.scanResult['prodId'], handle.scanResult['serial'])
+        if not handle.isIdle():
+            handle._closeSockets()
+            return
+
+        # Keep this handle, and close the one kept before it, if any.
+        with self.lock:
+            previous, released = self.idleHandles.get(key, (None, None))
+            self.idleHandles[key] = (handle, _monotonic())
+        if previous is not None:
+            previous._closeSockets()
+        self._closeExpiredHandles()
+
+    def _closeExpiredHandles(self):
+        # Closes the connections that have been idle for scanTTL seconds or
+        # more, so a long running program doesn't keep them open forever.
+        now = _monotonic()
+        expired = []
+        with self.lock:
+            for key, (handle, released) in list(self.idleHandles.items()):
+                if now - released >= self.scanTTL:
+                    expired.append(handle)
+                    del self.idleHandles[key]
+        for handle in expired:
+            handle._closeSockets()
+
+    def close(self):
+        """
+        Name: LJSocketClient.close()
+        Args: None
+        Desc: Closes the control connection and the idle device connections,
+              and forgets the scan results.
+        """
+        with self.lock:
+            self._disconnect()
+            for handle, released in self.idleHandles.values():
+                handle._closeSockets()
+            self.idleHandles = dict()
+            self.scanResults = self.scanTime = None
+
+
+_ljSocketClients = dict()
+_ljSocketClientsLock = threading.Lock()
+
+
+def _closeLJSocketClients():
+    # Closes the connections of every shared client when Python exits.
+    with _ljSocketClientsLock:
+        clients = list(_ljSocketClients.values())
+    for client in clients:
+        try:
+            client.close()
+        except (socket.error, IOError):
+            pass
+
+atexit.register(_closeLJSocketClients)
+
+
+def getLJSocketClient(ipAddress = 'localhost', port = 6000):
+    """
+    Name: getLJSocketClient(ipAddress = 'localhost', port = 6000)
+    Args: ipAddress, the address of the LJSocket server
+          port, its port
+    Desc: Returns the shared LJSocketClient for the server, making it the
+          first time.
+    """
+    key = (ipAddress, int(port))
+    with _ljSocketClientsLock:
+        client = _ljSocketClients.get(key)
+        if client is None:
+            client = _ljSocketClients[key] = LJSocketClient(ipAddress, port)
+        return client
+
+
+def _readLJSocketScan(sock, f):
+    """
+    Sends scan on an LJSocket control connection, and returns the devices
+    from the response as dictionaries from parseline.
+    """
+    sock.sendall(b"scan\r\n")
+
+    l = f.readline()
+    if not l:
+        raise EOFError("LJSocket closed the connection.")
+    l = l.decode("ascii").strip()
+    try:
+        status, numLines = l.split(' ')
+    except ValueError:
+        raise LabJackException("Received invalid line from LJSocket server: %s" % l)
+
+    if not status.lower().startswith('ok'):
+        raise LabJackException("Received an error from LJSocket. It said '%s'" % l)
+
+    lines = []
+    for i in range(int(numLines)):
+        lines.append(parseline(f.readline().decode("ascii").strip()))
+    return lines
+
+
+def _scanLJSocket(ipAddress, port):
+    """
+    Scans an LJSocket server on a new connection.
+    """
+    serverSocket = socket.socket()
+    serverSocket.settimeout(SOCKET_TIMEOUT)
+    serverSocket.connect((ipAddress, int(port)))
+    f = serverSocket.makefile("rb")
+    try:
+        return _readLJSocketScan(serverSocket, f)
+    finally:
+        f.close()
+        serverSocket.close()
+
+
+def _findLJSocketDevice(devices, devType, firstFound, pAddress):
+    """
+    Picks the device to open from LJSocket scan results.
+    """
+    lines = [dev for dev in devices if dev['prodId'] == devType]
+    if firstFound and len(lines) > 0:
+        return lines[0]
+    if not firstFound:
+        for dev in lines:
+            if dev['localId'] == pAddress or dev['serial'] == pAddress:
+                return dev
+    raise LabJackException(ec = LJE_LABJACK_NOT_FOUND, errorString = "LabJack not found.")
+
         
 def parseline(line):
     prodId, crPort, modbusPort, spontPort, localId, serial = line.split(' ')
@@ -3126,6 +4170,47 @@ def parseline(line):
     return { 'prodId' : int(prodId), 'crPort' : crPort, 'modbusPort' : modbusPort, 'spontPort' : spontPort, 'localId' : int(localId), 'serial' : int(serial)  }
 
 
+class EmulatedHandle(object):
+    """
+    The base class of handles that answer in software instead of a device,
+    like LabJackSimulator.EmulatedU6. A Device with one as its handle
+    writes its commands to it, and reads the responses and stream data from
+    it, in place of the driver or sockets. devType is the device type it
+    answers as.
+
+    Subclasses must override write, read and streamRead. The versions here
+    raise a LabJackException naming the subclass and the missing method.
+    """
+    devType = None
+
+    def _notImplemented(self, method):
+        raise LabJackException("%s doesn't implement EmulatedHandle.%s." % (type(self).__name__, method))
+
+    def write(self, data, modbus = False):
+        """
+        Receives the bytes of a low-level command, or of a Modbus request
+        when modbus is True.
+        """
+        self._notImplemented('write')
+
+    def read(self, numBytes, modbus = False):
+        """
+        Returns the response to the oldest command not read yet, at most
+        numBytes bytes of it. modbus is the same as for write.
+        """
+        self._notImplemented('read')
+
+    def streamRead(self, numBytes, timeout):
+        """
+        Returns at most numBytes bytes of stream data, waiting up to timeout
+        seconds for them.
+        """
+        self._notImplemented('streamRead')
+
+    def close(self):
+        pass
+
+
 #Class for handling UE9 TCP Connections
 class UE9TCPHandle(object):
     """__UE9TCPHandle(ipAddress)
@@ -3167,6 +4252,211 @@ class UE9TCPHandle(object):
             print("UE9 Handle close exception: %s" % e)
             pass
 
+
+class UE9StreamFramer(object):
+    """
+    UE9StreamFramer(sock, packetBytes = 46, bufferPackets = 256, device = None)
+
+    Splits the UE9's TCP stream data into whole stream packets. TCP can
+    return any part of a packet from a recv, so bytes are received into one
+    preallocated buffer and only handed out as whole packets. Each packet
+    is checked against the StreamData header bytes and both checksums.
+    When a packet doesn't check out, bytes are dropped up to the next
+    header so the packets line up again, and resyncs and discardedBytes are
+    counted.
+
+    The buffer doesn't wrap around. When it gets near the end, the bytes
+    not handed out yet are moved to the front, so packets are always
+    contiguous for processStreamData. Take packets out as they come in, or
+    fill() raises a LabJackException when the buffer is full.
+
+    fill() works on blocking and non-blocking sockets, and the framer has a
+    fileno(), so one thread can read from many UE9s with selectors:
+
+    >>> framer = d.streamFramer
+    >>> d.handle.stream.setblocking(False)
+    >>> selector.register(framer, selectors.EVENT_READ, d)
+    >>> for key, events in selector.select():
+    ...     key.fileobj.fill()
+    ...     while key.fileobj.available() >= 4:
+    ...         data = key.data.processStreamData(key.fileobj.packets(4))
+
+    With asyncio, receive into freeSpace() and pass the count to commit().
+    Bytes from elsewhere, like the UD driver, can be added with feed().
+
+    device, if set, is the UE9 the socket belongs to. What fill() receives
+    is recorded in its metrics and trace, since it doesn't go through the
+    device's reads.
+    """
+    HEADER = b"\xf9\x14\xc0"
+
+    def __init__(self, sock, packetBytes = 46, bufferPackets = 256, device = None):
+        if bufferPackets < 2:
+            raise LabJackException("A UE9StreamFramer needs room for at least two packets.")
+        self.sock = sock
+        self.device = device
+        self.packetBytes = packetBytes
+        self.buffer = bytearray(packetBytes * bufferPackets)
+        self.view = memoryview(self.buffer)
+        self.clear()
+
+    def clear(self):
+        """
+        Name: UE9StreamFramer.clear()
+        Args: None
+        Desc: Throws away all buffered bytes and resets the counts.
+        """
+        self.start = 0    # The first byte not handed out yet
+        self.checked = 0  # The end of the packets that checked out
+        self.end = 0      # The end of the received bytes
+        self.resyncs = 0
+        self.discardedBytes = 0
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def available(self):
+        """
+        Name: UE9StreamFramer.available()
+        Args: None
+        Desc: Returns the number of whole packets ready to be taken.
+        """
+        return (self.checked - self.start) // self.packetBytes
+
+    def packets(self, numPackets = None):
+        """
+        Name: UE9StreamFramer.packets(numPackets = None)
+        Args: numPackets, the most packets to take. None takes all of them.
+        Desc: Takes whole packets out of the buffer and returns them as
+              bytes, which may be empty.
+        """
+        count = self.available()
+        if numPackets is not None:
+            count = min(count, numPackets)
+
+        stop = self.start + count * self.packetBytes
+        result = bytes(self.buffer[self.start:stop])
+        self.start = stop
+        if self.start == self.end:
+            self.start = self.checked = self.end = 0
+        return result
+
+    def freeSpace(self):
+        """
+        Name: UE9StreamFramer.freeSpace()
+        Args: None
+        Desc: Returns a memoryview of the free end of the buffer to receive
+              into. Call commit() with the number of bytes received.
+        """
+        if len(self.buffer) - self.end < self.packetBytes and self.start > 0:
+            remaining = self.end - self.start
+            self.buffer[:remaining] = self.buffer[self.start:self.end]
+            self.checked -= self.start
+            self.end = remaining
+            self.start = 0
+
+        if self.end == len(self.buffer):
+            raise LabJackException("The UE9 stream buffer is full. Take packets out of it faster, or make it bigger.")
+        return self.view[self.end:]
+
+    def commit(self, numBytes):
+        """
+        Name: UE9StreamFramer.commit(numBytes)
+        Args: numBytes, the number of bytes received into freeSpace()
+        Desc: Adds received bytes and checks the packets they complete.
+        """
+        self.end += numBytes
+        self._frame()
+
+    def feed(self, data):
+        """
+        Name: UE9StreamFramer.feed(data)
+        Args: data, bytes of stream data
+        Desc: Copies data into the buffer and checks the packets it
+              completes.
+        """
+        pos = 0
+        while pos < len(data):
+            space = self.freeSpace()
+            count = min(len(space), len(data) - pos)
+            space[:count] = data[pos:pos + count]
+            pos += count
+            self.commit(count)
+
+    def fill(self):
+        """
+        Name: UE9StreamFramer.fill()
+        Args: None
+        Desc: Receives once from the socket. Returns the number of bytes
+              received, which is 0 if a non-blocking socket had nothing to
+              read. A blocking socket raises socket.timeout as usual.
+        """
+        space = self.freeSpace()
+        try:
+            count = self.sock.recv_into(space)
+        except socket.error:
+            e = sys.exc_info()[1]
+            if e.args and e.args[0] in (errno.EAGAIN, errno.EWOULDBLOCK):
+                return 0
+            raise
+        if count == 0:
+            raise LabJackException("Communication Failure: The UE9 closed the stream connection.")
+        if self.device is not None:
+            self.device._streamReceived(space, count)
+        self.commit(count)
+        return count
+
+    def read(self, numPackets):
+        """
+        Name: UE9StreamFramer.read(numPackets)
+        Args: numPackets, the number of packets to read
+        Desc: Receives until numPackets whole packets are ready, and returns
+              them as bytes. Only for blocking sockets.
+        """
+        while self.available() < numPackets:
+            self.fill()
+        return self.packets(numPackets)
+
+    def _isPacket(self, pos):
+        buf = self.buffer
+        if buf[pos + 1] != 0xF9 or buf[pos + 2] != 0x14 or buf[pos + 3] != 0xC0:
+            return False
+        return LabJackChecksum.verifyChecksum(buf, self.packetBytes, pos)
+
+    def _frame(self):
+        numBytes = self.packetBytes
+        pos = self.checked
+        while self.end - pos >= numBytes:
+            if self._isPacket(pos):
+                pos += numBytes
+                continue
+
+            # Lost the packet boundary. The next packet can start one byte
+            # before the next header. Without one, keep the last bytes in
+            # case they are the start of a packet.
+            nextHeader = self.buffer.find(self.HEADER, pos + 2, self.end)
+            if nextHeader < 0:
+                resume = max(self.end - len(self.HEADER), pos + 1)
+            else:
+                resume = nextHeader - 1
+
+            dropped = resume - pos
+            self.buffer[pos:self.end - dropped] = self.buffer[resume:self.end]
+            self.end -= dropped
+            self.resyncs += 1
+            self.discardedBytes += dropped
+        self.checked = pos
+
+    def stats(self):
+        """
+        Name: UE9StreamFramer.stats()
+        Args: None
+        Desc: Returns a dictionary with the number of packets ready, the
+              buffered bytes, and the resyncs and discardedBytes counts.
+        """
+        return dict(available = self.available(), bufferedBytes = self.end - self.start, resyncs = self.resyncs, discardedBytes = self.discardedBytes)
+
+
 def toDouble(bytes):
     """
     Name: toDouble(buffer)
@@ -3204,6 +4494,70 @@ def toList(buffer):
     else:
         return [int(val) for val in buffer]
 
+def unpackStreamSamples(result, numBytes, trailerBytes = 0):
+    """
+    Name: unpackStreamSamples(result, numBytes, trailerBytes = 0)
+    Args: result, the raw stream data returned from streamData()
+          numBytes, the number of bytes per packet
+          trailerBytes, the number of extra bytes after each packet's footer.
+                        The UE9 appends 2 bytes to its USB stream packets.
+    Desc: Strips the headers and footers from every packet in a block of
+          stream data and returns all the samples as one flat NumPy array of
+          unsigned 16-bit integers. Any partial packet at the end of the
+          block is ignored. Requires NumPy.
+    """
+    numpy = _numpy()
+    raw = numpy.frombuffer(result, dtype = numpy.uint8)
+    numPackets = len(raw) // numBytes
+    packets = raw[:numPackets*numBytes].reshape(numPackets, numBytes)
+    samples = numpy.ascontiguousarray(packets[:, 12:(numBytes - 2 - trailerBytes)])
+    return samples.view('<u2').ravel()
+
+def parseStreamPacketHeaders(result, numBytes, trailerBytes = 0):
+    """
+    Name: parseStreamPacketHeaders(result, numBytes, trailerBytes = 0)
+    Args: result, the raw stream data returned from streamData()
+          numBytes, the number of bytes per packet
+          trailerBytes, the number of extra bytes after each packet's footer.
+                        The UE9 appends 2 bytes to its USB stream packets.
+    Desc: Reads the header and footer of every packet in a block of stream
+          data. Returns a dictionary of per packet values:
+          * errors: The error code of each packet.
+          * packetCounters: The PacketCounter of each packet.
+          * missed: The number of missed scans reported by each packet,
+                    which is only non-zero for error 60 packets.
+          * backlog: The backlog byte of each packet.
+          The values are NumPy arrays when NumPy is installed, and lists
+          otherwise. Any partial packet at the end of the block is ignored.
+    """
+    numPackets = len(result) // numBytes
+    backlogIndex = numBytes - 2 - trailerBytes
+
+    numpy = _numpy()
+    if numpy is not None:
+        raw = numpy.frombuffer(result, dtype = numpy.uint8, count = numPackets*numBytes)
+        packets = raw.reshape(numPackets, numBytes)
+        errors = packets[:, 11].copy()
+        missed = numpy.ascontiguousarray(packets[:, 6:10]).view('<u4').ravel()
+        missed = numpy.where(errors == 60, missed, 0)
+        return dict(errors = errors, packetCounters = packets[:, 10].copy(), missed = missed, backlog = packets[:, backlogIndex].copy())
+
+    errors = []
+    packetCounters = []
+    missed = []
+    backlog = []
+    for i in range(numPackets):
+        offset = i*numBytes
+        e = streamByteToInt(result[offset+11])
+        errors.append(e)
+        packetCounters.append(streamByteToInt(result[offset+10]))
+        if e == 60:
+            missed.append(unpack_from('<I', result, offset+6)[0])
+        else:
+            missed.append(0)
+        backlog.append(streamByteToInt(result[offset+backlogIndex]))
+    return dict(errors = errors, packetCounters = packetCounters, missed = missed, backlog = backlog)
+
 def streamByteToInt(byte):
     """
     Takes a byte from a stream read packet, which could be a
@@ -3826,3 +5180,31 @@ LJ_rgUNIP500V = 110 # 0V to +0.500V
 LJ_ioENABLE_POS_PULLDOWN = 2018 # U6
 LJ_ioENABLE_NEG_PULLDOWN = 2019 # U6
 LJ_rgAUTO = 0
+
+
+# The Windows UD driver functions are in LabJackUD, which is imported the
+# first time one of them is used.
+_UD_FUNCTIONS = frozenset([
+    'AddRequest', 'AddRequestS', 'AddRequestSS', 'Go', 'GoOne',
+    'eGet', 'eGetRaw', 'eGetS', 'eGetSS', 'eGetRawS',
+    'ePut', 'ePutS', 'ePutSS',
+    'GetResult', 'GetResultS', 'GetResultSS', 'GetFirstResult', 'GetNextResult',
+    'StringToConstant', 'eAIN', 'eDAC', 'eDI', 'eDO', 'eTCConfig', 'eTCValues',
+    'ErrorToString', 'TCVoltsToTemp', 'Close', 'LJHash'
+    ])
+
+if sys.version_info >= (3, 7):
+    def __getattr__(name):
+        if name in _UD_FUNCTIONS:
+            import LabJackUD
+            return getattr(LabJackUD, name)
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+else:
+    # Modules can't have __getattr__ before Python 3.7.
+    from LabJackUD import *
+
+# Every public name, and the UD functions, which aren't in the module until
+# LabJackUD is imported, so "from LabJackPython import *" still gives them.
+# Star importing imports LabJackUD to look them up, but doesn't load the
+# driver.
+__all__ = sorted(set([name for name in globals() if not name.startswith('_')]) | _UD_FUNCTIONS)
@@ -0,0 +1,924 @@
+"""
+Name: LabJackSimulator.py
+Desc: A stand-in for the Exodriver that answers like U3, U6 and UE9 devices
+      on USB, so LabJackPython can be run and benchmarked without hardware.
+      simulate() puts a SimulatedExodriver in place of LabJackPython's
+      staticLib, and u3.U3(), u6.U6() and ue9.UE9() then open the
+      simulated devices.
+
+      Responses are protocol correct: they have the command bytes and
+      checksums the device would send, and no errors. The configuration
+      responses have each device's serial number, local ID and versions.
+      Other responses, like Feedback, are the length that was read and
+      their data bytes are zero. Stream packets have a counting
+      PacketCounter and samples of a sine wave. With sampleRate set,
+      stream data comes no faster than a device streaming at that rate
+      would send it.
+
+      EmulatedU6 answers like a U6 in more detail: Feedback reads inputs
+      and sets outputs, and stream data is made in real time into a
+      buffer that overflows like the device's when it isn't read fast
+      enough. Every simulated device is also an EmulatedHandle, so
+      openEmulated() can open a device on one directly, with no driver.
+
+>>> import u6, LabJackSimulator
+>>> with LabJackSimulator.simulate([LabJackSimulator.SimulatedDevice(6)]) as driver:
+...     d = u6.U6()
+...     print(d.getFeedback(u6.AIN24(0)))
+...     d.close()
+
+>>> d = LabJackSimulator.openEmulated(u6.U6(autoOpen = False), LabJackSimulator.EmulatedU6())
+>>> d.getFeedback(u6.AIN24(14))
+[10047232]
+"""
+import contextlib
+import ctypes
+import errno
+import math
+import threading
+import time
+
+from collections import deque
+from struct import pack, pack_into
+
+import LabJackPython
+import u6
+from LabJackPython import EmulatedHandle, LJ_dtU3, LJ_dtU6, LJ_dtUE9, LabJackException, setChecksum, setChecksum8, setChecksum16, verifyChecksum, _monotonic
+
+
+# One cycle of the sine wave in stream packets, as 16-bit samples. It is
+# repeated so a packet's samples never wrap around the end.
+_SINE_SAMPLES = 1024
+_SINE_BYTES = b"".join([pack("<H", int(32768 + 30000 * math.sin(2 * math.pi * i / _SINE_SAMPLES))) for i in range(_SINE_SAMPLES)]) * 2
+
+# The first handle given out. Handles are never 0, which is a failed open.
+_FIRST_HANDLE = 0x1000
+
+
+class SimulatedDevice(EmulatedHandle):
+    """
+    SimulatedDevice(devType, serialNumber = None, localId = 1,
+                    sampleRate = None, commandLatency = 0)
+
+    A U3 (devType 3), U6 (6) or UE9 (9) on the simulated USB bus.
+    serialNumber defaults to a different number for each device.
+    sampleRate is the samples per second the stream sends, for all
+    channels together. None sends stream data as fast as it is read.
+    commandLatency is the seconds each command response takes.
+
+    Attributes:
+    commands -- the number of commands answered
+    streamPackets -- the number of stream packets sent
+    """
+    _count = 0
+
+    def __init__(self, devType, serialNumber = None, localId = 1, sampleRate = None, commandLatency = 0):
+        if devType not in (LJ_dtU3, LJ_dtU6, LJ_dtUE9):
+            raise LabJackException("Only U3, U6 and UE9 devices can be simulated, not device type %s." % devType)
+
+        SimulatedDevice._count += 1
+        if serialNumber is None:
+            serialNumber = (0x10000000 if devType == LJ_dtUE9 else 320000000) + SimulatedDevice._count
+
+        self.devType = devType
+        self.serialNumber = serialNumber
+        self.localId = localId
+        self.sampleRate = sampleRate
+        self.commandLatency = commandLatency
+        self.isOpen = False
+        self.requests = deque()
+        self.commands = 0
+        self.streamPackets = 0
+        self.streamChannels = 1
+        self.streamSamplesPerPacket = 16 if devType == LJ_dtUE9 else 25
+        self.streaming = False
+
+    def _packetBytes(self):
+        if self.devType == LJ_dtUE9:
+            return 48  # 46 bytes and 2 more on USB
+        return 14 + 2 * self.streamSamplesPerPacket
+
+    def write(self, request, modbus = False):
+        """
+        Name: SimulatedDevice.write(request, modbus = False)
+        Args: request, the bytes of a low-level command
+              modbus, ignored
+        Desc: Receives a command. Its response is made when it is read.
+        """
+        request = bytearray(request)
+        if len(request) >= 4 and request[1] == 0xF8 and request[3] == 0x11:
+            # StreamConfig
+            self.streamChannels = max(request[6], 1)
+            if self.devType == LJ_dtU6:
+                self.streamSamplesPerPacket = request[8]
+            elif self.devType == LJ_dtU3:
+                self.streamSamplesPerPacket = request[7]
+        elif request[:2] == bytearray([0xA8, 0xA8]):
+            self.streaming = True
+            self.streamPackets = 0
+            self.streamStartTime = _monotonic()
+        elif request[:2] == bytearray([0xB0, 0xB0]):
+            self.streaming = False
+        self.requests.append(request)
+
+    def read(self, numBytes, modbus = False):
+        """
+        Name: SimulatedDevice.read(numBytes, modbus = False)
+        Args: numBytes, the number of bytes to read
+              modbus, ignored
+        Desc: Returns the response to the oldest command not read yet, or
+              no bytes if there isn't one.
+        """
+        if not self.requests:
+            return b""
+
+        request = self.requests.popleft()
+        self.commands += 1
+        if self.commandLatency:
+            time.sleep(self.commandLatency)
+
+        if request[:2] in (bytearray([0xA8, 0xA8]), bytearray([0xB0, 0xB0])):
+            # StreamStart or StreamStop: checksum, command, error, 0.
+            response = bytearray([0, request[0] + 1, 0, 0])
+            response[0] = response[1]
+            return bytes(response[:numBytes])
+
+        return self._genericResponse(request, numBytes)
+
+    def _genericResponse(self, request, numBytes):
+        if len(request) < 6:
+            # Other short commands, like the UE9's FlushBuffer, are echoed.
+            return bytes(request[:numBytes])
+
+        if request[1] == 0x78:
+            response = self._commConfigResponse()
+        elif request[1] == 0xF8 and request[3] == 0x08:
+            if self.devType == LJ_dtUE9:
+                response = self._controlConfigResponse()
+            else:
+                response = self._configResponse()
+        else:
+            response = bytearray(max(numBytes, 9))
+            response[1] = 0xF8
+            response[2] = (len(response) - 6) // 2
+            response[3] = request[3]
+            if request[3] == 0x00 and self.devType != LJ_dtUE9:
+                # The U3 and U6 echo byte of Feedback
+                response[8] = request[6]
+
+        setChecksum(response)
+        return bytes(response[:numBytes])
+
+    def close(self):
+        """
+        Name: SimulatedDevice.close()
+        Args: None
+        Desc: Stops streaming and forgets the commands not read yet.
+        """
+        self.isOpen = False
+        self.streaming = False
+        self.requests.clear()
+
+    def _configResponse(self):
+        # ConfigU3 or ConfigU6
+        response = bytearray(38)
+        response[1:4] = bytearray([0xF8, 0x10, 0x08])
+        response[9:11] = bytearray([30, 1])  # Firmware 1.30
+        response[11:13] = bytearray([0, 1])
+        response[13:15] = bytearray([0, 2])
+        response[15:19] = bytearray(pack("<I", self.serialNumber))
+        response[21] = self.localId & 0xff
+        response[37] = 12 if self.devType == LJ_dtU6 else 2  # U6-Pro, U3-LV
+        return response
+
+    def _commConfigResponse(self):
+        response = bytearray(38)
+        response[1:4] = bytearray([0x78, 0x10, 0x01])
+        response[8] = self.localId & 0xff
+        response[10:14] = bytearray([209, 1, 168, 192])  # 192.168.1.209
+        response[27] = LJ_dtUE9
+        response[28:31] = bytearray(pack("<I", self.serialNumber)[:3])
+        response[31:34] = bytearray([0x10, 0x24, 0x00])
+        response[34:36] = bytearray([0, 1])
+        response[36:38] = bytearray([56, 1])  # Comm firmware 1.56
+        return response
+
+    def _controlConfigResponse(self):
+        response = bytearray(24)
+        response[1:4] = bytearray([0xF8, 0x09, 0x08])
+        response[9:11] = bytearray([21, 2])  # Control firmware 2.21
+        response[11:13] = bytearray([0, 1])
+        response[13] = 1  # UE9-Pro
+        return response
+
+    def streamAvailable(self):
+        """
+        Name: SimulatedDevice.streamAvailable()
+        Args: None
+        Desc: Returns the number of stream packets that can be read now.
+        """
+        if not self.streaming:
+            return 0
+        if self.sampleRate is None:
+            return None
+        scans = (_monotonic() - self.streamStartTime) * self.sampleRate
+        return int(scans // self.streamSamplesPerPacket) - self.streamPackets
+
+    def streamRead(self, numBytes, timeout):
+        """
+        Name: SimulatedDevice.streamRead(numBytes, timeout)
+        Args: numBytes, the number of bytes to read
+              timeout, the most seconds to wait for them
+        Desc: Returns whole stream packets, as many as fit in numBytes and
+              have been sent by timeout.
+        """
+        if not self.streaming:
+            return b""
+
+        packetBytes = self._packetBytes()
+        numPackets = numBytes // packetBytes
+        available = self.streamAvailable()
+        if available is not None and available < numPackets:
+            wait = float(numPackets - available) * self.streamSamplesPerPacket / self.sampleRate
+            time.sleep(max(min(wait, timeout), 0))
+            numPackets = max(min(numPackets, self.streamAvailable()), 0)
+
+        trailer = 2 if self.devType == LJ_dtUE9 else 0
+        end = packetBytes - trailer
+        sampleBytes = 2 * self.streamSamplesPerPacket
+        block = bytearray(numPackets * packetBytes)
+        for offset in range(0, len(block), packetBytes):
+            start = (self.streamPackets * sampleBytes) % (2 * _SINE_SAMPLES)
+            block[offset + 1] = 0xF9
+            block[offset + 2] = (end - 6) // 2
+            block[offset + 3] = 0xC0
+            block[offset + 10] = self.streamPackets & 0xff
+            block[offset + 12:offset + 12 + sampleBytes] = _SINE_BYTES[start:start + sampleBytes]
+            total = sum(block[offset + 6:offset + end])
+            block[offset + 4] = total & 0xff
+            block[offset + 5] = (total >> 8) & 0xff
+            total = sum(block[offset + 1:offset + 6])
+            total = (total & 0xff) + (total >> 8)
+            block[offset] = (total & 0xff) + (total >> 8)
+            self.streamPackets += 1
+        return bytes(block)
+
+
+# The U6's stream buffer, in 16-bit samples.
+STREAM_BUFFER_SAMPLES = 2048
+
+# Low-level error codes the EmulatedU6 answers with.
+_STREAM_IS_ACTIVE = 48
+_STREAM_CONFIG_INVALID = 50
+_STREAM_NOT_RUNNING = 52
+_STREAM_SCAN_RATE_INVALID = 58
+_STREAM_AUTORECOVER_ACTIVE = 59
+_STREAM_AUTORECOVER_REPORT = 60
+_IOTYPE_NOT_VALID = 101
+
+# The U6 Feedback IOTypes: the bytes of each command, with the IOType, and
+# of its response.
+_U6_IOTYPES = {
+    1: (3, 2),  # AIN
+    2: (4, 3),  # AIN24
+    3: (4, 5),  # AIN24AR
+    5: (2, 0),  # WaitShort
+    6: (2, 0),  # WaitLong
+    9: (2, 0),  # LED
+    10: (2, 1),  # BitStateRead
+    11: (2, 0),  # BitStateWrite
+    12: (2, 1),  # BitDirRead
+    13: (2, 0),  # BitDirWrite
+    26: (1, 3),  # PortStateRead
+    27: (7, 0),  # PortStateWrite
+    28: (1, 3),  # PortDirRead
+    29: (7, 0),  # PortDirWrite
+    34: (2, 0),  # DAC0 8-bit
+    35: (2, 0),  # DAC1 8-bit
+    38: (3, 0),  # DAC0 16-bit
+    39: (3, 0),  # DAC1 16-bit
+    42: (4, 4),  # Timer0
+    43: (4, 0),  # Timer0Config
+    44: (4, 4),  # Timer1
+    45: (4, 0),  # Timer1Config
+    46: (4, 4),  # Timer2
+    47: (4, 0),  # Timer2Config
+    48: (4, 4),  # Timer3
+    49: (4, 0),  # Timer3Config
+    54: (2, 4),  # Counter0
+    55: (2, 4),  # Counter1
+    }
+
+# The calibration constants in each block of U6 calibration memory, in the
+# order U6.getCalibrationData reads them.
+_U6_CALIBRATION_BLOCKS = [
+    ("ain10vSlope", "ain10vOffset", "ain1vSlope", "ain1vOffset"),
+    ("ain100mvSlope", "ain100mvOffset", "ain10mvSlope", "ain10mvOffset"),
+    ("ain10vNegSlope", "ain10vCenter", "ain1vNegSlope", "ain1vCenter"),
+    ("ain100mvNegSlope", "ain100mvCenter", "ain10mvNegSlope", "ain10mvCenter"),
+    ("dac0Slope", "dac0Offset", "dac1Slope", "dac1Offset"),
+    ("currentOutput0", "currentOutput1", "temperatureSlope", "temperatureOffset"),
+    ("proAin10vSlope", "proAin10vOffset", "proAin1vSlope", "proAin1vOffset"),
+    ("proAin100mvSlope", "proAin100mvOffset", "proAin10mvSlope", "proAin10mvOffset"),
+    ("proAin10vNegSlope", "proAin10vCenter", "proAin1vNegSlope", "proAin1vCenter"),
+    ("proAin100mvNegSlope", "proAin100mvCenter", "proAin10mvNegSlope", "proAin10mvCenter"),
+    ]
+
+# The highest volts measured at each gain index.
+_U6_RANGES = [10.0, 1.0, 0.1, 0.01]
+
+
+def _fromDouble(value):
+    # The 8 byte fixed point format toDouble reads.
+    whole = int(math.floor(value))
+    fraction = int(round((value - whole) * 2**32))
+    if fraction == 2**32:
+        whole += 1
+        fraction = 0
+    return bytearray(pack("<Ii", fraction, whole))
+
+
+class EmulatedU6(SimulatedDevice):
+    """
+    EmulatedU6(serialNumber = None, localId = 1, signals = None,
+               bufferSamples = STREAM_BUFFER_SAMPLES, commandLatency = 0)
+
+    A U6-Pro that answers ConfigU6, Feedback, calibration memory reads,
+    StreamConfig, StreamStart and StreamStop like the device does,
+    checksums and error codes included. Open a u6.U6 on it with
+    openEmulated, or put it on the simulated USB bus with simulate().
+
+    signals maps analog input numbers to functions of the seconds since the
+    EmulatedU6 was made, which return the input's volts. Inputs without one
+    read a 1 V sine wave of (input + 1) Hz, except AIN14, the temperature
+    sensor, which reads 25 C, and AIN15, which is ground. Readings are
+    converted with the nominal calibration constants, which are also what
+    the calibration memory holds.
+
+    Stream scans are made in real time at the configured scan rate, into a
+    buffer of bufferSamples samples that reads take whole packets from.
+    When reads fall behind and the buffer is full, auto-recovery starts:
+    new scans are dropped and the packets sent have error 59. It ends when
+    a packet's worth of the buffer is free, and the first packet with the
+    scans after it has error 60 and the number of dropped scans in bytes
+    6-9. The backlog byte is the bytes left in the buffer after the packet,
+    divided by 256.
+
+    Attributes:
+    dac -- the volts of DAC0 and DAC1
+    dioState, dioDirection -- the state and direction of the 20 digital
+                              lines, FIO0 in bit 0 to CIO3 in bit 19
+    dioInputs -- the state read from digital lines set to input, all high
+                 by default like the pull-ups make them
+    missedScans -- the scans dropped by auto-recovery since the stream
+                   started
+    """
+    def __init__(self, serialNumber = None, localId = 1, signals = None, bufferSamples = STREAM_BUFFER_SAMPLES, commandLatency = 0):
+        SimulatedDevice.__init__(self, LJ_dtU6, serialNumber, localId, commandLatency = commandLatency)
+        self.signals = dict(signals or {})
+        self.bufferSamples = bufferSamples
+        self.calInfo = u6.CalibrationInfo()
+        self.startTime = _monotonic()
+        self.lock = threading.Lock()
+        self.responses = deque()
+
+        self.dac = [0.0, 0.0]
+        self.dioState = 0
+        self.dioDirection = 0
+        self.dioInputs = 0xFFFFF
+        self.led = 1
+
+        self.streamConfigured = False
+        self.streamChannelList = []
+        self.scanRate = None
+        self.missedScans = 0
+        self._resetStream()
+
+    def _resetStream(self):
+        self.streamStartTime = _monotonic()
+        self.streamScans = 0
+        self.streamPackets = 0
+        self.streamRuns = deque()
+        self.bufferedSamples = 0
+        self.autoRecovering = False
+        self.recoveryMissed = 0
+
+    def write(self, request, modbus = False):
+        """
+        Name: EmulatedU6.write(request, modbus = False)
+        Args: request, the bytes of a low-level command
+              modbus, ignored
+        Desc: Runs a command and keeps its response to be read.
+        """
+        request = bytearray(request)
+        with self.lock:
+            self.responses.append((request, self._respond(request)))
+
+    def read(self, numBytes, modbus = False):
+        """
+        Name: EmulatedU6.read(numBytes, modbus = False)
+        Args: numBytes, the number of bytes to read
+              modbus, ignored
+        Desc: Returns the response to the oldest command not read yet, or
+              no bytes if there isn't one.
+        """
+        if not self.responses:
+            return b""
+
+        request, response = self.responses.popleft()
+        self.commands += 1
+        if self.commandLatency:
+            time.sleep(self.commandLatency)
+
+        if response is None:
+            return self._genericResponse(request, numBytes)
+        return bytes(response[:numBytes])
+
+    def close(self):
+        """
+        Name: EmulatedU6.close()
+        Args: None
+        Desc: Stops streaming and forgets the responses not read yet.
+        """
+        SimulatedDevice.close(self)
+        self.responses.clear()
+
+    def _respond(self, request):
+        # The response to a command, or None for the generic one.
+        if request[:2] == bytearray([0xA8, 0xA8]):
+            return self._streamStart()
+        if request[:2] == bytearray([0xB0, 0xB0]):
+            return self._streamStop()
+        if len(request) < 6 or request[1] != 0xF8:
+            return None
+        if not verifyChecksum(request):
+            return bytearray([0xB8, 0xB8])
+
+        command = request[3]
+        if command == 0x00:
+            return self._feedback(request)
+        elif command == 0x08:
+            response = self._configResponse()
+        elif command == 0x11:
+            response = self._streamConfig(request)
+        elif command == 0x2D and len(request) >= 8 and request[7] < len(_U6_CALIBRATION_BLOCKS):
+            response = bytearray(8)
+            response[1:4] = bytearray([0xF8, 0x11, 0x2D])
+            for name in _U6_CALIBRATION_BLOCKS[request[7]]:
+                response.extend(_fromDouble(getattr(self.calInfo, name)))
+        else:
+            return None
+        setChecksum(response)
+        return response
+
+    def _volts(self, channel, t):
+        signal = self.signals.get(channel)
+        if signal is not None:
+            return signal(t)
+        if channel == 14:
+            return (298.15 - self.calInfo.temperatureOffset) / self.calInfo.temperatureSlope
+        if channel == 15:
+            return 0.0
+        return math.sin(2 * math.pi * (channel + 1) * t)
+
+    def _ainBinary(self, channel, gainIndex, differential, t):
+        # The 16-bit reading of an input at time t.
+        volts = self._volts(channel, t)
+        if differential:
+            volts -= self._volts(channel + 1, t)
+        gainIndex &= 3
+        center = self.calInfo.ainCenter[gainIndex]
+        if volts >= 0:
+            binary = center + volts / self.calInfo.ainSlope[gainIndex]
+        else:
+            binary = center - volts / self.calInfo.ainNegSlope[gainIndex]
+        return max(0, min(int(round(binary)), 0xFFFF))
+
+    def _autoRange(self, channel, differential, t):
+        # The highest gain index whose range fits the input.
+        volts = self._volts(channel, t)
+        if differential:
+            volts -= self._volts(channel + 1, t)
+        for gainIndex in range(3, 0, -1):
+            if abs(volts) < _U6_RANGES[gainIndex]:
+                return gainIndex
+        return 0
+
+    def _feedback(self, request):
+        response = bytearray(9)
+        response[1] = 0xF8
+        response[8] = request[6]
+        t = _monotonic() - self.startTime
+
+        i = 7
+        frame = 0
+        while i < len(request) and request[i] != 0:
+            ioType = request[i]
+            frame += 1
+            if ioType not in _U6_IOTYPES or i + _U6_IOTYPES[ioType][0] > len(request):
+                response[6] = _IOTYPE_NOT_VALID
+                response[7] = frame
+                break
+            size = _U6_IOTYPES[ioType][0]
+            response.extend(self._feedbackCommand(ioType, request[i + 1:i + size], t))
+            i += size
+
+        if len(response) % 2:
+            response.append(0)
+        response[2] = (len(response) - 6) // 2
+        setChecksum(response)
+        return response
+
+    def _feedbackCommand(self, ioType, args, t):
+        # The response bytes of one Feedback command.
+        if ioType == 1:
+            return bytearray(pack("<H", self._ainBinary(args[0], 0, False, t)))
+        elif ioType in (2, 3):
+            gainIndex = args[1] >> 4
+            differential = bool(args[2] & 0x80)
+            if gainIndex > 3:
+                gainIndex = self._autoRange(args[0], differential, t)
+            binary = self._ainBinary(args[0], gainIndex, differential, t) << 8
+            data = bytearray(pack("<I", binary)[:3])
+            if ioType == 3:
+                data.extend([(args[1] & 0xf) | (gainIndex << 4), 0])
+            return data
+        elif ioType == 5:
+            time.sleep(args[0] * 128e-6)
+        elif ioType == 6:
+            time.sleep(args[0] * 32e-3)
+        elif ioType == 9:
+            self.led = args[0]
+        elif ioType in (10, 12):
+            line = args[0] % 20
+            if ioType == 12:
+                return bytearray([(self.dioDirection >> line) & 1])
+            return bytearray([(self._dioRead() >> line) & 1])
+        elif ioType in (11, 13):
+            line = args[0] & 0x1f
+            bit = 1 << (line % 20)
+            value = bit if args[0] & 0x80 else 0
+            if ioType == 11:
+                self.dioState = (self.dioState & ~bit) | value
+            else:
+                self.dioDirection = (self.dioDirection & ~bit) | value
+        elif ioType in (26, 28):
+            value = self._dioRead() if ioType == 26 else self.dioDirection
+            return bytearray(pack("<I", value)[:3])
+        elif ioType in (27, 29):
+            mask = args[0] | (args[1] << 8) | (args[2] << 16)
+            value = args[3] | (args[4] << 8) | (args[5] << 16)
+            if ioType == 27:
+                self.dioState = (self.dioState & ~mask) | (value & mask)
+            else:
+                self.dioDirection = (self.dioDirection & ~mask) | (value & mask)
+        elif ioType in (34, 35, 38, 39):
+            dac = ioType % 2
+            binary = args[0] << 8 if ioType < 38 else args[0] | (args[1] << 8)
+            self.dac[dac] = (binary - self.calInfo.dacOffset[dac]) / self.calInfo.dacSlope[dac]
+        return bytearray(_U6_IOTYPES[ioType][1])
+
+    def _dioRead(self):
+        # Outputs read their state, and inputs what is driving them.
+        return (self.dioState & self.dioDirection) | (self.dioInputs & ~self.dioDirection & 0xFFFFF)
+
+    def _streamConfig(self, request):
+        response = bytearray(8)
+        response[1:4] = bytearray([0xF8, 0x01, 0x11])
+
+        numChannels = request[6]
+        samplesPerPacket = request[8]
+        clock = 48000000.0 if request[11] & 0x08 else 4000000.0
+        if request[11] & 0x02:
+            clock /= 256
+        scanInterval = request[12] | (request[13] << 8)
+
+        if self.streaming:
+            response[6] = _STREAM_IS_ACTIVE
+        elif numChannels < 1 or len(request) < 14 + 2 * numChannels or not 1 <= samplesPerPacket <= 25:
+            response[6] = _STREAM_CONFIG_INVALID
+        elif scanInterval == 0:
+            response[6] = _STREAM_SCAN_RATE_INVALID
+        else:
+            self.streamChannelList = [(request[14 + 2*i], (request[15 + 2*i] >> 4) & 3, bool(request[15 + 2*i] & 0x80)) for i in range(numChannels)]
+            self.streamChannels = numChannels
+            self.streamSamplesPerPacket = samplesPerPacket
+            self.scanRate = clock / scanInterval
+            self.streamConfigured = True
+        return response
+
+    def _streamStart(self):
+        response = [0, 0xA9, 0, 0]
+        if self.streaming:
+            response[2] = _STREAM_IS_ACTIVE
+        elif not self.streamConfigured:
+            response[2] = _STREAM_CONFIG_INVALID
+        else:
+            self._resetStream()
+            self.missedScans = 0
+            self.streaming = True
+        return bytearray(setChecksum8(response, 4))
+
+    def _streamStop(self):
+        response = [0, 0xB1, 0, 0]
+        if not self.streaming:
+            response[2] = _STREAM_NOT_RUNNING
+        self.streaming = False
+        return bytearray(setChecksum8(response, 4))
+
+    def _streamAdvance(self, now):
+        # Puts the scans made since the last call into the buffer, or drops
+        # them while auto-recovery is on. Reads only happen between calls,
+        # so the buffer just fills up in between.
+        scans = int((now - self.streamStartTime) * self.scanRate)
+        newScans = scans - self.streamScans
+        if newScans <= 0:
+            return
+        numChannels = self.streamChannels
+
+        free = self.bufferSamples - self.bufferedSamples
+        if self.autoRecovering and free >= max(self.streamSamplesPerPacket, numChannels):
+            self.autoRecovering = False
+
+        kept = 0 if self.autoRecovering else min(newScans, free // numChannels)
+        if kept:
+            # Where the samples start, how many, and the scans dropped
+            # before them.
+            self.streamRuns.append([self.streamScans * numChannels, kept * numChannels, self.recoveryMissed])
+            self.recoveryMissed = 0
+            self.bufferedSamples += kept * numChannels
+        if kept < newScans:
+            self.autoRecovering = True
+            self.recoveryMissed += newScans - kept
+            self.missedScans += newScans - kept
+        self.streamScans = scans
+
+    def _takePackets(self, numPackets):
+        samplesPerPacket = self.streamSamplesPerPacket
+        numChannels = self.streamChannels
+        packetBytes = 14 + 2 * samplesPerPacket
+        # Scan times are from when the EmulatedU6 was made, like Feedback's.
+        startTime = self.streamStartTime - self.startTime
+        block = bytearray()
+        for i in range(numPackets):
+            packet = bytearray(packetBytes)
+            packet[1:4] = bytearray([0xF9, 4 + samplesPerPacket, 0xC0])
+            missed = 0
+            offset = 12
+            needed = samplesPerPacket
+            while needed:
+                run = self.streamRuns[0]
+                missed += run[2]
+                run[2] = 0
+                count = min(needed, run[1])
+                for sample in range(run[0], run[0] + count):
+                    channel, gainIndex, differential = self.streamChannelList[sample % numChannels]
+                    t = startTime + (sample // numChannels) / self.scanRate
+                    pack_into("<H", packet, offset, self._ainBinary(channel, gainIndex, differential, t))
+                    offset += 2
+                run[0] += count
+                run[1] -= count
+                needed -= count
+                if run[1] == 0:
+                    self.streamRuns.popleft()
+            self.bufferedSamples -= samplesPerPacket
+
+            if missed:
+                pack_into("<I", packet, 6, missed)
+                packet[11] = _STREAM_AUTORECOVER_REPORT
+            elif self.autoRecovering:
+                packet[11] = _STREAM_AUTORECOVER_ACTIVE
+            packet[10] = self.streamPackets & 0xff
+            packet[packetBytes - 2] = min(2 * self.bufferedSamples // 256, 255)
+            setChecksum16(packet)
+            setChecksum8(packet, 6)
+            block.extend(packet)
+            self.streamPackets += 1
+        return block
+
+    def streamAvailable(self):
+        """
+        Name: EmulatedU6.streamAvailable()
+        Args: None
+        Desc: Returns the number of whole stream packets in the buffer.
+        """
+        with self.lock:
+            if not self.streaming:
+                return 0
+            self._streamAdvance(_monotonic())
+            return self.bufferedSamples // self.streamSamplesPerPacket
+
+    def streamRead(self, numBytes, timeout):
+        """
+        Name: EmulatedU6.streamRead(numBytes, timeout)
+        Args: numBytes, the number of bytes to read
+              timeout, the most seconds to wait for them
+        Desc: Returns whole stream packets, as many as fit in numBytes, or
+              fewer if they aren't all made by timeout. Packets are taken
+              from the buffer as they are made, like a USB read does.
+        """
+        deadline = _monotonic() + timeout
+        block = bytearray()
+        while True:
+            with self.lock:
+                if not self.streaming:
+                    return bytes(block)
+                samplesPerPacket = self.streamSamplesPerPacket
+                packetBytes = 14 + 2 * samplesPerPacket
+                now = _monotonic()
+                self._streamAdvance(now)
+                numPackets = numBytes // packetBytes - len(block) // packetBytes
+                taken = min(numPackets, self.bufferedSamples // samplesPerPacket)
+                block.extend(self._takePackets(taken))
+                if taken == numPackets or now >= deadline:
+                    return bytes(block)
+                needed = (numPackets - taken) * samplesPerPacket - self.bufferedSamples
+                # Wakes up before half the buffer fills, so a long read
+                # keeps up like the USB transfer would.
+                samplesPerSecond = self.scanRate * self.streamChannels
+                wait = min(needed, self.bufferSamples // 2) / samplesPerSecond
+            time.sleep(max(min(wait, deadline - now), 0))
+
+
+class _Function(object):
+    # Stands in for a ctypes function, so restype, argtypes and errcheck
+    # can be set on it like LabJackPython does.
+    def __init__(self, function):
+        self.function = function
+
+    def __call__(self, *args):
+        return self.function(*args)
+
+
+def _value(arg):
+    # The Python value of a ctypes argument, or a byref() of one.
+    arg = getattr(arg, "_obj", arg)
+    return getattr(arg, "value", arg)
+
+
+class SimulatedExodriver(object):
+    """
+    SimulatedExodriver(devices)
+
+    Has the Exodriver functions LabJackPython uses, answering for a list of
+    SimulatedDevices.
+    """
+    def __init__(self, devices):
+        self.devices = list(devices)
+        self.handles = dict()
+        self.lock = threading.Lock()
+        self.nextHandle = _FIRST_HANDLE
+
+        for name in ("LJUSB_OpenDevice", "LJUSB_OpenAllDevices", "LJUSB_CloseDevice", "LJUSB_IsHandleValid", "LJUSB_GetDevCount", "LJUSB_GetDevCounts", "LJUSB_GetLibraryVersion", "LJUSB_Write", "LJUSB_Read", "LJUSB_StreamTO"):
+            setattr(self, name, _Function(getattr(self, "_" + name)))
+
+    def _device(self, handle):
+        return self.handles.get(_value(handle))
+
+    def _ofType(self, devType):
+        return [device for device in self.devices if device.devType == devType]
+
+    def _open(self, device):
+        if device.isOpen:
+            ctypes.set_errno(errno.EBUSY)
+            return None
+        device.isOpen = True
+        handle = self.nextHandle
+        self.nextHandle += 1
+        self.handles[handle] = device
+        return handle
+
+    def _LJUSB_OpenDevice(self, devNum, dwReserved, productId):
+        devices = self._ofType(_value(productId))
+        if not 1 <= devNum <= len(devices):
+            ctypes.set_errno(errno.ENODEV)
+            return None
+        with self.lock:
+            return self._open(devices[devNum - 1])
+
+    def _LJUSB_OpenAllDevices(self, handles, productIds, maxDevices):
+        handles = getattr(handles, "_obj", handles)
+        productIds = getattr(productIds, "_obj", productIds)
+        count = 0
+        with self.lock:
+            for device in self.devices:
+                if count >= _value(maxDevices):
+                    break
+                handle = self._open(device)
+                if handle is not None:
+                    handles[count] = handle
+                    productIds[count] = device.devType
+                    count += 1
+        return count
+
+    def _LJUSB_CloseDevice(self, handle):
+        with self.lock:
+            device = self.handles.pop(_value(handle), None)
+            if device is not None:
+                device.close()
+
+    def _LJUSB_IsHandleValid(self, handle):
+        return self._device(handle) is not None
+
+    def _LJUSB_GetDevCount(self, productId):
+        return len(self._ofType(_value(productId)))
+
+    def _LJUSB_GetDevCounts(self, counts, productIds, n):
+        counts = getattr(counts, "_obj", counts)
+        productIds = getattr(productIds, "_obj", productIds)
+        for i, devType in enumerate([LJ_dtU3, LJ_dtU6, LJ_dtUE9, 1][:_value(n)]):
+            productIds[i] = devType
+            counts[i] = len(self._ofType(devType))
+        return sum(counts)
+
+    def _LJUSB_GetLibraryVersion(self):
+        return 2.07
+
+    def _LJUSB_Write(self, handle, buffer, count):
+        device = self._device(handle)
+        if device is None:
+            return 0
+        device.write(ctypes.string_at(buffer, count))
+        return count
+
+    def _LJUSB_Read(self, handle, buffer, count):
+        device = self._device(handle)
+        if device is None:
+            return 0
+        data = device.read(count)
+        ctypes.memmove(buffer, data, len(data))
+        return len(data)
+
+    def _LJUSB_StreamTO(self, handle, buffer, count, timeout):
+        device = self._device(handle)
+        if device is None:
+            return 0
+        data = device.streamRead(count, timeout / 1000.0)
+        ctypes.memmove(buffer, data, len(data))
+        return len(data)
+
+
+_saved = []
+
+
+def install(devices = None):
+    """
+    Name: install(devices = None)
+    Args: devices, a list of SimulatedDevices. Defaults to one U3, one U6
+                   and one UE9.
+    Desc: Puts a SimulatedExodriver for devices in place of LabJackPython's
+          driver and returns it. uninstall() puts the driver back.
+    """
+    if devices is None:
+        devices = [SimulatedDevice(LJ_dtU3), SimulatedDevice(LJ_dtU6), SimulatedDevice(LJ_dtUE9)]
+
+    driver = SimulatedExodriver(devices)
+    _saved.append((LabJackPython.staticLib, LabJackPython._os_name))
+    LabJackPython.staticLib = driver
+    LabJackPython._os_name = "posix"
+    return driver
+
+
+def uninstall():
+    """
+    Name: uninstall()
+    Args: None
+    Desc: Puts back the driver that the last install() replaced.
+    """
+    LabJackPython.staticLib, LabJackPython._os_name = _saved.pop()
+
+
+@contextlib.contextmanager
+def simulate(devices = None):
+    """
+    Name: simulate(devices = None)
+    Args: devices, the same as install()
+    Desc: A with statement context that installs a SimulatedExodriver and
+          uninstalls it at the end.
+    """
+    driver = install(devices)
+    try:
+        yield driver
+    finally:
+        uninstall()
+
+
+def openEmulated(device, handle):
+    """
+    Name: openEmulated(device, handle)
+    Args: device, a u3.U3, u6.U6 or ue9.UE9 made with autoOpen = False
+          handle, the EmulatedHandle to open it on, like an EmulatedU6
+    Desc: Opens device on handle, reading its configuration like opening
+          it over USB does, and returns device. No driver is used, so this
+          works with simulate() installed or not.
+
+    >>> d = openEmulated(u6.U6(autoOpen = False), EmulatedU6(bufferSamples = 1024))
+    """
+    if device.handle is not None:
+        raise LabJackException("The device is already open.")
+
+    opened = LabJackPython._makeDeviceFromHandle(handle, handle.devType)
+    device.handle = handle
+    device._loadChangedIntoSelf(opened)
+    device._registerAtExitClose()
+    return device
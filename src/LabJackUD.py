@@ -0,0 +1,1159 @@
+"""
+Name: LabJackUD.py
+Desc: Wrappers of the Windows UD driver functions, like eGet, ePut,
+      AddRequest and GoOne. They were in LabJackPython, which imports this
+      module the first time one of them is used, so LabJackPython.eGet
+      still works. Only the Exodriver functions are needed on Mac and
+      Linux, and they don't need this module.
+"""
+import ctypes
+
+from struct import pack
+
+import LabJackPython
+from LabJackPython import (
+    LJ_ioRAW_IN,
+    LabJackException,
+    _os_name,
+    staticLib,
+    )
+
+
+#Windows
+def AddRequest(Handle, IOType, Channel, Value, x1, UserData):
+    """AddRequest(handle, ioType, channel, value, x1, userData)
+        
+    Windows Only
+    """
+    if _os_name == 'nt':
+        v = ctypes.c_double(Value)
+        ud = ctypes.c_double(UserData)
+        
+        ec = staticLib.AddRequest(Handle, IOType, Channel, v, x1, ud)
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+
+#Windows
+def AddRequestS(Handle, pIOType, Channel, Value, x1, UserData):
+    """Add a request to the LabJackUD request stack
+    
+    For Windows
+    
+    Sample Usage to get the AIN value from channel 0:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequestS(u3Handle,"LJ_ioGET_AIN", 0, 0.0, 0, 0.0)
+    >>> Go()
+    >>> value = GetResult(u3Handle, LJ_ioGET_AIN, 0)
+    >>> print("Value: " + str(value))
+    Value: 0.366420765873
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: String
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    @type  UserData: number
+    @param UserData: Used for some requests
+    
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        v = ctypes.c_double(Value)
+        ud = ctypes.c_double(UserData)
+        
+        ec = staticLib.AddRequestS(Handle, pIOType, Channel, v, x1, ud)
+
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def AddRequestSS(Handle, pIOType, pChannel, Value, x1, UserData):
+    """Add a request to the LabJackUD request stack
+    
+    For Windows
+    
+    Sample Usage to get the AIN value from channel 0:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
+    >>> Go()
+    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
+    >>> print("Value: " + str(value))
+    Value: 1.27
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: String
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: String
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    @type  UserData: number
+    @param UserData: Used for some requests
+    
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':      
+        v = ctypes.c_double(Value)
+        ud = ctypes.c_double(UserData)
+        
+        ec = staticLib.AddRequestSS(Handle, pIOType, pChannel, v, x1, ud)
+
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def Go():
+    """Complete all requests currently on the LabJackUD request stack
+
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
+    >>> Go()
+    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
+    >>> print("Value: " + str(value))
+    Value: 1.27
+    
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    
+    if _os_name == 'nt':
+        ec = staticLib.Go()
+
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException("Function only supported for Windows")
+
+#Windows
+def GoOne(Handle):
+    """Performs the next request on the LabJackUD request stack
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
+    >>> GoOne(u3Handle)
+    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
+    >>> print("Value: " + str(value))
+    Value: 1.27
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        ec = staticLib.GoOne(Handle)
+
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def eGet(Handle, IOType, Channel, pValue, x1):
+    """Perform one call to the LabJack Device
+    
+    eGet is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> eGet(u3Handle, LJ_ioGET_AIN, 0, 0, 0)
+    0.39392614550888538
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: number
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    
+    @rtype: number
+    @return: Returns the value requested.
+        - value
+        
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double(pValue)
+        #ppv = ctypes.pointer(pv)
+        ec = staticLib.eGet(Handle, IOType, Channel, ctypes.byref(pv), x1)
+        #staticLib.eGet.argtypes = [ctypes.c_long, ctypes.c_long, ctypes.c_long, ctypes.c_double, ctypes.c_long]
+        #ec = staticLib.eGet(Handle, IOType, Channel, pValue, x1)
+        
+        if ec != 0: raise LabJackException(ec)
+        #print("EGet:" + str(ppv))
+        #print("Other:" + str(ppv.contents))
+        return pv.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+
+#Windows
+#Raw method -- Used because x1 is an output
+def eGetRaw(Handle, IOType, Channel, pValue, x1):
+    """Perform one call to the LabJack Device as a raw command
+    
+    eGetRaw is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage (Calling a echo command):
+    
+    >>> sendBuff = [0] * 2
+    >>> sendBuff[0] = 0x70
+    >>> sendBuff[1] = 0x70
+    >>> eGetRaw(ue9Handle, LJ_ioRAW_OUT, 0, len(sendBuff), sendBuff)
+    (2.0, [112, 112])
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: number
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    @type  pValue: number
+    @param Value: Length of the buffer.
+    @type  x1: number
+    @param x1: Buffer to send.
+    
+    @rtype: Tuple
+    @return: The tuple (numBytes, returnBuffer)
+        - numBytes (number)
+        - returnBuffer (List)
+        
+    @raise LabJackException:
+    """
+    ec = 0
+    x1Type = "int"
+    if _os_name == 'nt':
+        digitalConst = [35, 36, 37, 45]
+        pv = ctypes.c_double(pValue)
+
+        #If IOType is digital then call eget with x1 as a long
+        if IOType in digitalConst:
+            ec = staticLib.eGet(Handle, IOType, Channel, ctypes.byref(pv), x1)
+        else: #Otherwise as an array
+            
+            try:
+                #Verify x1 is an array
+                if len(x1) < 1:
+                    raise LabJackException(0, "x1 is not a valid variable for the given IOType") 
+            except Exception:
+                raise LabJackException(0, "x1 is not a valid variable for the given IOType")  
+            
+            #Initialize newA
+            newA = None
+            if type(x1[0]) == int:
+                newA = (ctypes.c_byte*len(x1))()
+                for i in range(len(x1)):
+                    newA[i] = ctypes.c_byte(x1[i])
+            else:
+                x1Type = "float"
+                newA = (ctypes.c_double*len(x1))()
+                for i in range(len(x1)):
+                    newA[i] = ctypes.c_double(x1[i])
+
+            #Use eGetPtr when x1 is a pointer. x1 is a void*, and can accept 32
+            #and 64-bit pointer addresses safely.
+            staticLib.load()  # Sets LabJackPython._use_ptr
+            if LabJackPython._use_ptr:
+                ec = staticLib.eGetPtr(Handle, IOType, Channel, ctypes.byref(pv), ctypes.byref(newA))
+            else:
+                #Using eGet if eGetPtr is not available.
+                ec = staticLib.eGet(Handle, IOType, Channel, ctypes.byref(pv), ctypes.byref(newA))
+            
+            if IOType == LJ_ioRAW_IN and Channel == 1:
+                # We return the raw byte string if we are streaming
+                x1 = pack('b' * len(x1), *newA)
+            elif IOType == LJ_ioRAW_IN and Channel == 0:
+                x1 = [0] * int(pv.value)
+                for i in range(len(x1)):
+                    x1[i] = newA[i] & 0xff
+                
+            else:
+                x1 = [0] * len(x1)
+                for i in range(len(x1)):
+                    x1[i] = newA[i]
+                    if x1Type == "int":
+                        x1[i] = x1[i] & 0xff
+            
+        if ec != 0: raise LabJackException(ec)
+        return pv.value, x1
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def eGetS(Handle, pIOType, Channel, pValue, x1):
+    """Perform one call to the LabJack Device
+    
+    eGet is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> eGet(u3Handle, "LJ_ioGET_AIN", 0, 0, 0)
+    0.39392614550888538
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  pIOType: String
+    @param pIOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    
+    @rtype: number
+    @return: Returns the value requested.
+        - value
+        
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double(pValue)
+        ec = staticLib.eGetS(Handle, pIOType, Channel, ctypes.byref(pv), x1)
+
+        if ec != 0: raise LabJackException(ec)
+        return pv.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def eGetSS(Handle, pIOType, pChannel, pValue, x1):
+    """Perform one call to the LabJack Device
+    
+    eGet is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> eGetSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0, 0)
+    1.27
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  pIOType: String
+    @param pIOType: IO Request to the LabJack.
+    @type  Channel: String
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    
+    @rtype: number
+    @return: Returns the value requested.
+        - value
+        
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double(pValue)
+        ec = staticLib.eGetSS(Handle, pIOType, pChannel, ctypes.byref(pv), x1)
+
+        if ec != 0: raise LabJackException(ec)
+        return pv.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+
+#Windows
+#Not currently implemented
+def eGetRawS(Handle, pIOType, Channel, pValue, x1):
+    """Function not yet implemented.
+    
+    For Windows only.
+    """
+    pass
+
+#Windows
+def ePut(Handle, IOType, Channel, Value, x1):
+    """Put one value to the LabJack device
+    
+    ePut is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
+    0.0
+    >>> ePut(u3Handle, LJ_ioPUT_CONFIG, LJ_chLOCALID, 8, 0)
+    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
+    8.0
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: number
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double(Value)
+        ec = staticLib.ePut(Handle, IOType, Channel, pv, x1)
+
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def ePutS(Handle, pIOType, Channel, Value, x1):
+    """Put one value to the LabJack device
+    
+    ePut is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
+    0.0
+    >>> ePutS(u3Handle, "LJ_ioPUT_CONFIG", LJ_chLOCALID, 8, 0)
+    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
+    8.0
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: String
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double(Value)
+        ec = staticLib.ePutS(Handle, pIOType, Channel, pv, x1)
+
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def ePutSS(Handle, pIOType, pChannel, Value, x1):
+    """Put one value to the LabJack device
+    
+    ePut is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
+    0.0
+    >>> ePutSS(u3Handle, "LJ_ioPUT_CONFIG", "LJ_chLOCALID", 8, 0)
+    >>> eGet(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0)
+    8.0
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: String
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: String
+    @param Channel: Channel for the IO request.
+    @type  Value: number
+    @param Value: Used for some requests
+    @type  x1: number
+    @param x1: Used for some requests
+    
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double(Value)
+        ec = staticLib.ePutSS(Handle, pIOType, pChannel, pv, x1)
+
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def GetResult(Handle, IOType, Channel):
+    """Put one value to the LabJack device
+    
+    ePut is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
+    >>> GoOne(u3Handle)
+    >>> value = GetResult(u3Handle, LJ_ioGET_CONFIG, LJ_chFIRMWARE_VERSION)
+    >>> print("Value: " + str(value))
+    Value: 1.27
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  IOType: number
+    @param IOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    
+    @rtype: number
+    @return: The value requested.
+        - value
+        
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double()
+        ec = staticLib.GetResult(Handle, IOType, Channel, ctypes.byref(pv))
+
+        if ec != 0: raise LabJackException(ec)          
+        return pv.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def GetResultS(Handle, pIOType, Channel):
+    """Put one value to the LabJack device
+    
+    ePut is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
+    >>> GoOne(u3Handle)
+    >>> value = GetResultS(u3Handle, "LJ_ioGET_CONFIG", LJ_chFIRMWARE_VERSION)
+    >>> print("Value: " + str(value))
+    Value: 1.27
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  pIOType: String
+    @param pIOType: IO Request to the LabJack.
+    @type  Channel: number
+    @param Channel: Channel for the IO request.
+    
+    @rtype: number
+    @return: The value requested.
+        - value
+        
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double()
+        ec = staticLib.GetResultS(Handle, pIOType, Channel, ctypes.byref(pv))
+
+        if ec != 0: raise LabJackException(ec)          
+        return pv.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def GetResultSS(Handle, pIOType, pChannel):
+    """Put one value to the LabJack device
+    
+    ePut is equivilent to an AddRequest followed by a GoOne.
+    
+    For Windows Only
+    
+    Sample Usage:
+    
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequestSS(u3Handle,"LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION", 0.0, 0, 0.0)
+    >>> GoOne(u3Handle)
+    >>> value = GetResultSS(u3Handle, "LJ_ioGET_CONFIG", "LJ_chFIRMWARE_VERSION")
+    >>> print("Value:" + str(value))
+    Value: 1.27
+    
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  pIOType: String
+    @param pIOType: IO Request to the LabJack.
+    @type  Channel: String
+    @param Channel: Channel for the IO request.
+    
+    @rtype: number
+    @return: The value requested.
+        - value
+        
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pv = ctypes.c_double()
+        ec = staticLib.GetResultSS(Handle, pIOType, pChannel, ctypes.byref(pv))
+
+        if ec != 0: raise LabJackException(ec)
+        return pv.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def GetFirstResult(Handle):
+    """List All LabJack devices of a specific type over a specific connection type.
+
+    For Windows only.
+
+    Sample Usage (Shows getting the localID (8) and firmware version (1.27) of a U3 device):
+
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0, 0)
+    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chFIRMWARE_VERSION, 0, 0, 0)
+    >>> Go()
+    >>> GetFirstResult(u3Handle)
+    (1001, 0, 8.0, 0, 0.0)
+    >>> GetNextResult(u3Handle)
+    (1001, 11, 1.27, 0, 0.0)
+
+    @type  DeviceType: number
+    @param DeviceType: The LabJack device.
+    @type  ConnectionType: number
+    @param ConnectionType: The connection method (Ethernet/USB).
+    
+    @rtype: Tuple
+    @return: The tuple (ioType, channel, value, x1, userData)
+        - ioType (number): The io of the result.
+        - serialNumber (number): The channel of the result.
+        - value (number): The requested result.
+        - x1 (number):  Used only in certain requests.
+        - userData (number): Used only in certain requests.
+        
+    @raise LabJackException: 
+    """   
+    if _os_name == 'nt':     
+        pio = ctypes.c_long()
+        pchan = ctypes.c_long()
+        pv = ctypes.c_double()
+        px = ctypes.c_long()
+        pud = ctypes.c_double()
+        ec = staticLib.GetFirstResult(Handle, ctypes.byref(pio), 
+                                       ctypes.byref(pchan), ctypes.byref(pv), 
+                                       ctypes.byref(px), ctypes.byref(pud))
+
+        if ec != 0: raise LabJackException(ec)          
+        return pio.value, pchan.value, pv.value, px.value, pud.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def GetNextResult(Handle):
+    """List All LabJack devices of a specific type over a specific connection type.
+
+    For Windows only.
+
+    Sample Usage (Shows getting the localID (8) and firmware version (1.27) of a U3 device):
+
+    >>> u3Handle = OpenLabJack(LJ_dtU3, LJ_ctUSB, "0", 1)
+    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chLOCALID, 0, 0, 0)
+    >>> AddRequest(u3Handle, LJ_ioGET_CONFIG, LJ_chFIRMWARE_VERSION, 0, 0, 0)
+    >>> Go()
+    >>> GetFirstResult(u3Handle)
+    (1001, 0, 8.0, 0, 0.0)
+    >>> GetNextResult(u3Handle)
+    (1001, 11, 1.27, 0, 0.0)
+
+    @type  DeviceType: number
+    @param DeviceType: The LabJack device.
+    @type  ConnectionType: number
+    @param ConnectionType: The connection method (Ethernet/USB).
+    
+    @rtype: Tuple
+    @return: The tuple (ioType, channel, value, x1, userData)
+        - ioType (number): The io of the result.
+        - serialNumber (number): The channel of the result.
+        - value (number): The requested result.
+        - x1 (number):  Used only in certain requests.
+        - userData (number): Used only in certain requests.
+        
+    @raise LabJackException: 
+    """ 
+    if _os_name == 'nt':
+        pio = ctypes.c_long()
+        pchan = ctypes.c_long()
+        pv = ctypes.c_double()
+        px = ctypes.c_long()
+        pud = ctypes.c_double()
+        ec = staticLib.GetNextResult(Handle, ctypes.byref(pio), 
+                                       ctypes.byref(pchan), ctypes.byref(pv), 
+                                       ctypes.byref(px), ctypes.byref(pud))
+
+        if ec != 0: raise LabJackException(ec)          
+        return pio.value, pchan.value, pv.value, px.value, pud.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def StringToConstant(pString):
+    """Converts an LabJackUD valid string to its constant value.
+
+    For Windows
+
+    Sample Usage:
+
+    >>> StringToConstant("LJ_dtU3")
+    3
+    
+    @type  pString: String
+    @param pString: String to be converted.
+    
+    @rtype: number
+    @return: The number (base 10) that represents the LabJackUD string.
+    """
+    if _os_name == 'nt':
+        a = ctypes.create_string_buffer(pString, 256)
+        return staticLib.StringToConstant(a)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def eAIN(Handle, ChannelP, ChannelN=199, Range=0, Resolution=0, Settling=0, Binary=False):
+    """An easy function that returns a reading from one analog input.
+        
+    Windows Only
+
+    Sample Usage:
+    
+    >>> import LabJackPython as LJUD
+    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
+    >>> AIN1Val = LJUD.eAIN(d.handle, 1)
+
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  ChannelP: number
+    @param ChannelP: The positive AIN channel to acquire.
+    @type  ChannelN: number
+    @param ChannelN: The negative AIN channel to acquire.
+    @type  Range: number
+    @param Range: Input range setting. Ignored on the U3.
+    @type  Resolution: number
+    @param Resolution: See Datasheet Section 2.6 and the eAIN function reference.
+    @type  Settling: number
+    @param Settling: See Datasheet Section 2.6 and the eAIN function reference.
+    @type  Binary: boolean
+    @param Binary: Setting to True or a non-zero value will return 
+                   'Voltage' as a binary value.
+
+    @rtype: number
+    @return: Returns the analog input reading, which is generally a voltage.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        chp = ctypes.c_long(ChannelP)
+        chn = ctypes.c_long(ChannelN)
+        volts = ctypes.c_double()
+        rng = ctypes.c_long(Range)
+        res = ctypes.c_long(Resolution)
+        settling = ctypes.c_long(Settling)
+        binary = ctypes.c_long(Binary)
+        ec = staticLib.eAIN(Handle, chp, chn, ctypes.byref(volts), rng, res, settling, binary, 0, 0)
+        if ec != 0: raise LabJackException(ec)
+        return volts.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def eDAC(Handle, Channel, Voltage, Binary=False):
+    """An easy function that writes a value to one analog output.
+        
+    Windows Only
+
+    Sample Usage:
+    
+    >>> import LabJackPython as LJUD
+    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
+    >>> channel = 1 # Target DAC1
+    >>> voltage = 3.5   # Set the output to 3.5V
+    >>> LJUD.eDAC(d.handle, channel, voltage)
+
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  Channel: number
+    @param Channel: DAC channel number.
+    @type  Voltage: number
+    @param Voltage: Desired voltage to output.
+    @type  Binary: boolean
+    @param Binary: Setting to True or a non-zero value will pass 
+                   'Voltage' as a binary value.
+
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        ch = ctypes.c_long(Channel)
+        val = ctypes.c_double(Voltage)
+        binary = ctypes.c_long(Binary)
+        ec = staticLib.eDAC(Handle, ch, val, binary, 0, 0)
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def eDI(Handle, Channel):
+    """An easy function that reads the state of one digital input.
+        
+    Windows Only
+
+    Sample Usage:
+    
+    >>> import LabJackPython as LJUD
+    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
+    >>> FIO4State = LJUD.eDI(d.handle, 4)
+
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  Channel: number
+    @param Channel: DIO channel number.
+
+    @rtype: number
+    @return: Returns the state of the digital input. 0=False=Low, 1=True=High.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        ch = ctypes.c_long(Channel)
+        state = ctypes.c_long()
+        ec = staticLib.eDI(Handle, ch, ctypes.byref(state))
+        if ec != 0: raise LabJackException(ec)
+        return state.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def eDO(Handle, Channel, State):
+    """An easy function that writes the state of one digital output.
+        
+    Windows Only
+
+    Sample Usage:
+    
+    >>> import LabJackPython as LJUD
+    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
+    >>> channel = 4 # Target FIO4
+    >>> state = 1   # Set the state to 1
+    >>> LJUD.eDO(d.handle, channel, state)
+
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  Channel: number
+    @param Channel: DIO channel number.
+    @type  State: number
+    @param State: Desired state for the DIO.
+
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        ch = ctypes.c_long(Channel)
+        state = ctypes.c_long(State)
+        ec = staticLib.eDO(Handle, ch, state)
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+def _convertListToCtypeArray(li, cType):
+    """Returns a ctypes list converted from a normal list."""
+    return (cType*len(li))(*li)
+
+#Windows
+def eTCConfig(Handle, aEnableTimers, aEnableCounters, TCPinOffset, TimerClockBaseIndex, TimerClockDivisor, aTimerModes, aTimerValues):
+    """An easy function that configures and initializes all the timers and counters.
+        
+    Windows Only
+
+    Sample Usage:
+    
+    >>> import LabJackPython as LJUD
+    >>> d = LJUD.openLabJack(LJUD.LJ_dtU3, LJUD.LJ_ctUSB, "0", 1)
+    >>> aEnableTimers = [1,0] # Enable Timer0
+    >>> aEnableCounters = [0,1] # Enable Counter1 (Counter0 unavailable when using clock with divisor)
+    >>> pinOffset = 4 # Put Timer0 on FIO4 (Counter1 will be on FIO5)
+    >>> clockBase = LJUD.LJ_tc48MHZ_DIV # 48MHz clock (allows divisor)
+    >>> clockDivisor = 2 # Clock will be 24MHz. This will allow a 24MHz/65535 = 366.217Hz PWM16
+    >>> aTimerModes = [LJUD.LJ_tmPWM16, 0] # Set up PWM16
+    >>> aTimerValues = [32768, 0] # Set 50% duty on the PWM16
+    >>> LJUD.eTCConfig(d.handle, aEnableTimers, aEnableCounters, pinOffset, clockBase, clockDivisor, aTimerModes, aTimerValues)
+    >>> aReadTimers = [0,0]
+    >>> aUpdateResetTimers = [1,0] # Update Timer0
+    >>> aReadCounters = [0,1] # Read Counter1
+    >>> aResetCounters = [0,1] # Reset Counter1 after reading
+    >>> aTimerValues = [16384,0] # Set PWM16 duty cycle to 75%
+    >>> LJUD.eTCValues(d.handle, aReadTimers, aUpdateResetTimers, aReadCounters, aResetCounters, aTimerValues)
+
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  aEnableTimers: list
+    @param aEnableTimers: A list where each element specifies whether that timer is enabled.
+                          A nonzero value for a list element specifies to enable that timer. 
+                          List size must be equal to the number of timers available on the device.
+    @type  aEnableCounters: list
+    @param aEnableCounters: A list where each element specifies whether that counter is enabled.
+                            A nonzero value for a list element specifies to enable that counter. 
+                            List size must be equal to the number of counters available on the device.
+    @type  TCPinOffset: number
+    @param TCPinOffset: Value specifies where to start assigning timers and counters.
+    @type  TimerClockBaseIndex: number
+    @param TimerClockBaseIndex: Pass a constant to set the timer base clock. The default is device specific.
+    @type  TimerClockDivisor: number
+    @param TimerClockDivisor: Pass a divisor from 0-255 where 0 is a divisor of 256.
+    @type  aTimerModes: list
+    @param aTimerModes: A list where each element is a constant specifying the mode for that timer.
+                        List size must be equal to the number of timers available on the device.
+    @type  aTimerValues: list
+    @param aTimerValues: A list where each element is specifies the initial value for that timer.
+                         List size must be equal to the number of timers available on the device.
+
+    @rtype: None
+    @return: Function returns nothing.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        numTimers = len(aEnableTimers)
+        if numTimers != len(aTimerModes) or numTimers != len(aTimerValues):
+            raise Exception("eTCConfig: Inconsistent timer list sizes. Timer list sizes must equal the number of timers on the device")
+
+        enTimers = _convertListToCtypeArray(aEnableTimers, ctypes.c_long)
+        enCounters = _convertListToCtypeArray(aEnableCounters, ctypes.c_long)
+        pinOffset = ctypes.c_long(TCPinOffset)
+        clockBase = ctypes.c_long(TimerClockBaseIndex)
+        clockDivisor = ctypes.c_long(TimerClockDivisor)
+        tModes = _convertListToCtypeArray(aTimerModes, ctypes.c_long)
+        tVals = _convertListToCtypeArray(aTimerValues, ctypes.c_double)
+        ec = staticLib.eTCConfig(Handle, ctypes.byref(enTimers), ctypes.byref(enCounters), pinOffset, clockBase, clockDivisor, ctypes.byref(tModes), ctypes.byref(tVals), 0, 0)
+        if ec != 0: raise LabJackException(ec)
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+def _convertCtypeArrayToList(listCtype):
+    """Returns a normal list from a ctypes list."""
+    return listCtype[:]
+
+#Windows
+def eTCValues(Handle, aReadTimers, aUpdateResetTimers, aReadCounters, aResetCounters, aTimerValues):
+    """An easy function that updates and reads all the timers and counters. 
+        
+    Windows Only
+
+    For sample usage, see the eTCConfig definition.
+
+    @type  Handle: number
+    @param Handle: Handle to the LabJack device.
+    @type  aReadTimers: list
+    @param aReadTimers: A list where each element specifies whether to read that timer.
+                        A nonzero value for a list element specifies to read that timer. 
+    @type  aUpdateResetTimers: list
+    @param aUpdateResetTimers: A list where each element specifies whether to update/reset that timer.
+                               A nonzero value for a list element specifies to update/reset that timer.
+    @type  aReadCounters: list
+    @param aReadCounters: A list where each element specifies whether to read that counter.
+                          A nonzero value for a list element specifies to read that counter. 
+    @type  aResetCounters: list
+    @param aResetCounters: A list where each element specifies whether to reset that counter.
+                           A nonzero value for a list element specifies to reset that counter.
+    @type  aTimerValues: list
+    @param aTimerValues: A list where each element is specifies the initial value for that timer.
+                         List size must be equal to the number of timers available on the device.
+
+    @rtype: Tuple
+    @return: The tuple (aTimerValues, aCounterValues)
+        - aTimerValues: List where each element is the value read from that timer if the appropriate element is set in the aReadTimers array.
+        - aCounterValues: List where each element is the value read from that counter if the appropriate element is set in the aReadCounters array.
+    
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        numTimers = len(aReadTimers)
+        numCounters = len(aReadCounters)
+
+        if numTimers != len(aUpdateResetTimers) or numTimers != len(aTimerValues):
+            raise Exception("eTCValues: Inconsistent timer list sizes. Timer list sizes must equal the number of timers on the device")
+        if numCounters != len(aResetCounters):
+            raise Exception("eTCValues: Inconsistent counter list sizes. Counter list sizes must equal the number of Counters on the device")
+
+        readTimers = _convertListToCtypeArray(aReadTimers, ctypes.c_long)
+        updateTimers = _convertListToCtypeArray(aUpdateResetTimers, ctypes.c_long)
+        readCounters = _convertListToCtypeArray(aReadCounters, ctypes.c_long)
+        resetCounters = _convertListToCtypeArray(aResetCounters, ctypes.c_long)
+        timerValues = _convertListToCtypeArray(aTimerValues, ctypes.c_double)
+        aCounterValues = (ctypes.c_double*numCounters)()
+        counterValues = _convertListToCtypeArray(aCounterValues, ctypes.c_double)
+        ec = staticLib.eTCValues(Handle, ctypes.byref(readTimers), ctypes.byref(updateTimers), ctypes.byref(readCounters), ctypes.byref(resetCounters), ctypes.byref(timerValues), ctypes.byref(counterValues), 0, 0)
+        if ec != 0: raise LabJackException(ec)
+        tVals = _convertCtypeArrayToList(timerValues)
+        cVals = _convertCtypeArrayToList(counterValues)
+        return tVals, cVals
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def ErrorToString(ErrorCode):
+    """Converts an LabJackUD valid error code to a String.
+
+    For Windows
+
+    Sample Usage:
+
+    >>> ErrorToString(1007)
+    'LabJack not found'
+    
+    @type  ErrorCode: number
+    @param ErrorCode: Valid LabJackUD error code.
+    
+    @rtype: String
+    @return: The string that represents the valid LabJackUD error code
+    """
+    if _os_name == 'nt':
+        pString = ctypes.create_string_buffer(256)
+        staticLib.ErrorToString(ctypes.c_long(ErrorCode), ctypes.byref(pString))
+        return pString.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows
+def TCVoltsToTemp(TCType, TCVolts, CJTempK):
+    """Converts a thermo couple voltage reading to an appropriate temperature reading.
+
+    For Windows
+
+    Sample Usage:
+
+    >>> TCVoltsToTemp(LJ_ttK, 0.003141592, 297.038889)
+    373.13353222244825
+            
+    @type  TCType: number
+    @param TCType: The type of thermo couple used.
+    @type  TCVolts: number
+    @param TCVolts: The voltage reading from the thermo couple
+    @type  CJTempK: number
+    @param CJTempK: The cold junction temperature reading in Kelvin
+    
+    @rtype: number
+    @return: The thermo couples temperature reading
+        - pTCTempK
+        
+    @raise LabJackException:
+    """
+    if _os_name == 'nt':
+        pTCTempK = ctypes.c_double()
+        ec = staticLib.TCVoltsToTemp(ctypes.c_long(TCType), ctypes.c_double(TCVolts), 
+                                     ctypes.c_double(CJTempK), ctypes.byref(pTCTempK))
+
+        if ec != 0: raise LabJackException(ec)          
+        return pTCTempK.value
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+
+#Windows 
+def Close():
+    """Resets the driver and closes all open handles.
+
+    For Windows
+
+    Sample Usage:
+
+    >>> Close()
+            
+    @rtype: None
+    @return: The function returns nothing.
+    """    
+    if _os_name == 'nt':
+        staticLib.Close()
+    else:
+       raise LabJackException(0, "Function only supported for Windows")
+
+#Windows only
+def LJHash(hashStr, size):
+    """An approximation of the md5 hashing algorithms.  
+
+    For Windows
+    
+    An approximation of the md5 hashing algorithm.  Used 
+    for authorizations on UE9 version 1.73 and higher and u3 
+    version 1.35 and higher.
+
+    @type  hashStr: String
+    @param hashStr: String to be hashed.
+    @type  size: number
+    @param size: Amount of bytes to hash from the hashStr
+            
+    @rtype: String
+    @return: The hashed string.
+    """  
+    
+    outBuff = (ctypes.c_char * 16)()
+    retBuff = ''
+    
+    ec = staticLib.LJHash(ctypes.cast(hashStr, ctypes.POINTER(ctypes.c_char)),
+                          size, 
+                          ctypes.cast(outBuff, ctypes.POINTER(ctypes.c_char)), 
+                          0)
+    if ec != 0: raise LabJackException(ec)
+
+    for i in range(16):
+        retBuff += outBuff[i]
+        
+    return retBuff
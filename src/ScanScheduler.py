@@ -0,0 +1,235 @@
+"""
+Name: ScanScheduler.py
+Desc: Polls channels of a U3 or U6 at different rates. At each tick every
+      read that is due is packed into the fewest Feedback packets with
+      compileFeedbackMany, so channels that come due together share USB
+      transactions. Each result is timestamped, and the scheduler keeps
+      jitter and overrun statistics.
+
+      Due times are kept on a fixed grid from the start time, so rates don't
+      drift. A channel that falls more than one period behind skips the
+      readings it missed and counts them as overruns.
+
+>>> import u6, ScanScheduler
+>>> d = u6.U6()
+>>> scheduler = ScanScheduler.ScanScheduler(d)
+>>> scheduler.addChannel("TC", u6.AIN24(0), 2)
+>>> scheduler.addChannel("Pressure", u6.AIN24(1), 100)
+>>> scheduler.addChannel("Door", u6.BitStateRead(4), 500)
+>>> def handler(timestamp, values):
+...     print(timestamp, values)
+>>> scheduler.run(handler, duration = 10)
+>>> print(scheduler.stats())
+"""
+import math
+import time
+
+from LabJackPython import LabJackException, _monotonic
+
+
+class _ScheduledChannel(object):
+    def __init__(self, name, command, period, convert):
+        self.name = name
+        self.command = command
+        self.period = period
+        self.convert = convert
+        self.count = 0  # Number of periods since the start
+        self.due = 0.0
+        self.reads = 0
+        self.overruns = 0
+
+
+class ScanScheduler(object):
+    """
+    ScanScheduler(device, tolerance = 0.0002)
+
+    Reads FeedbackCommands from device, each at its own rate. Reads that
+    are due within tolerance seconds of each other are done in the same
+    tick.
+    """
+    def __init__(self, device, tolerance = 0.0002):
+        self.device = device
+        self.tolerance = tolerance
+        self.channels = []
+        self.groups = {}
+        self.running = False
+        self.startTime = None
+        self.resetStats()
+
+    def addChannel(self, name, command, rate, convert = None):
+        """
+        Name: ScanScheduler.addChannel(name, command, rate, convert = None)
+        Args: name, the key of the channel's value in the results
+              command, the FeedbackCommand to read, like u6.AIN24(0)
+              rate, the number of reads per second
+              convert, a function to apply to the command's result, like a
+                       calibration. None returns the result as it is.
+        Desc: Adds a channel to the schedule. Add every channel before
+              calling run().
+        """
+        if rate <= 0:
+            raise LabJackException("The rate of %s must be greater than 0." % name)
+        if name in [channel.name for channel in self.channels]:
+            raise LabJackException("There is already a channel named %s." % name)
+        if self.startTime is not None:
+            raise LabJackException("Channels can't be added after the scheduler has started.")
+
+        self.channels.append(_ScheduledChannel(name, command, 1.0 / rate, convert))
+
+    def resetStats(self):
+        """
+        Name: ScanScheduler.resetStats()
+        Args: None
+        Desc: Clears the statistics returned by stats().
+        """
+        self.ticks = 0
+        self.packets = 0
+        self.lateTotal = 0.0
+        self.lateSquaresTotal = 0.0
+        self.lateMax = 0.0
+        for channel in self.channels:
+            channel.reads = 0
+            channel.overruns = 0
+
+    def stats(self):
+        """
+        Name: ScanScheduler.stats()
+        Args: None
+        Desc: Returns a dictionary of statistics since the start or the last
+              resetStats():
+              * ticks: The number of ticks run.
+              * packets: The number of Feedback packets sent.
+              * reads: The number of channel reads.
+              * overruns: The number of reads skipped because the schedule
+                          fell more than a period behind.
+              * jitterMean, jitterStd, jitterMax: How late the ticks
+                          started compared to when they were due, in
+                          seconds.
+              * channels: A dictionary of each channel's reads and
+                          overruns.
+        """
+        mean = std = 0.0
+        if self.ticks:
+            mean = self.lateTotal / self.ticks
+            std = math.sqrt(max(self.lateSquaresTotal / self.ticks - mean * mean, 0.0))
+
+        channels = dict()
+        for channel in self.channels:
+            channels[channel.name] = dict(reads = channel.reads, overruns = channel.overruns)
+
+        return dict(ticks = self.ticks, packets = self.packets, reads = sum([channel.reads for channel in self.channels]), overruns = sum([channel.overruns for channel in self.channels]), jitterMean = mean, jitterStd = std, jitterMax = self.lateMax, channels = channels)
+
+    def start(self):
+        """
+        Name: ScanScheduler.start()
+        Args: None
+        Desc: Makes every channel due now. Called by run(), or call it
+              before calling tick() yourself.
+        """
+        if not self.channels:
+            raise LabJackException("Add channels before starting the scheduler.")
+
+        self.startTime = _monotonic()
+        for channel in self.channels:
+            channel.count = 0
+            channel.due = self.startTime
+
+    def nextDue(self):
+        """
+        Name: ScanScheduler.nextDue()
+        Args: None
+        Desc: Returns the clock time of the next tick.
+        """
+        return min([channel.due for channel in self.channels])
+
+    def tick(self):
+        """
+        Name: ScanScheduler.tick()
+        Args: None
+        Desc: Waits until the next reads are due, reads them, and returns a
+              (timestamp, values) tuple, where timestamp is the time.time()
+              the reads finished and values is a dictionary of channel name
+              to value.
+        """
+        if self.startTime is None:
+            self.start()
+
+        scheduled = self.nextDue()
+        delay = scheduled - _monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        now = _monotonic()
+        late = max(now - scheduled, 0.0)
+        self.ticks += 1
+        self.lateTotal += late
+        self.lateSquaresTotal += late * late
+        self.lateMax = max(self.lateMax, late)
+
+        due = [i for i, channel in enumerate(self.channels) if channel.due <= scheduled + self.tolerance]
+        key = tuple(due)
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = self.device.compileFeedbackMany([self.channels[i].command for i in due])
+
+        results = group.run()
+        timestamp = time.time()
+        self.packets += len(group.plans)
+
+        values = dict()
+        for i, result in zip(due, results):
+            channel = self.channels[i]
+            if channel.convert is not None:
+                result = channel.convert(result)
+            values[channel.name] = result
+            channel.reads += 1
+
+            # Move to the next due time on the grid, skipping any that have
+            # already passed.
+            channel.count += 1
+            nextDue = self.startTime + channel.count * channel.period
+            if nextDue < now:
+                missed = int((now - nextDue) / channel.period) + 1
+                channel.overruns += missed
+                channel.count += missed
+                nextDue = self.startTime + channel.count * channel.period
+            channel.due = nextDue
+
+        return timestamp, values
+
+    def run(self, callback, duration = None, maxTicks = None):
+        """
+        Name: ScanScheduler.run(callback, duration = None, maxTicks = None)
+        Args: callback, a function called as callback(timestamp, values)
+                        after every tick
+              duration, the number of seconds to run. None runs until
+                        stop() is called.
+              maxTicks, the most ticks to run. None for no limit.
+        Desc: Starts the schedule and runs ticks until stopped.
+        """
+        self.start()
+        self.running = True
+        endTime = None
+        if duration is not None:
+            endTime = self.startTime + duration
+
+        ticks = 0
+        while self.running:
+            if endTime is not None and self.nextDue() >= endTime:
+                break
+            if maxTicks is not None and ticks >= maxTicks:
+                break
+            timestamp, values = self.tick()
+            callback(timestamp, values)
+            ticks += 1
+
+        self.running = False
+
+    def stop(self):
+        """
+        Name: ScanScheduler.stop()
+        Args: None
+        Desc: Makes run() return after the current tick. Can be called from
+              the callback or another thread.
+        """
+        self.running = False
@@ -0,0 +1,269 @@
+"""
+Name: StreamRecorder.py
+Desc: Records raw stream data to disk and replays it later. A recording is
+      two files:
+
+      * The data file starts with a header holding the device's
+        streamConfigSnapshot(), followed by the raw blocks from
+        streamData(convert = False), unchanged and appended one after
+        another.
+      * The index file (the data file name plus ".idx") has one fixed size
+        record per block: the block's offset and length in the data file,
+        the host time it was recorded, the PacketCounter of its first
+        packet, and its error and missed counts.
+
+      Writing raw bytes is much cheaper than converting the data while
+      streaming. StreamRecording memory maps a recording and converts any
+      range of blocks with processStreamData.
+
+>>> import u6, StreamRecorder
+>>> d = u6.U6()
+>>> d.getCalibrationData()
+>>> d.streamConfig(NumChannels = 1, ChannelNumbers = [0], ChannelOptions = [0])
+>>> d.streamStart()
+>>> with StreamRecorder.StreamRecorder("run.ljs", d) as recorder:
+...     recorder.record(d.streamData(convert = False), maxBlocks = 1000)
+>>> d.streamStop()
+>>> recording = StreamRecorder.StreamRecording("run.ljs")
+>>> data = recording.read(0, 10)
+>>> print(data['AIN0'][:5])
+"""
+import json
+import mmap
+import struct
+import time
+
+from LabJackPython import LabJackException, deviceFromStreamConfigSnapshot
+
+
+MAGIC = b"LJSTREAM"
+FORMAT_VERSION = 1
+INDEX_SUFFIX = ".idx"
+
+# Magic, format version, header length.
+_FILE_HEADER = struct.Struct("<8sII")
+
+# Offset, length, timestamp, firstPacket, errors, missed.
+_INDEX_RECORD = struct.Struct("<QIdIII")
+
+
+class StreamRecorder(object):
+    """
+    StreamRecorder(filename, device)
+
+    Writes the raw stream blocks of device to filename, and their index to
+    filename + ".idx". The stream configuration and calibration constants
+    are saved from the device when the recorder is made, so make it after
+    streamConfig() and getCalibrationData().
+    """
+    def __init__(self, filename, device):
+        snapshot = device.streamConfigSnapshot()
+        if not device.streamStarted:
+            # streamStart() starts the channel rotation over.
+            snapshot['attributes']['streamPacketOffset'] = 0
+
+        header = json.dumps(dict(snapshot = snapshot, packetBytes = device._streamPacketBytes(), created = time.time())).encode("utf-8")
+
+        self.filename = filename
+        self.dataFile = open(filename, "wb")
+        self.indexFile = open(filename + INDEX_SUFFIX, "wb")
+        self.dataFile.write(_FILE_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)))
+        self.dataFile.write(header)
+        self.offset = _FILE_HEADER.size + len(header)
+        self.blocks = 0
+
+    def write(self, block, timestamp = None):
+        """
+        Name: StreamRecorder.write(block, timestamp = None)
+        Args: block, a dictionary returned by streamData(convert = False)
+              timestamp, the host time of the block. Defaults to now.
+        Desc: Appends a block to the recording.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        result = block['result']
+        length = len(result)
+        self.dataFile.write(result)
+        self.indexFile.write(_INDEX_RECORD.pack(self.offset, length, timestamp, block['firstPacket'], block['errors'], block['missed']))
+        self.offset += length
+        self.blocks += 1
+
+    def record(self, blocks, maxBlocks = None):
+        """
+        Name: StreamRecorder.record(blocks, maxBlocks = None)
+        Args: blocks, an iterator of blocks, like streamData(convert = False)
+              maxBlocks, the number of blocks to record. None records until
+                         blocks is done.
+        Desc: Writes blocks from an iterator, skipping the empty reads.
+              Returns the number of blocks written.
+        """
+        count = 0
+        for block in blocks:
+            if block is None:
+                continue
+            self.write(block)
+            count += 1
+            if maxBlocks is not None and count >= maxBlocks:
+                break
+        return count
+
+    def flush(self):
+        """
+        Name: StreamRecorder.flush()
+        Args: None
+        Desc: Flushes both files to the operating system.
+        """
+        self.dataFile.flush()
+        self.indexFile.flush()
+
+    def close(self):
+        """
+        Name: StreamRecorder.close()
+        Args: None
+        Desc: Closes the recording's files.
+        """
+        self.dataFile.close()
+        self.indexFile.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class StreamRecording(object):
+    """
+    StreamRecording(filename)
+
+    Reads a recording made by StreamRecorder. The data file is memory
+    mapped, so only the blocks that are read are loaded, and blocks are
+    memoryviews of the map rather than copies. If the recorder did not
+    close cleanly, blocks past the end of the data file are left out.
+
+    Attributes:
+    snapshot -- the streamConfigSnapshot() saved in the recording
+    packetBytes -- the size of one stream packet
+    created -- the host time the recording was started
+    index -- a list of (offset, length, timestamp, firstPacket, errors,
+             missed) tuples, one for each block
+    """
+    def __init__(self, filename):
+        self.filename = filename
+        self.dataFile = open(filename, "rb")
+        self.data = mmap.mmap(self.dataFile.fileno(), 0, access = mmap.ACCESS_READ)
+        try:
+            # Slices of the view don't copy the data like slices of the map.
+            self.view = memoryview(self.data)
+        except TypeError:  # Python 2 maps don't support memoryview
+            self.view = self.data
+
+        magic, version, headerLength = _FILE_HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            self.close()
+            raise LabJackException("%s is not a stream recording." % filename)
+        if version != FORMAT_VERSION:
+            self.close()
+            raise LabJackException("Stream recording format version %s is not supported." % version)
+
+        start = _FILE_HEADER.size
+        header = json.loads(self.data[start:start + headerLength].decode("utf-8"))
+        self.snapshot = header['snapshot']
+        self.packetBytes = header['packetBytes']
+        self.created = header['created']
+
+        with open(filename + INDEX_SUFFIX, "rb") as indexFile:
+            indexData = indexFile.read()
+
+        self.index = []
+        dataSize = len(self.data)
+        for pos in range(0, len(indexData) - _INDEX_RECORD.size + 1, _INDEX_RECORD.size):
+            record = _INDEX_RECORD.unpack_from(indexData, pos)
+            if record[0] + record[1] > dataSize:
+                break
+            self.index.append(record)
+
+        # The channel rotation at the start of each block.
+        attributes = self.snapshot['attributes']
+        numChannels = len(attributes['streamChannelNumbers'])
+        samplesPerPacket = attributes['streamSamplesPerPacket']
+        offset = attributes['streamPacketOffset']
+        self.blockOffsets = []
+        for record in self.index:
+            self.blockOffsets.append(offset)
+            offset = (offset + (record[1] // self.packetBytes) * samplesPerPacket) % numChannels
+
+        self.device = deviceFromStreamConfigSnapshot(self.snapshot)
+
+    def __len__(self):
+        return len(self.index)
+
+    def block(self, i):
+        """
+        Name: StreamRecording.block(i)
+        Args: i, the index of the block
+        Desc: Returns the raw block as a dictionary like the ones from
+              streamData(convert = False), with the recording's timestamp
+              added. The result is a memoryview of the recording, so copy it
+              with bytes() to keep it after the recording is closed.
+        """
+        offset, length, timestamp, firstPacket, errors, missed = self.index[i]
+        return dict(result = self.view[offset:offset + length], numPackets = length // self.packetBytes, timestamp = timestamp, firstPacket = firstPacket, errors = errors, missed = missed)
+
+    def read(self, start = 0, stop = None, asArrays = False):
+        """
+        Name: StreamRecording.read(start = 0, stop = None, asArrays = False)
+        Args: start, the index of the first block
+              stop, the index after the last block. None reads to the end.
+              asArrays, if True return NumPy arrays instead of lists
+        Desc: Converts the blocks from start to stop at once with
+              processStreamData and returns its dictionary.
+        """
+        start, stop, step = slice(start, stop).indices(len(self.index))
+        if start >= stop:
+            raise LabJackException("No blocks to read between %s and %s." % (start, stop))
+
+        first = self.index[start][0]
+        last = self.index[stop - 1]
+        self.device.streamPacketOffset = self.blockOffsets[start]
+        return self.device.processStreamData(self.view[first:last[0] + last[1]], numBytes = self.packetBytes, asArrays = asArrays)
+
+    def replay(self, start = 0, stop = None, asArrays = False):
+        """
+        Name: StreamRecording.replay(start = 0, stop = None, asArrays = False)
+        Args: start, the index of the first block
+              stop, the index after the last block. None replays to the end.
+              asArrays, if True return NumPy arrays instead of lists
+        Desc: Yields the blocks from start to stop one at a time, converted
+              like streamData(convert = True) would have.
+        """
+        start, stop, step = slice(start, stop).indices(len(self.index))
+        if start < stop:
+            self.device.streamPacketOffset = self.blockOffsets[start]
+        for i in range(start, stop):
+            block = self.block(i)
+            block.update(self.device.processStreamData(block['result'], numBytes = self.packetBytes, asArrays = asArrays))
+            yield block
+
+    def close(self):
+        """
+        Name: StreamRecording.close()
+        Args: None
+        Desc: Closes the recording.
+        """
+        if self.view is not self.data:
+            self.view.release()
+        try:
+            self.data.close()
+        except BufferError:
+            # Blocks from block() still use the map. It's unmapped when
+            # the last of them is gone.
+            pass
+        self.dataFile.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
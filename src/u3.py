@@ -27,15 +27,20 @@ except ImportError: # Python 3
 
 from struct import pack, unpack
 
+import LabJackPython
 from LabJackPython import (
     Device,
     deviceCount,
+    FeedbackPlan,
+    FeedbackPlanGroup,
     LabJackException,
     LowlevelErrorException,
     lowlevelErrorToString,
     MAX_USB_PACKET_LENGTH,
     setChecksum8,
     toDouble,
+    _numpy,
+    _openAllDevices,
      _troubleshoot_comm_msg,
     )
 
@@ -45,19 +50,19 @@ EIO0, EIO1, EIO2, EIO3, EIO4, EIO5, EIO6, EIO7, \
 CIO0, CIO1, CIO2, CIO3 = range(20)
 
 
-def openAllU3():
+def openAllU3(errors = None):
     """
     A helpful function which will open all the connected U3s. Returns a 
     dictionary where the keys are the serialNumber, and the value is the device
-    object.
-    """
-    returnDict = dict()
-
-    for i in range(deviceCount(3)):
-        d = U3(firstFound = False, devNumber = i+1)
-        returnDict[str(d.serialNumber)] = d
+    object. The devices are opened and configured at the same time, up to
+    MAX_ENUMERATION_THREADS at once.
 
-    return returnDict
+    If errors is a list, a (devNumber, exception) tuple is appended to it for
+    each device that couldn't be opened, and the rest are returned.
+    Otherwise the first error is raised, after closing the devices that
+    were opened.
+    """
+    return _openAllDevices(U3, 3, errors)
 
 
 class U3(Device):
@@ -710,32 +715,6 @@ class U3(Device):
                     EIOAnalog ^= 2**(i-EIO0)
         return self.configIO(FIOAnalog = FIOAnalog, EIOAnalog = EIOAnalog)
 
-    def _buildBuffer(self, sendBuffer, readLen, commandlist):
-        """
-        Builds up the buffer to be written for getFeedback
-        """
-        for cmd in commandlist:
-            if isinstance(cmd, FeedbackCommand):
-                sendBuffer += cmd.cmdBytes
-                readLen += cmd.readLen
-            elif isinstance(cmd, list):
-                sendBuffer, readLen = self._buildBuffer(sendBuffer, readLen, cmd)
-        return (sendBuffer, readLen)
-    _buildBuffer.section = 4
-                
-    def _buildFeedbackResults(self, rcvBuffer, commandlist, results, i):
-        """
-        Builds the result list from the results of getFeedback
-        """
-        for cmd in commandlist:
-            if isinstance(cmd, FeedbackCommand):
-                results.append(cmd.handle(rcvBuffer[i:i+cmd.readLen]))
-                i += cmd.readLen
-            elif isinstance(cmd, list):
-                self._buildFeedbackResults(rcvBuffer, cmd, results, i)
-        return results
-    _buildFeedbackResults.section = 4
-
     def getFeedback(self, *commandlist):
         """
         Name: U3.getFeedback(commandlist)
@@ -761,44 +740,58 @@ class U3(Device):
         [None, 9376]
         
         """
+        return self.compileFeedback(*commandlist).run()
+    getFeedback.section = 2    
+
+    def compileFeedback(self, *commandlist):
+        """
+        Name: U3.compileFeedback(commandlist)
         
-        sendBuffer = [0] * 7
-        sendBuffer[1] = 0xF8
-        readLen = 9
-        sendBuffer, readLen = self._buildBuffer(sendBuffer, readLen, commandlist)
-        if len(sendBuffer) % 2:
-            sendBuffer += [0]
-        sendBuffer[2] = len(sendBuffer) // 2 - 3
+        Args: the FeedbackCommands to run
         
-        if readLen % 2:
-            readLen += 1
+        Desc: Builds the Feedback request for the commands once and returns
+              a FeedbackPlan. Call its run() method to send the request and
+              get the same results getFeedback would return, without
+              rebuilding the packet each time.
         
-        if len(sendBuffer) > MAX_USB_PACKET_LENGTH:
-            raise LabJackException("ERROR: The Feedback command you are attempting to send is bigger than 64 bytes ( %s bytes ). Break your commands up into separate calls to getFeedback()." % len(sendBuffer))
+        Example:
+        >>> plan = myU3.compileFeedback(u3.AIN(0, 31), u3.AIN(1, 31))
+        >>> plan.run()
+        [37312, 37600]
+        """
+        return FeedbackPlan(self, commandlist)
+    compileFeedback.section = 2
+
+    def getFeedbackMany(self, *commandlist):
+        """
+        Name: U3.getFeedbackMany(commandlist)
         
-        if readLen > MAX_USB_PACKET_LENGTH:
-            raise LabJackException("ERROR: The Feedback command you are attempting to send would yield a response that is greater than 64 bytes ( %s bytes ). Break your commands up into separate calls to getFeedback()." % readLen)
+        Args: the FeedbackCommands to run, as many as needed
         
-        rcvBuffer = self._writeRead(sendBuffer, readLen, [], checkBytes = False, stream = False, checksum = True)
+        Desc: Like getFeedback, but the commands may be more than fit in one
+              packet. They are split in order into the fewest Feedback
+              packets possible, and the results of all of them are returned
+              in order.
         
-        # Check the response for errors
-        try:
-            self._checkCommandBytes(rcvBuffer, [0xF8])
+        Example:
+        >>> myU3.getFeedbackMany([u3.AIN(i, 31) for i in range(16)])
+        [37312, 37600, ...]
+        """
+        return self.compileFeedbackMany(*commandlist).run()
+    getFeedbackMany.section = 2
+
+    def compileFeedbackMany(self, *commandlist):
+        """
+        Name: U3.compileFeedbackMany(commandlist)
         
-            if rcvBuffer[3] != 0x00:
-                raise LabJackException("Communication Failure: The Feedback response has incorrect command bytes. %s" % _troubleshoot_comm_msg)
-        except LowlevelErrorException:
-            if isinstance(commandlist[0], list):
-                culprit = commandlist[0][ (rcvBuffer[7] -1) ]
-            else:
-                culprit = commandlist[ (rcvBuffer[7] -1) ]
-            
-            raise LowlevelErrorException("\nThis Feedback Command\n    %s\nreturned an error:\n    %s" %  (culprit , lowlevelErrorToString(rcvBuffer[6])))
+        Args: the FeedbackCommands to run, as many as needed
         
-        results = []
-        i = 9
-        return self._buildFeedbackResults(rcvBuffer, commandlist, results, i)
-    getFeedback.section = 2    
+        Desc: Splits the commands into Feedback packets once and returns a
+              FeedbackPlanGroup. Call its run() method to get the results
+              getFeedbackMany would return.
+        """
+        return FeedbackPlanGroup(self, commandlist)
+    compileFeedbackMany.section = 2
     
     def readMem(self, blockNum, readCal=False):
         """
@@ -1106,14 +1099,32 @@ class U3(Device):
             self.packetsPerRequest = min(self.packetsPerRequest, 48)
     streamConfig.section = 2
 
-    def processStreamData(self, result, numBytes = None):
+    _streamSnapshotAttributes = Device._streamSnapshotAttributes + ('streamNegChannels', 'isHV', 'calData')
+
+    def _streamSampleConverter(self, channelIndex):
         """
-        Name: U3.processStreamData(result, numBytes = None)
+        Returns a function that calibrates a NumPy array of stream samples
+        from the analog channel at channelIndex.
+        """
+        channelNumber = self.streamChannelNumbers[channelIndex]
+        singleEnded = self.streamNegChannels[channelIndex] == 31
+        lvChannel = not (self.isHV and channelNumber < 4)
+        isSpecial = self.streamNegChannels[channelIndex] == 32
+
+        slope, offset = self.getCalibratedSlopeOffset(lvChannel, singleEnded, isSpecial, channelNumber)
+        return self._calibrationTableConverter((lvChannel, singleEnded, isSpecial, channelNumber, slope, offset), lambda values: values * slope + offset)
+    _streamSampleConverter.section = 4
+
+    def processStreamData(self, result, numBytes = None, asArrays = False):
+        """
+        Name: U3.processStreamData(result, numBytes = None, asArrays = False)
         Args: result, the string or bytes object returned from
                       streamData().
               numBytes, the number of bytes per packet.
+              asArrays, if True return NumPy arrays instead of lists.
         Desc: Breaks stream data into individual channels and applies
-              calibrations.
+              calibrations. Uses NumPy to convert the whole block at once
+              when it is installed.
 
         >>> reading = d.streamData(convert = False)
         >>> print(processStreamData(reading['result']))
@@ -1122,6 +1133,11 @@ class U3(Device):
         if numBytes is None:
             numBytes = 14 + (self.streamSamplesPerPacket * 2)
 
+        if _numpy() is not None:
+            return self._decodeStreamData(result, numBytes, asArrays = asArrays)
+        elif asArrays:
+            raise LabJackException("NumPy is required to return stream data as arrays.")
+
         returnDict = collections.defaultdict(list)
 
         numChannels = len(self.streamChannelNumbers)
@@ -1757,11 +1773,18 @@ class U3(Device):
         Desc: Reads in the U3's calibrations, so they can be applied to
               readings. Section 2.6.2 of the User's Guide is helpful. Sets up
               an internal calData dict for any future calls that need 
-              calibration.
+              calibration. After setCalibrationCacheDir, the constants are
+              loaded from the cache when it still matches the device.
         """
+        self.clearCalibrationTables()
+        fingerprint, cached, firstBlock = self._loadCalibrationCache(lambda: self.readCal(0))
+        if cached is not None:
+            self.calData = cached
+            return self.calData
+
         self.calData = dict()
         
-        calData = self.readCal(0)
+        calData = firstBlock if firstBlock is not None else self.readCal(0)
         
         self.calData['lvSESlope'] = toDouble(calData[0:8])
         self.calData['lvSEOffset'] = toDouble(calData[8:16])
@@ -1803,6 +1826,7 @@ class U3(Device):
                 #not an invalid block error, so do not disregard
                 raise ex
 
+        self._saveCalibrationCache(fingerprint, self.calData)
         return self.calData
     getCalibrationData.section = 3
     
@@ -2057,13 +2081,10 @@ class U3(Device):
                 self.getFeedback( Timer1Config(mode, value) )
     loadConfig.section = 3      
 
-class FeedbackCommand(object):
+class FeedbackCommand(LabJackPython.FeedbackCommand):
     """
     The FeedbackCommand class is the base for all the Feedback commands.
     """
-    readLen = 0
-    def handle(self, input):
-        return None
 
 class AIN(FeedbackCommand):
     '''
@@ -2101,6 +2122,7 @@ class AIN(FeedbackCommand):
         self.cmdBytes = [ 0x01, b, NegativeChannel ]
 
     readLen =  2
+    fields = 'H'
     
     def __repr__(self):
         return "<u3.AIN( PositiveChannel = %s, NegativeChannel = %s, LongSettling = %s, QuickSample = %s )>" % ( self.positiveChannel, self.negativeChannel, self.longSettling, self.quickSample )
@@ -2572,6 +2594,16 @@ class Timer(FeedbackCommand):
     def __repr__(self):
         return "<u3.Timer( timer = %s, UpdateReset = %s, Value = %s, Mode = %s )>" % (self.timer, self.updateReset, self.value, self.mode)
     
+    @property
+    def fields(self):
+        # Quadrature input timers are signed, and stop input timers are
+        # the stop value and the edge count.
+        return {8: 'i', 9: 'HH'}.get(self.mode, 'I')
+
+    def fromFields(self, values):
+        maxCount, current = values
+        return current, maxCount
+
     def handle(self, input):
         inStr = pack('B' * len(input), *input)
         if self.mode == 8:
@@ -2860,6 +2892,7 @@ class Counter(FeedbackCommand):
         self.cmdBytes = [54 + (counter % 2), int(bool(Reset))]
 
     readLen = 4
+    fields = 'I'
 
     def __repr__(self):
         return "<u3.Counter( counter = %s, Reset = %s )>" % (self.counter, self.reset)
@@ -21,32 +21,37 @@ except ImportError:  # Python 3
 
 from struct import pack, unpack
 
+import LabJackPython
 from LabJackPython import (
     Device,
     deviceCount,
+    FeedbackPlan,
+    FeedbackPlanGroup,
     LabJackException,
     LowlevelErrorException,
     lowlevelErrorToString,
     MAX_USB_PACKET_LENGTH,
     setChecksum8,
     toDouble,
+    _numpy,
+    _openAllDevices,
     _troubleshoot_comm_msg,
     )
 
 
-def openAllU6():
+def openAllU6(errors = None):
     """
     A helpful function which will open all the connected U6s. Returns a
     dictionary where the keys are the serialNumber, and the value is the device
-    object.
-    """
-    returnDict = dict()
-
-    for i in range(deviceCount(6)):
-        d = U6(firstFound = False, devNumber = i+1)
-        returnDict[str(d.serialNumber)] = d
+    object. The devices are opened and configured at the same time, up to
+    MAX_ENUMERATION_THREADS at once.
 
-    return returnDict
+    If errors is a list, a (devNumber, exception) tuple is appended to it for
+    each device that couldn't be opened, and the rest are returned.
+    Otherwise the first error is raised, after closing the devices that
+    were opened.
+    """
+    return _openAllDevices(U6, 6, errors)
 
 def dumpPacket(buffer):
     """
@@ -390,24 +395,6 @@ class U6(Device):
             divisor = 256
         return { 'TimerClockBase' : (result[8] & 7), 'TimerClockDivisor' : divisor }
 
-    def _buildBuffer(self, sendBuffer, readLen, commandlist):
-        for cmd in commandlist:
-            if isinstance(cmd, FeedbackCommand):
-                sendBuffer += cmd.cmdBytes
-                readLen += cmd.readLen
-            elif isinstance(cmd, list):
-                sendBuffer, readLen = self._buildBuffer(sendBuffer, readLen, cmd)
-        return (sendBuffer, readLen)
-                
-    def _buildFeedbackResults(self, rcvBuffer, commandlist, results, i):
-        for cmd in commandlist:
-            if isinstance(cmd, FeedbackCommand):
-                results.append(cmd.handle(rcvBuffer[i:i+cmd.readLen]))
-                i += cmd.readLen
-            elif isinstance(cmd, list):
-                self._buildFeedbackResults(rcvBuffer, cmd, results, i)
-        return results
-
     def getFeedback(self, *commandlist):
         """
         Name: U6.getFeedback(commandlist)
@@ -430,43 +417,46 @@ class U6(Device):
         >>> myU6.getFeedback(commandList)
         [None, 23200]
         """
-        sendBuffer = [0] * 7
-        sendBuffer[1] = 0xF8
-        readLen = 9
-        sendBuffer, readLen = self._buildBuffer(sendBuffer, readLen, commandlist)
+        return self.compileFeedback(*commandlist).run()
 
-        if len(sendBuffer) % 2:
-            sendBuffer += [0]
-        sendBuffer[2] = len(sendBuffer) // 2 - 3
-        
-        if readLen % 2:
-            readLen += 1
-            
-        if len(sendBuffer) > MAX_USB_PACKET_LENGTH:
-            raise LabJackException("ERROR: The Feedback command you are attempting to send is bigger than 64 bytes ( %s bytes ). Break your commands up into separate calls to getFeedback()." % len(sendBuffer))
-        
-        if readLen > MAX_USB_PACKET_LENGTH:
-            raise LabJackException("ERROR: The Feedback command you are attempting to send would yield a response that is greater than 64 bytes ( %s bytes ). Break your commands up into separate calls to getFeedback()." % readLen)
-        
-        rcvBuffer = self._writeRead(sendBuffer, readLen, [], checkBytes = False, stream = False, checksum = True)
-        
-        # Check the response for errors
-        try:
-            self._checkCommandBytes(rcvBuffer, [0xF8])
-        
-            if rcvBuffer[3] != 0x00:
-                raise LabJackException("Communication Failure: The Feedback response has incorrect command bytes. %s" % _troubleshoot_comm_msg)
-        except LowlevelErrorException:
-            if isinstance(commandlist[0], list):
-                culprit = commandlist[0][ (rcvBuffer[7] - 1) ]
-            else:
-                culprit = commandlist[ (rcvBuffer[7] -1) ]
-            
-            raise LowlevelErrorException("\nThis Feedback Command\n    %s\nreturned an error:\n    %s" %  ( culprit, lowlevelErrorToString(rcvBuffer[6]) ) )
-        
-        results = []
-        i = 9
-        return self._buildFeedbackResults(rcvBuffer, commandlist, results, i)
+    def compileFeedback(self, *commandlist):
+        """
+        Name: U6.compileFeedback(commandlist)
+        Args: the FeedbackCommands to run
+        Desc: Builds the Feedback request for the commands once and returns
+              a FeedbackPlan. Call its run() method to send the request and
+              get the same results getFeedback would return, without
+              rebuilding the packet each time.
+
+        >>> plan = myU6.compileFeedback(u6.AIN(0), u6.AIN(1))
+        >>> plan.run()
+        [32723, 32810]
+        """
+        return FeedbackPlan(self, commandlist)
+
+    def getFeedbackMany(self, *commandlist):
+        """
+        Name: U6.getFeedbackMany(commandlist)
+        Args: the FeedbackCommands to run, as many as needed
+        Desc: Like getFeedback, but the commands may be more than fit in one
+              packet. They are split in order into the fewest Feedback
+              packets possible, and the results of all of them are returned
+              in order.
+
+        >>> myU6.getFeedbackMany([u6.AIN24(i) for i in range(16)])
+        [8388608, 8388609, ...]
+        """
+        return self.compileFeedbackMany(*commandlist).run()
+
+    def compileFeedbackMany(self, *commandlist):
+        """
+        Name: U6.compileFeedbackMany(commandlist)
+        Args: the FeedbackCommands to run, as many as needed
+        Desc: Splits the commands into Feedback packets once and returns a
+              FeedbackPlanGroup. Call its run() method to get the results
+              getFeedbackMany would return.
+        """
+        return FeedbackPlanGroup(self, commandlist)
 
     def readMem(self, BlockNum, ReadCal=False):
         """
@@ -710,13 +700,31 @@ class U6(Device):
             self.packetsPerRequest = max(1, int(freq/SamplesPerPacket))
             self.packetsPerRequest = min(self.packetsPerRequest, 48)
 
-    def processStreamData(self, result, numBytes = None):
+    _streamSnapshotAttributes = Device._streamSnapshotAttributes + ('streamChannelOptions', 'isPro', 'calInfo')
+
+    def _streamSampleConverter(self, channelIndex):
         """
-        Name: U6.processStreamData(result, numPackets = None)
+        Returns a function that calibrates a NumPy array of 16-bit stream
+        samples from the analog channel at channelIndex.
+        """
+        gainIndex = (self.streamChannelOptions[channelIndex] >> 4) & 0x3
+        negSlope, posSlope, center = self.getCalibratedSlopesCenter(gainIndex, 1)
+
+        def convert(values):
+            numpy = _numpy()
+            values = values.astype(numpy.float64)
+            return numpy.where(values < center, (center - values) * negSlope, (values - center) * posSlope)
+        return self._calibrationTableConverter((gainIndex, 1, negSlope, posSlope, center), convert)
+
+    def processStreamData(self, result, numBytes = None, asArrays = False):
+        """
+        Name: U6.processStreamData(result, numBytes = None, asArrays = False)
         Args: result, the string returned from streamData()
               numBytes, the number of bytes per packet
+              asArrays, if True return NumPy arrays instead of lists
         Desc: Breaks stream data into individual channels and applies
-              calibrations.
+              calibrations. Uses NumPy to convert the whole block at once
+              when it is installed.
 
         >>> reading = d.streamData(convert = False)
         >>> print(processStreamData(reading['result']))
@@ -725,6 +733,11 @@ class U6(Device):
         if numBytes is None:
             numBytes = 14 + (self.streamSamplesPerPacket * 2)
 
+        if _numpy() is not None:
+            return self._decodeStreamData(result, numBytes, asArrays = asArrays)
+        elif asArrays:
+            raise LabJackException("NumPy is required to return stream data as arrays.")
+
         returnDict = collections.defaultdict(list)
 
         numChannels = len(self.streamChannelNumbers)
@@ -1196,7 +1209,9 @@ class U6(Device):
         Name: U6.getCalibrationData()
         Args: None
         Desc: Gets the slopes and offsets for AIN and DACs,
-              as well as other calibration data
+              as well as other calibration data. After
+              setCalibrationCacheDir, they are loaded from the cache when it
+              still matches the device.
 
         >>> myU6 = U6()
         >>> myU6.getCalibrationData()
@@ -1204,11 +1219,17 @@ class U6(Device):
         <ainDiffOffset: -2.46886488446,...>
         """
         self._debugprint("Calibration data retrieval")
+        self.clearCalibrationTables()
+
+        fingerprint, cached, firstBlock = self._loadCalibrationCache(lambda: self._readCalDataBlock(0))
+        if cached is not None:
+            self.calInfo.__dict__.update(cached)
+            return
 
         self.calInfo.nominal = False
 
         # Reading block 0 from memory
-        rcvBuffer = self._readCalDataBlock(0)
+        rcvBuffer = firstBlock if firstBlock is not None else self._readCalDataBlock(0)
 
         # Positive Channel calibration
         self.calInfo.ain10vSlope = toDouble(rcvBuffer[:8])
@@ -1311,6 +1332,8 @@ class U6(Device):
             self.calInfo.proAinNegSlope = [self.calInfo.proAin10vNegSlope, self.calInfo.proAin1vNegSlope, self.calInfo.proAin100mvNegSlope, self.calInfo.proAin10mvNegSlope]
             self.calInfo.proAinCenter = [self.calInfo.proAin10vCenter, self.calInfo.proAin1vCenter, self.calInfo.proAin100mvCenter, self.calInfo.proAin10mvCenter]
 
+        self._saveCalibrationCache(fingerprint, self.calInfo.__dict__)
+
     def getCalibratedSlopesCenter(self, gainIndex, resolutionIndex):
         """
         Name: U6.getCalibratedSlopesCenter(gainIndex,
@@ -1769,16 +1792,13 @@ class U6(Device):
                     
                     self.getFeedback( TimerConfig(i, mode, value) )
 
-class FeedbackCommand(object):
+class FeedbackCommand(LabJackPython.FeedbackCommand):
     '''
     The base FeedbackCommand class
     
     Used to make Feedback easy. Make a list of these
     and call getFeedback.
     '''
-    readLen = 0
-    def handle(self, input):
-        return None
 
 _validChannels = frozenset(range(144))
 
@@ -1806,6 +1826,7 @@ class AIN(FeedbackCommand):
         self.cmdBytes = [ 0x01, PositiveChannel, 0 ]
 
     readLen =  2
+    fields = 'H'
     
     def __repr__(self):
         return "<u6.AIN( PositiveChannel = %s )>" % self.positiveChannel
@@ -1862,6 +1883,11 @@ class AIN24(FeedbackCommand):
         return "<u6.AIN24( PositiveChannel = %s, ResolutionIndex = %s, GainIndex = %s, SettlingFactor = %s, Differential = %s )>" % (self.positiveChannel, self.resolutionIndex, self.gainIndex, self.settlingFactor, self.differential)
 
     readLen =  3
+    fields = 'HB'
+
+    def fromFields(self, values):
+        low, high = values
+        return low + (high << 16)
 
     def handle(self, input):
         #Put it all into an integer.
@@ -2296,6 +2322,16 @@ class Timer(FeedbackCommand):
     def __repr__(self):
         return "<u6.Timer( timer = %s, UpdateReset = %s, Value = %s, Mode = %s )>" % (self.timer, self.updateReset, self.value, self.mode)
     
+    @property
+    def fields(self):
+        # Quadrature input timers are signed, and stop input timers are
+        # the stop value and the edge count.
+        return {8: 'i', 9: 'HH'}.get(self.mode, 'I')
+
+    def fromFields(self, values):
+        maxCount, current = values
+        return current, maxCount
+
     def handle(self, input):
         inStr = pack('B' * len(input), *input)
         if self.mode == 8:
@@ -2589,6 +2625,7 @@ class Counter(FeedbackCommand):
         return "<u6.Counter( counter = %s, Reset = %s )>" % (self.counter, self.reset)
 
     readLen = 4
+    fields = 'I'
 
     def handle(self, input):
         inStr = pack('B' * len(input), *input)
@@ -32,25 +32,28 @@ from LabJackPython import (
     setChecksum8,
     streamByteToInt,
     toDouble,
+    UE9StreamFramer,
     UE9TCPHandle,
     verifyChecksum,
-    _use_py2,
+    _monotonic,
+    _numpy,
+    _openAllDevices,
     )
 
 
-def openAllUE9():
+def openAllUE9(errors = None):
     """
     A helpful function which will open all the connected UE9s. Returns a 
     dictionary where the keys are the serialNumber, and the value is the device
-    object.
+    object. The devices are opened and configured at the same time, up to
+    MAX_ENUMERATION_THREADS at once.
+
+    If errors is a list, a (devNumber, exception) tuple is appended to it for
+    each device that couldn't be opened, and the rest are returned.
+    Otherwise the first error is raised, after closing the devices that
+    were opened.
     """
-    returnDict = dict()
-    
-    for i in range(deviceCount(9)):
-        d = UE9(firstFound = False, devNumber = i+1)
-        returnDict[str(d.serialNumber)] = d
-        
-    return returnDict
+    return _openAllDevices(UE9, 9, errors)
 
 def parseIpAddress(bytes):
     return "%s.%s.%s.%s" % (bytes[3], bytes[2], bytes[1], bytes[0] )
@@ -87,6 +90,7 @@ class UE9(Device):
         self.calData = None
         self.controlFWVersion = self.commFWVersion = None
         self.ethernet = False
+        self.streamFramer = None
 
         if autoOpen:
             self.open(**kargs)
@@ -1058,14 +1062,26 @@ class UE9(Device):
         self.flushBuffer()
         if self.streamStarted == False and clearData == True:
             self.streamClearData()
+        if self.ethernet:
+            sock = self.handle.stream if isinstance(self.handle, UE9TCPHandle) else None
+            self.streamFramer = UE9StreamFramer(sock, self.streamPacketSize, max(256, 4 * self.packetsPerRequest), device = self)
         Device.streamStart(self)
 
-    def streamData(self, convert=True):
+    def streamData(self, convert=True, asArrays=False, bufferPool=None):
         """
-        Name: UE9.streamData(convert=True)
+        Name: UE9.streamData(convert=True, asArrays=False, bufferPool=None)
         Args: convert, should the packets be converted as they are read.
                        set to False to get much faster speeds, but you will
                        have to process the results later.
+              asArrays, if True and convert is True, the AINi values are
+                        NumPy arrays instead of lists. Requires NumPy.
+              bufferPool, a StreamBufferPool to read the raw data into over
+                          USB. The result is then a memoryview of one of the
+                          pool's buffers, which is reused after the pool has
+                          gone around once. Ignored over Ethernet, where
+                          packets are collected in streamFramer, a
+                          UE9StreamFramer that only returns whole packets
+                          with good checksums.
         Desc: Reads stream data from a UE9. See our stream example to get an
               idea of how this function should be called. The return value of
               streamData is a dictionary with the following keys:
@@ -1075,6 +1091,15 @@ class UE9(Device):
               * missed: The number of readings that were missed because of
                         buffer overflow on the LabJack.  Not supported on UE9.
               * firstPacket: The PacketCounter value in the first USB packet.
+              * packetGaps: The indexes of the packets whose PacketCounter
+                            does not follow the packet before, including the
+                            last packet of the previous block.
+              * droppedPackets: The number of packets missing from the
+                                PacketCounter sequence.
+              * backlog: The largest ControlBacklog byte in this block.
+              * badChecksums: The indexes of the packets with bad
+                              checksums. Only there if
+                              verifyStreamChecksums is set to True.
               * result: The raw bytes returned from read(). The only way to get
                         data if called with convert = False.
               * AINi, where i is an entry in the passed in PChannels. If called
@@ -1086,62 +1111,31 @@ class UE9(Device):
         if not self.streamStarted:
             raise LabJackException("Please start streaming before reading.")
 
-        missed = 0  # Not available on UE9
-        errors = 0
         newTimeLoop = True  # Ethernet only
         numBytes = self.streamPacketSize
 
-        if _use_py2:
-            resultBuffer = ""  # Ethernet only
-            zeroVal = "\0"
-        else:
-            resultBuffer = bytes()  # Ethernet only
-            zeroVal = 0
-
         while True:
-            if self.ethernet and newTimeLoop == True:
-                newTimeLoop = False
-                startTime = datetime.datetime.now()
-
-            result = self.read(numBytes * self.packetsPerRequest, stream = True)
-            numPackets = len(result) // numBytes
-            i = 0
-            while i < numPackets:
-                offset = (i*numBytes)
-                # Check for empty data
-                if result[1+offset] == zeroVal:
-                    if all([b == zeroVal for b in result[offset:(offset+numBytes)]]):
-                        if i+1 >= numPackets:
-                            result = result[0:offset]
-                        else:
-                            result = result[0:offset] + result[offset+numBytes:]
-                        numPackets = numPackets - 1
-                        continue
-
-                e = streamByteToInt(result[11+offset])
-                if e != 0:
-                    errors += 1
-                    self._debugprint(e)
-                i+=1
-
-            if len(result) == 0  and self.ethernet == False:
-                # No data over USB
-                yield None
-                continue
-
+            metrics = self.metrics
+            if metrics is not None:
+                start = _monotonic()
             if self.ethernet:
-                # Buffer new data
-                resultBuffer += result
-                packetsInBuffer = len(resultBuffer) // numBytes
+                # Over TCP a read can end anywhere in a packet. The framer
+                # only hands out whole packets that check out.
+                if newTimeLoop == True:
+                    newTimeLoop = False
+                    startTime = datetime.datetime.now()
+
+                if self.streamFramer.available() < self.packetsPerRequest:
+                    if self.streamFramer.sock is not None:
+                        self.streamFramer.fill()
+                    else:
+                        self.streamFramer.feed(self.read(numBytes * self.packetsPerRequest, stream = True))
+                packetsInBuffer = self.streamFramer.available()
 
                 if packetsInBuffer >= self.packetsPerRequest:
                     # We're done reading data
                     newTimeLoop = True
                     numPackets = self.packetsPerRequest
-                    result = resultBuffer[:(numBytes * self.packetsPerRequest)]
-
-                    # Adjust buffered data
-                    resultBuffer = resultBuffer[(numBytes * self.packetsPerRequest):]
                 else:
                     curTime = datetime.datetime.now()
                     timeElapsed = (curTime-startTime).seconds + float((curTime-startTime).microseconds)/1000000
@@ -1154,22 +1148,46 @@ class UE9(Device):
                         else:
                             # Return packets in multiples of 4 like over USB
                             numPackets = (packetsInBuffer // 4) * 4
-                            result = resultBuffer[:(numBytes * numPackets)]
-                            firstPacket = streamByteToInt(result[10])
-
-                            # Adjust buffered data
-                            resultBuffer = resultBuffer[(numBytes * numPackets):]
                     else:
                         continue
 
-            firstPacket = streamByteToInt(result[10])
+                result = self.streamFramer.packets(numPackets)
+            else:
+                if bufferPool is not None:
+                    result = self.streamDataInto(bufferPool.nextBuffer(numBytes * self.packetsPerRequest))
+                else:
+                    result = self.read(numBytes * self.packetsPerRequest, stream = True)
+                numPackets = len(result) // numBytes
+                i = 0
+                while i < numPackets:
+                    offset = (i*numBytes)
+                    # Check for empty data
+                    if streamByteToInt(result[1+offset]) == 0:
+                        if all([streamByteToInt(b) == 0 for b in result[offset:(offset+numBytes)]]):
+                            if isinstance(result, memoryview):
+                                result = result.tobytes()
+                            if i+1 >= numPackets:
+                                result = result[0:offset]
+                            else:
+                                result = result[0:offset] + result[offset+numBytes:]
+                            numPackets = numPackets - 1
+                            continue
+                    i+=1
+
+                if len(result) == 0:
+                    # No data over USB
+                    yield None
+                    continue
 
-            returnDict = dict(numPackets = numPackets, result = result, errors = errors, missed = missed, firstPacket = firstPacket)
+            if metrics is not None:
+                readDone = _monotonic()
+            returnDict = self._streamBlockInfo(result, numBytes)
+            returnDict.update(numPackets = numPackets, result = result)
             if convert:
-                returnDict.update(self.processStreamData(result, numBytes = numBytes))
-
-            errors = 0  # Reset error count
+                returnDict.update(self.processStreamData(result, numBytes = numBytes, asArrays = asArrays))
 
+            if metrics is not None:
+                metrics.streamBlock(start, readDone, _monotonic(), returnDict)
             yield returnDict
 
     def streamStop(self, clearData=True):
@@ -1183,13 +1201,38 @@ class UE9(Device):
         if self.streamStarted == False and clearData == True:
             self.streamClearData()
 
-    def processStreamData(self, result, numBytes=None):
+    _streamSnapshotAttributes = Device._streamSnapshotAttributes + ('streamChannelOptions', 'ethernet', 'streamPacketSize', 'calData')
+
+    def _streamPacketBytes(self):
+        return self.streamPacketSize
+
+    def _streamTrailerBytes(self):
+        # USB stream packets have 2 extra bytes appended to the end.
+        return 0 if self.ethernet else 2
+
+    def _streamBlockInfo(self, result, numBytes):
+        info = Device._streamBlockInfo(self, result, numBytes)
+        info['missed'] = 0  # Not available on UE9
+        return info
+
+    def _streamSampleConverter(self, channelIndex):
+        """
+        Returns a function that calibrates a NumPy array of stream samples
+        from the analog channel at channelIndex.
+        """
+        gain = self.streamChannelOptions[channelIndex] & 0x0F
+        slope, offset = self.getCalibratedSlopeOffset(gain)
+        return self._calibrationTableConverter((gain, 0, slope, offset), lambda values: values * slope + offset)
+
+    def processStreamData(self, result, numBytes=None, asArrays=False):
         """
-        Name: UE9.processStreamData(result, numBytes = None)
+        Name: UE9.processStreamData(result, numBytes = None, asArrays = False)
         Args: result, the string returned from streamData()
               numBytes, the number of bytes per packet
+              asArrays, if True return NumPy arrays instead of lists
         Desc: Breaks stream data into individual channels and applies
-              calibrations.
+              calibrations. Uses NumPy to convert the whole block at once
+              when it is installed.
               
         >>> reading = d.streamData(convert = False)
         >>> print(processStreamData(reading['result']))
@@ -1198,6 +1241,11 @@ class UE9(Device):
         if numBytes is None:
             numBytes = self.streamPacketSize
 
+        if _numpy() is not None:
+            return self._decodeStreamData(result, numBytes, asArrays = asArrays, trailerBytes = self._streamTrailerBytes())
+        elif asArrays:
+            raise LabJackException("NumPy is required to return stream data as arrays.")
+
         returnDict = collections.defaultdict(list)
 
         numChannels = len(self.streamChannelNumbers)
@@ -1650,6 +1698,18 @@ class UE9(Device):
         >>> print(d.binaryToCalibratedAnalogVoltage(65520.0, 0x01, 12))
         2.52598272
         """
+        slope, offset = self.getCalibratedSlopeOffset(gain, resolution)
+        return (bits * slope) + offset
+
+    def getCalibratedSlopeOffset(self, gain, resolution = 0):
+        """
+        Name: UE9.getCalibratedSlopeOffset(gain, resolution = 0)
+        Args: gain, the gain used. Please use the values from 5.3.3 of the
+                    UE9's user's guide.
+              resolution, which resolution did you use?
+        Desc: Get the slope and offset for converting a binary analog input
+              reading into a calibrated voltage.
+        """
         if self.calData is not None:
             if self.hiRes and resolution > 17:
                 slope = self.calData['ProAINSlopes'][str(gain)]
@@ -1662,7 +1722,7 @@ class UE9(Device):
             slope = DEFAULT_CAL_CONSTANTS['AINSlopes'][str(gain)]
             offset = DEFAULT_CAL_CONSTANTS['AINOffsets'][str(gain)]
 
-        return (bits * slope) + offset
+        return slope, offset
 
     def binaryToCalibratedAnalogTemperature(self, bits):
         if self.calData is not None:
@@ -1694,12 +1754,20 @@ class UE9(Device):
         Name: UE9.getCalibrationData()
         Args: None
         Desc: Reads the calibration constants off the UE9, and stores them
-              for use with binaryToCalibratedAnalogVoltage.
+              for use with binaryToCalibratedAnalogVoltage. After
+              setCalibrationCacheDir, they are loaded from the cache when it
+              still matches the device.
         
         Note: Please note that this function calls controlConfig to check
               if the device is a UE9 or not. It also makes calls to
               readMem, so please don't call this while streaming.
         """
+        self.clearCalibrationTables()
+        fingerprint, cached, firstBlock = self._loadCalibrationCache(lambda: self.readMem(0))
+        if cached is not None:
+            self.calData = cached
+            return self.calData
+
         ainslopes = { '0' : None, '1' : None, '2' : None, '3' : None, '8' : None }
         ainoffsets = { '0' : None, '1' : None, '2' : None, '3' : None, '8' : None }
         proainslopes = { '0' : None, '8' : None }
@@ -1709,7 +1777,7 @@ class UE9(Device):
 
         tempslope = None
 
-        memBlock = self.readMem(0)
+        memBlock = firstBlock if firstBlock is not None else self.readMem(0)
         ainslopes['0'] = toDouble(memBlock[:8])
         ainoffsets['0'] = toDouble(memBlock[8:16])
 
@@ -1747,6 +1815,7 @@ class UE9(Device):
 
         self.calData = {"AINSlopes": ainslopes, "AINOffsets": ainoffsets, "ProAINSlopes": proainslopes, "ProAINOffsets": proainoffsets, 'TempSlope': tempslope, "DACSlopes": dacslopes, "DACOffsets": dacoffsets}
 
+        self._saveCalibrationCache(fingerprint, self.calData)
         return self.calData
 
     def readDefaultsConfig(self):
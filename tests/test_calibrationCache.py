@@ -0,0 +1,149 @@
+"""
+Tests for the calibration constants cache of setCalibrationCacheDir, with
+U6 devices opened on EmulatedU6s that have the same serial number, like one
+device opened by several processes.
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import LabJackPython
+import u6
+from LabJackSimulator import EmulatedU6, openEmulated
+
+
+SERIAL_NUMBER = 360001234
+
+
+class _CountingU6(EmulatedU6):
+    # Keeps the numbers of the calibration blocks read.
+    def __init__(self, **kwargs):
+        EmulatedU6.__init__(self, serialNumber = SERIAL_NUMBER, **kwargs)
+        self.blocksRead = []
+
+    def write(self, request, modbus = False):
+        request = bytearray(request)
+        if len(request) >= 8 and request[1] == 0xF8 and request[3] == 0x2D:
+            self.blocksRead.append(request[7])
+        EmulatedU6.write(self, request, modbus)
+
+
+class CalibrationCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        LabJackPython.setCalibrationCacheDir(self.directory)
+
+    def tearDown(self):
+        LabJackPython.setCalibrationCacheDir(None)
+        shutil.rmtree(self.directory)
+
+    def open(self, handle = None):
+        # Returns the device, with its calibration constants read, and the
+        # calibration blocks that were read.
+        if handle is None:
+            handle = _CountingU6()
+        d = openEmulated(u6.U6(autoOpen = False), handle)
+        self.addCleanup(d.close)
+        d.getCalibrationData()
+        return d, handle.blocksRead
+
+    def cacheFile(self):
+        return os.path.join(self.directory, "%s-%s.json" % (LabJackPython.LJ_dtU6, SERIAL_NUMBER))
+
+    def testHit(self):
+        first, blocksRead = self.open()
+        self.assertEqual(blocksRead, list(range(10)))
+        self.assertTrue(os.path.exists(self.cacheFile()))
+
+        second, blocksRead = self.open()
+        # Only block 0, to check the cache is still right.
+        self.assertEqual(blocksRead, [0])
+        self.assertEqual(second.calInfo.__dict__, first.calInfo.__dict__)
+        self.assertFalse(second.calInfo.nominal)
+
+    def testHitWithoutVerifying(self):
+        first, blocksRead = self.open()
+        LabJackPython.setCalibrationCacheDir(self.directory, verify = False)
+        second, blocksRead = self.open()
+        self.assertEqual(blocksRead, [])
+        self.assertEqual(second.calInfo.__dict__, first.calInfo.__dict__)
+
+    def testOff(self):
+        LabJackPython.setCalibrationCacheDir(None)
+        self.open()
+        d, blocksRead = self.open()
+        self.assertEqual(blocksRead, list(range(10)))
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def testFirmwareChanged(self):
+        self.open()
+        handle = _CountingU6()
+        d = openEmulated(u6.U6(autoOpen = False), handle)
+        self.addCleanup(d.close)
+        d.firmwareVersion = "9.99"
+        d.getCalibrationData()
+        self.assertEqual(handle.blocksRead, list(range(10)))
+        with open(self.cacheFile()) as f:
+            self.assertEqual(json.load(f)['fingerprint']['firmwareVersion'], "9.99")
+
+    def testFirstBlockChanged(self):
+        self.open()
+        handle = _CountingU6()
+        handle.calInfo.ain10vSlope *= 1.001
+        d, blocksRead = self.open(handle)
+        self.assertEqual(blocksRead, list(range(10)))
+        self.assertAlmostEqual(d.calInfo.ain10vSlope, handle.calInfo.ain10vSlope)
+
+        # The cache now has the new constants.
+        handle = _CountingU6()
+        handle.calInfo.ain10vSlope *= 1.001
+        again, blocksRead = self.open(handle)
+        self.assertEqual(blocksRead, [0])
+        self.assertAlmostEqual(again.calInfo.ain10vSlope, handle.calInfo.ain10vSlope)
+
+    def testCorruptFile(self):
+        first, blocksRead = self.open()
+        for contents in ("{not json", "[1, 2, 3]", '{"fingerprint": 5}', ""):
+            with open(self.cacheFile(), "w") as f:
+                f.write(contents)
+            d, blocksRead = self.open()
+            self.assertEqual(blocksRead, list(range(10)), contents)
+            self.assertEqual(d.calInfo.__dict__, first.calInfo.__dict__)
+            # Replaced with a good one.
+            with open(self.cacheFile()) as f:
+                self.assertEqual(json.load(f)['calibration'], json.loads(json.dumps(first.calInfo.__dict__)))
+
+    def testAtomicWrite(self):
+        self.open()
+        # A reader that opened the file before it's replaced still reads the
+        # whole old file, and no temporary files are left.
+        with open(self.cacheFile()) as reader:
+            d = openEmulated(u6.U6(autoOpen = False), _CountingU6())
+            self.addCleanup(d.close)
+            d.firmwareVersion = "9.99"
+            d.getCalibrationData()
+            self.assertNotEqual(json.load(reader)['fingerprint']['firmwareVersion'], "9.99")
+        self.assertEqual(os.listdir(self.directory), [os.path.basename(self.cacheFile())])
+
+    def testCacheNotWritable(self):
+        # The cache directory is a file, so nothing can be saved. The
+        # constants are still read.
+        os.rmdir(self.directory)
+        with open(self.directory, "w") as f:
+            f.write("not a directory")
+        try:
+            d, blocksRead = self.open()
+            self.assertEqual(blocksRead, list(range(10)))
+            self.assertFalse(d.calInfo.nominal)
+        finally:
+            os.remove(self.directory)
+            os.mkdir(self.directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
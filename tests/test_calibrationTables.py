@@ -0,0 +1,104 @@
+"""
+Tests for the cache of calibration lookup tables used to convert stream
+data with NumPy.
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import LabJackPython
+import u6
+from LabJackSimulator import EmulatedU6, openEmulated
+
+
+def _streamBlock(device, numPackets):
+    # Packets with random samples. Only the samples matter to the decoder.
+    numBytes = device._streamPacketBytes()
+    block = bytearray()
+    for i in range(numPackets):
+        packet = bytearray(numBytes)
+        for j in range(12, numBytes - 2):
+            packet[j] = random.randrange(256)
+        block += packet
+    return bytes(block)
+
+
+@unittest.skipIf(LabJackPython._numpy() is None, "NumPy is not installed")
+class CalibrationTableTest(unittest.TestCase):
+    def openDevice(self, gainIndexes):
+        d = openEmulated(u6.U6(autoOpen = False), EmulatedU6())
+        d.getCalibrationData()
+        self.configure(d, gainIndexes)
+        return d
+
+    def configure(self, d, gainIndexes):
+        options = [gainIndex << 4 for gainIndex in gainIndexes]
+        d.streamConfig(NumChannels = len(options), ChannelNumbers = list(range(len(options))), ChannelOptions = options, ScanFrequency = 1000)
+
+    def testTablesAreCached(self):
+        d = self.openDevice([0, 1, 0, 1])
+        block = _streamBlock(d, 4)
+        first = d.processStreamData(block)
+        info = d.calibrationTableCacheInfo()
+        self.assertEqual(info['tables'], 2)
+        self.assertEqual(info['keys'], 2)
+        self.assertEqual(info['maxTables'], LabJackPython.CALIBRATION_TABLE_CACHE_SIZE)
+        self.assertEqual(info['bytes'], 2 * 65536 * 8)
+
+        tables = list(d._calibrationTables.values())
+        d.streamPacketOffset = 0
+        self.assertEqual(d.processStreamData(block), first)
+        self.assertEqual([id(table) for table in d._calibrationTables.values()], [id(table) for table in tables])
+
+    def testLeastRecentlyUsedIsEvicted(self):
+        d = self.openDevice([0])
+        d.calibrationTableCacheSize = 2
+        block = _streamBlock(d, 2)
+        for gainIndex in (0, 1, 2):
+            self.configure(d, [gainIndex])
+            d.processStreamData(block)
+
+        self.assertEqual(d.calibrationTableCacheInfo()['tables'], 2)
+        self.assertEqual(sorted([key[0] for key in d._calibrationTables]), [1, 2])
+
+        # Using gain 1 again makes gain 2 the least recently used.
+        self.configure(d, [1])
+        d.processStreamData(block)
+        self.configure(d, [3])
+        d.processStreamData(block)
+        self.assertEqual(sorted([key[0] for key in d._calibrationTables]), [1, 3])
+
+    def testMoreKeysThanTheCacheHolds(self):
+        gainIndexes = [0, 1, 2, 3]
+        d = self.openDevice(gainIndexes)
+        d.calibrationTableCacheSize = 2
+        reference = self.openDevice(gainIndexes)
+
+        block = _streamBlock(d, 6)
+        for i in range(3):
+            result = d.processStreamData(block)
+            expected = reference.processStreamData(block)
+            self.assertEqual(sorted(result), sorted(expected))
+            for name in expected:
+                for value, expectedValue in zip(result[name], expected[name]):
+                    self.assertAlmostEqual(value, expectedValue)
+
+            # The first two keys stay in the cache, and the other two are
+            # converted directly rather than evicting them every block.
+            info = d.calibrationTableCacheInfo()
+            self.assertEqual(info['tables'], 2)
+            self.assertEqual(info['keys'], 4)
+            self.assertEqual(sorted([key[0] for key in d._calibrationTables]), [0, 1])
+
+    def testClear(self):
+        d = self.openDevice([0, 1])
+        d.processStreamData(_streamBlock(d, 2))
+        d.clearCalibrationTables()
+        self.assertEqual(d.calibrationTableCacheInfo()['tables'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Tests for CommandPipeline and Device.writeReadMany on an EmulatedU6, both
+over USB, where each command is answered before the next is sent, and with
+the responses coming back over a socket, like UE9 Ethernet and LJSocket,
+where up to window commands are sent ahead.
+"""
+import os
+import socket
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import u6
+from LabJackPython import LabJackException
+from LabJackSimulator import EmulatedU6, openEmulated
+
+
+# A Feedback command with one AIN command, and its response.
+READ_LEN = 12
+COMMAND_BYTES = [0xF8, 0x03, 0x00]
+
+
+def _ainCommand(echo, channel):
+    return [0, 0xF8, 0x02, 0x00, 0, 0, echo, 1, channel, 0]
+
+
+class _CountingSocket(object):
+    # Counts the bytes the pipeline receives.
+    def __init__(self, sock):
+        self.sock = sock
+        self.received = 0
+
+    def recv_into(self, buffer, numBytes):
+        count = self.sock.recv_into(buffer, numBytes)
+        self.received += count
+        return count
+
+
+class _SocketU6(EmulatedU6):
+    """
+    An EmulatedU6 that sends its command responses over a socket once
+    overSocket is set. Keeps the most commands that were waiting for their
+    responses at once, and stops answering after failAfter commands.
+    """
+    def __init__(self, failAfter = None, **kwargs):
+        EmulatedU6.__init__(self, **kwargs)
+        client, self.peer = socket.socketpair()
+        self.client = _CountingSocket(client)
+        self.failAfter = failAfter
+        self.overSocket = False
+        self.sent = 0
+        self.maxOutstanding = 0
+
+    def write(self, request, modbus = False):
+        EmulatedU6.write(self, request, modbus)
+        if not self.overSocket:
+            return
+        self.sent += 1
+        outstanding = self.sent - self.client.received // READ_LEN
+        self.maxOutstanding = max(self.maxOutstanding, outstanding)
+        if self.failAfter is not None and self.sent > self.failAfter:
+            self.peer.close()
+            return
+        self.peer.sendall(EmulatedU6.read(self, READ_LEN))
+
+    def close(self):
+        EmulatedU6.close(self)
+        self.peer.close()
+        self.client.sock.close()
+
+
+class _PipelinedU6(u6.U6):
+    def _commandSocket(self):
+        return self.handle.client
+
+
+def _openDevice(handle):
+    # Opens the device over USB, so its configuration is read one command
+    # at a time, and then sends commands over the handle's socket.
+    d = openEmulated(u6.U6(autoOpen = False), handle)
+    d.__class__ = _PipelinedU6
+    handle.overSocket = True
+    return d
+
+
+def _signals():
+    # Each input reads its own number in volts, so every response differs.
+    return dict([(channel, lambda t, volts = channel * 0.5: volts) for channel in range(8)])
+
+
+def _commands(count):
+    return [(_ainCommand(i, i % 8), READ_LEN, COMMAND_BYTES) for i in range(count)]
+
+
+class CommandPipelineTest(unittest.TestCase):
+    def expected(self, count):
+        # The responses of the commands sent one at a time.
+        d = openEmulated(u6.U6(autoOpen = False), EmulatedU6(signals = _signals()))
+        try:
+            return [bytearray(d._writeRead(command, readLen, commandBytes)) for command, readLen, commandBytes in _commands(count)]
+        finally:
+            d.close()
+
+    def testOverUSB(self):
+        d = openEmulated(u6.U6(autoOpen = False), EmulatedU6(signals = _signals()))
+        try:
+            responses = d.writeReadMany(_commands(20), window = 4)
+            self.assertEqual(responses, self.expected(20))
+            self.assertEqual([response[6] for response in responses], [0] * 20)
+            self.assertFalse(d.deviceLock.locked())
+        finally:
+            d.close()
+
+    def testResponsesInOrder(self):
+        handle = _SocketU6(signals = _signals())
+        d = _openDevice(handle)
+        try:
+            responses = d.writeReadMany(_commands(30), window = 8)
+            self.assertEqual(responses, self.expected(30))
+            self.assertEqual(handle.maxOutstanding, 8)
+            self.assertFalse(d.deviceLock.locked())
+        finally:
+            d.close()
+
+    def testWindow(self):
+        for window in (1, 3, 16):
+            handle = _SocketU6(signals = _signals())
+            d = _openDevice(handle)
+            try:
+                with d.commandPipeline(window) as pipeline:
+                    futures = [pipeline.submit(command, readLen, commandBytes) for command, readLen, commandBytes in _commands(20)]
+                    self.assertEqual(len(pipeline.outstanding), window)
+                    self.assertTrue(d.deviceLock.locked())
+                self.assertEqual(handle.maxOutstanding, window)
+                self.assertTrue(all([future.done() for future in futures]))
+                self.assertEqual([future.result()[8] for future in futures], list(range(20)))
+            finally:
+                d.close()
+
+    def testBadWindow(self):
+        d = openEmulated(u6.U6(autoOpen = False), EmulatedU6())
+        try:
+            self.assertRaises(LabJackException, d.commandPipeline, 0)
+        finally:
+            d.close()
+
+    def testConnectionLost(self):
+        handle = _SocketU6(failAfter = 5, signals = _signals())
+        d = _openDevice(handle)
+        try:
+            self.assertRaises(LabJackException, d.writeReadMany, _commands(12), window = 4)
+            self.assertFalse(d.deviceLock.locked())
+        finally:
+            d.close()
+
+    def testErrorInResponse(self):
+        # The third response doesn't echo the command bytes it's checked
+        # against. Every response is still read before the error is raised.
+        handle = _SocketU6(signals = _signals())
+        d = _openDevice(handle)
+        try:
+            commands = _commands(6)
+            commands[2] = (_ainCommand(2, 2), READ_LEN, [0xF8, 0x03, 0x01])
+            with d.commandPipeline(4) as pipeline:
+                futures = [pipeline.submit(command, readLen, commandBytes) for command, readLen, commandBytes in commands]
+            self.assertFalse(d.deviceLock.locked())
+            self.assertEqual(futures[1].result()[8], 1)
+            self.assertRaises(LabJackException, futures[2].result)
+            self.assertEqual(futures[5].result()[8], 5)
+
+            sent = handle.sent
+            self.assertRaises(LabJackException, d.writeReadMany, commands)
+            self.assertEqual(handle.sent - sent, 6)
+            self.assertFalse(d.deviceLock.locked())
+        finally:
+            d.close()
+
+    def testErrorInBlock(self):
+        handle = _SocketU6(signals = _signals())
+        d = _openDevice(handle)
+        try:
+            try:
+                with d.commandPipeline(4) as pipeline:
+                    futures = [pipeline.submit(command, readLen, commandBytes) for command, readLen, commandBytes in _commands(3)]
+                    raise ValueError()
+            except ValueError:
+                pass
+            self.assertFalse(d.deviceLock.locked())
+            self.assertEqual([future.result()[8] for future in futures], [0, 1, 2])
+        finally:
+            d.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
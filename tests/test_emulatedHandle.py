@@ -0,0 +1,41 @@
+"""
+Tests for EmulatedHandle, the base of the handles that answer in software.
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import u6
+from LabJackPython import EmulatedHandle, LabJackException
+from LabJackSimulator import openEmulated
+
+
+class WriteOnlyHandle(EmulatedHandle):
+    devType = 6
+
+    def write(self, data, modbus = False):
+        pass
+
+
+class EmulatedHandleTest(unittest.TestCase):
+    def testMissingMethodsNameTheSubclass(self):
+        handle = WriteOnlyHandle()
+        for call, method in ((lambda: handle.read(10), "read"), (lambda: handle.streamRead(10, 1), "streamRead")):
+            try:
+                call()
+            except LabJackException:
+                message = str(sys.exc_info()[1])
+                self.assertTrue("WriteOnlyHandle" in message, message)
+                self.assertTrue("EmulatedHandle.%s" % method in message, message)
+            else:
+                self.fail("%s didn't raise" % method)
+
+    def testOpeningRaises(self):
+        # Opening reads the device's configuration, which the handle can't.
+        self.assertRaises(LabJackException, openEmulated, u6.U6(autoOpen = False), WriteOnlyHandle())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+"""
+Tests LabJackChecksum against the list-based checksum functions
+LabJackPython had before it, on random normal and extended packets given as
+lists, bytes, bytearrays and memoryviews, and checks verifyStreamPackets
+gives the same mask with and without NumPy.
+"""
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import LabJackChecksum
+
+
+# The checksum functions as LabJackPython had them, on lists.
+def _baselineSetChecksum16(buffer):
+    total = 0
+    for i in range(6, len(buffer)):
+        total += (buffer[i] & 0xff)
+    buffer[4] = (total & 0xff)
+    buffer[5] = ((total >> 8) & 0xff)
+    return buffer
+
+
+def _baselineSetChecksum8(buffer, numBytes):
+    total = 0
+    for i in range(1, numBytes):
+        total += (buffer[i] & 0xff)
+    buffer[0] = (total & 0xff) + ((total >> 8) & 0xff)
+    buffer[0] = (buffer[0] & 0xff) + ((buffer[0] >> 8) & 0xff)
+    return buffer
+
+
+def _baselineSetChecksum(command):
+    if (command[1] & 0x78) >> 3 == 15:
+        command = _baselineSetChecksum16(command)
+        return _baselineSetChecksum8(command, 6)
+    return _baselineSetChecksum8(command, len(command))
+
+
+def _baselineVerifyChecksum(buffer):
+    buff0 = buffer[0]
+    buff4 = buffer[4]
+    buff5 = buffer[5]
+    tempBuffer = _baselineSetChecksum(buffer)
+    return buff0 == tempBuffer[0] and buff4 == tempBuffer[4] and buff5 == tempBuffer[5]
+
+
+def _withoutNumpy(function, *args, **kwargs):
+    # Runs function with LabJackChecksum acting as if NumPy isn't installed.
+    LabJackChecksum._numpy()
+    numpy = LabJackChecksum.numpy
+    LabJackChecksum.numpy = None
+    try:
+        return function(*args, **kwargs)
+    finally:
+        LabJackChecksum.numpy = numpy
+
+
+def _randomPacket(extended):
+    packet = [random.randrange(256) for i in range(random.randrange(6, 80))]
+    if extended:
+        packet[1] = random.choice([0xF8, 0xF9])
+    elif (packet[1] & 0x78) >> 3 == 15:
+        packet[1] &= 0x87
+    return packet
+
+
+def _asTypes(packet):
+    # packet as each buffer type LabJackChecksum takes.
+    return [list(packet), bytes(bytearray(packet)), bytearray(packet), memoryview(bytearray(packet))]
+
+
+def _streamBlock(numPackets, numBytes, trailerBytes):
+    # Stream packets with their checksums set, except for about a third,
+    # which have a byte changed. Ends with a partial packet.
+    block = bytearray()
+    expected = []
+    for i in range(numPackets):
+        packet = bytearray([random.randrange(256) for j in range(numBytes - trailerBytes)])
+        packet[1] = 0xF9
+        packet = _baselineSetChecksum(packet)
+        valid = random.random() > 0.3
+        if not valid:
+            position = random.choice([0, 4, 5, random.randrange(6, len(packet))])
+            packet[position] = (packet[position] + random.randrange(1, 256)) & 0xff
+        block += packet + bytearray([random.randrange(256) for j in range(trailerBytes)])
+        expected.append(valid)
+    return bytes(block + bytearray(numBytes // 2)), expected
+
+
+class LabJackChecksumTest(unittest.TestCase):
+    def testMatchesBaseline(self):
+        random.seed(1)
+        for i in range(300):
+            packet = _randomPacket(i % 2)
+            expected = _baselineSetChecksum(list(packet))
+            extended = i % 2 == 1
+            self.assertEqual(LabJackChecksum.isExtended(packet), extended)
+            for buffer in _asTypes(packet):
+                name = type(buffer).__name__
+                if extended:
+                    self.assertEqual(LabJackChecksum.checksum16(buffer), expected[4] + (expected[5] << 8), name)
+                else:
+                    self.assertEqual(LabJackChecksum.checksum8(buffer), expected[0], name)
+            if extended:
+                # The checksum8 covers the checksum16.
+                for buffer in _asTypes(expected):
+                    self.assertEqual(LabJackChecksum.checksum8(buffer, 6), expected[0], type(buffer).__name__)
+
+            for buffer in (list(packet), bytearray(packet)):
+                self.assertEqual(list(LabJackChecksum.setChecksum(buffer)), expected)
+
+    def testOffset(self):
+        random.seed(2)
+        for i in range(100):
+            packet = _baselineSetChecksum(_randomPacket(i % 2))
+            prefix = [random.randrange(256) for j in range(random.randrange(10))]
+            suffix = [random.randrange(256) for j in range(random.randrange(10))]
+            for buffer in _asTypes(prefix + packet + suffix):
+                self.assertTrue(LabJackChecksum.verifyChecksum(buffer, len(packet), len(prefix)))
+                self.assertEqual(LabJackChecksum.checksum8(buffer, len(packet), len(prefix)), LabJackChecksum.checksum8(packet))
+
+    def testVerifyMatchesBaseline(self):
+        random.seed(3)
+        for i in range(300):
+            packet = _randomPacket(i % 2)
+            if i % 3:
+                packet = _baselineSetChecksum(packet)
+            expected = _baselineVerifyChecksum(list(packet))
+            for buffer in _asTypes(packet):
+                self.assertEqual(LabJackChecksum.verifyChecksum(buffer), expected, type(buffer).__name__)
+
+    def testVerifyDoesntChangeThePacket(self):
+        random.seed(4)
+        for i in range(50):
+            packet = _randomPacket(i % 2)
+            for buffer in (list(packet), bytearray(packet)):
+                LabJackChecksum.verifyChecksum(buffer)
+                self.assertEqual(list(buffer), packet)
+
+    def testStreamPackets(self):
+        random.seed(5)
+        for numBytes, trailerBytes in ((64, 0), (48, 2), (46, 0), (14, 0)):
+            block, expected = _streamBlock(40, numBytes, trailerBytes)
+            mask = _withoutNumpy(LabJackChecksum.verifyStreamPackets, block, numBytes, trailerBytes)
+            self.assertTrue(isinstance(mask, list))
+            self.assertEqual(mask, expected)
+            for data in (bytearray(block), memoryview(block)):
+                self.assertEqual(_withoutNumpy(LabJackChecksum.verifyStreamPackets, data, numBytes, trailerBytes), expected)
+
+    @unittest.skipIf(LabJackChecksum._numpy() is None, "NumPy is not installed")
+    def testStreamPacketsWithNumpy(self):
+        random.seed(6)
+        for numBytes, trailerBytes in ((64, 0), (48, 2), (46, 0), (14, 0)):
+            block, expected = _streamBlock(40, numBytes, trailerBytes)
+            for data in (block, bytearray(block), memoryview(block)):
+                mask = LabJackChecksum.verifyStreamPackets(data, numBytes, trailerBytes)
+                self.assertEqual(mask.dtype, bool)
+                self.assertEqual(mask.tolist(), expected)
+                self.assertEqual(mask.tolist(), _withoutNumpy(LabJackChecksum.verifyStreamPackets, data, numBytes, trailerBytes))
+
+
+if __name__ == "__main__":
+    unittest.main()
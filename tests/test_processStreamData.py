@@ -0,0 +1,153 @@
+"""
+Tests that processStreamData gives the same results with NumPy, which
+converts whole blocks at once, as without it, for the U3, U6 and UE9. Each
+case converts a run of blocks of different sizes, so the channel rotation
+kept in streamPacketOffset is carried from block to block.
+"""
+import collections
+import os
+import random
+import struct
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import LabJackPython
+import u3
+import u6
+import ue9
+
+
+def _withoutNumpy(function, *args, **kwargs):
+    # Runs function with LabJackPython acting as if NumPy isn't installed.
+    LabJackPython._numpy()
+    numpy = LabJackPython.numpy
+    LabJackPython.numpy = None
+    try:
+        return function(*args, **kwargs)
+    finally:
+        LabJackPython.numpy = numpy
+
+
+def _streamBlock(numPackets, samplesPerPacket, trailerBytes = 0):
+    # Packets with a header, random samples, a footer and trailerBytes.
+    block = bytearray()
+    for i in range(numPackets):
+        block += bytearray([0, 0xF9, 4 + samplesPerPacket, 0xC0, 0, 0, 0, 0, 0, 0, i & 0xff, 0])
+        for j in range(samplesPerPacket):
+            block += struct.pack("<H", random.randrange(65536))
+        block += bytearray(2 + trailerBytes)
+    return bytes(block)
+
+
+def _setChannels(d, channelNumbers):
+    d.streamChannelNumbers = channelNumbers
+    counts = collections.Counter(channelNumbers)
+    d.streamChannelDuplicates = collections.Counter(dict([(k, c) for k, c in counts.items() if c > 1]))
+    d.streamPacketOffset = 0
+
+
+def _u6(channelNumbers, channelOptions, isPro = False):
+    d = u6.U6(autoOpen = False)
+    d.streamSamplesPerPacket = 25
+    d.streamChannelOptions = channelOptions
+    d.isPro = isPro
+    if isPro:
+        # Hi-res constants that differ from the normal ones.
+        d.calInfo.proAinSlope = [slope * 1.01 for slope in d.calInfo.ainSlope]
+        d.calInfo.proAinNegSlope = [slope * 1.01 for slope in d.calInfo.ainNegSlope]
+        d.calInfo.proAinCenter = [center + 3 for center in d.calInfo.ainCenter]
+    _setChannels(d, channelNumbers)
+    return d
+
+
+def _u3(channelNumbers, negChannels, isHV = False):
+    d = u3.U3(autoOpen = False)
+    d.streamSamplesPerPacket = 25
+    d.streamNegChannels = negChannels
+    d.isHV = isHV
+    _setChannels(d, channelNumbers)
+    return d
+
+
+def _ue9(channelNumbers, channelOptions, hiRes = False):
+    d = ue9.UE9(autoOpen = False)
+    d.ethernet = False
+    d.hiRes = hiRes
+    d.streamPacketSize = 48
+    d.streamSamplesPerPacket = 16
+    d.streamChannelOptions = channelOptions
+    _setChannels(d, channelNumbers)
+    return d
+
+
+# (name, function making the device, samples per packet, trailer bytes)
+CASES = [
+    ("U6 one channel", lambda: _u6([0], [0]), 25, 0),
+    ("U6 gains", lambda: _u6([0, 1, 2, 3], [0x00, 0x10, 0x20, 0x30]), 25, 0),
+    ("U6 duplicate channels", lambda: _u6([0, 1, 0, 0, 2], [0x00, 0x10, 0x00, 0x00, 0x20]), 25, 0),
+    ("U6 differential", lambda: _u6([0, 2], [0x80, 0x90]), 25, 0),
+    ("U6 hi-res", lambda: _u6([0, 1, 0], [0x00, 0x10, 0x00], isPro = True), 25, 0),
+    ("U6 digital and timers", lambda: _u6([0, 193, 200, 224, 0], [0x10, 0, 0, 0, 0x10]), 25, 0),
+    ("U3 single ended", lambda: _u3([0, 1, 5], [31, 31, 31]), 25, 0),
+    ("U3 differential and special", lambda: _u3([0, 1, 2, 3], [1, 32, 30, 31]), 25, 0),
+    ("U3 HV", lambda: _u3([0, 1, 4, 5], [31, 32, 31, 3], isHV = True), 25, 0),
+    ("U3 timer, counter and MSB", lambda: _u3([200, 224, 210, 224, 0], [31, 31, 31, 31, 31]), 25, 0),
+    ("U3 digital and duplicates", lambda: _u3([2, 2, 194, 193, 2], [31, 31, 31, 31, 31]), 25, 0),
+    ("UE9 USB", lambda: _ue9([0, 1, 2], [0x08, 0x00, 0x01]), 16, 2),
+    ("UE9 USB duplicates and timers", lambda: _ue9([1, 193, 200, 1, 0], [0x00, 0, 0, 0x00, 0x02]), 16, 2),
+    ("UE9 USB hi-res", lambda: _ue9([0, 1], [0x00, 0x08], hiRes = True), 16, 2),
+]
+
+
+class ProcessStreamDataTest(unittest.TestCase):
+    def assertSameResults(self, result, expected, msg):
+        self.assertEqual(sorted(result), sorted(expected), msg)
+        for name in expected:
+            self.assertEqual(len(result[name]), len(expected[name]), "%s %s" % (msg, name))
+            for value, expectedValue in zip(result[name], expected[name]):
+                if isinstance(expectedValue, tuple):
+                    self.assertEqual(tuple(value), expectedValue, "%s %s" % (msg, name))
+                else:
+                    self.assertAlmostEqual(value, expectedValue, 9, "%s %s" % (msg, name))
+
+    @unittest.skipIf(LabJackPython._numpy() is None, "NumPy is not installed")
+    def testWithAndWithoutNumpy(self):
+        random.seed(1)
+        for name, makeDevice, samplesPerPacket, trailerBytes in CASES:
+            withNumpy = makeDevice()
+            withoutNumpy = makeDevice()
+            numBytes = 14 + 2 * samplesPerPacket + trailerBytes
+            # Packet counts that don't divide the channels, so every block
+            # starts at another place in the scan.
+            for numPackets in (1, 3, 2, 7, 1, 4):
+                block = _streamBlock(numPackets, samplesPerPacket, trailerBytes)
+                msg = "%s, %s packets" % (name, numPackets)
+                expected = _withoutNumpy(withoutNumpy.processStreamData, block, numBytes)
+                result = withNumpy.processStreamData(block, numBytes)
+                self.assertSameResults(result, expected, msg)
+                # The UE9 without NumPy can leave the offset at the number
+                # of channels, which is the same as 0.
+                numChannels = len(withNumpy.streamChannelNumbers)
+                self.assertEqual(withNumpy.streamPacketOffset % numChannels, withoutNumpy.streamPacketOffset % numChannels, msg)
+
+    @unittest.skipIf(LabJackPython._numpy() is None, "NumPy is not installed")
+    def testArraysMatchLists(self):
+        random.seed(2)
+        for name, makeDevice, samplesPerPacket, trailerBytes in CASES:
+            lists = makeDevice()
+            arrays = makeDevice()
+            numBytes = 14 + 2 * samplesPerPacket + trailerBytes
+            block = _streamBlock(3, samplesPerPacket, trailerBytes)
+            expected = lists.processStreamData(block, numBytes)
+            result = arrays.processStreamData(block, numBytes, asArrays = True)
+            self.assertSameResults(dict([(k, v.tolist()) for k, v in result.items()]), expected, name)
+
+    def testArraysNeedNumpy(self):
+        d = _u6([0], [0])
+        self.assertRaises(LabJackPython.LabJackException, _withoutNumpy, d.processStreamData, _streamBlock(1, 25), 64, asArrays = True)
+
+
+if __name__ == "__main__":
+    unittest.main()
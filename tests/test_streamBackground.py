@@ -0,0 +1,202 @@
+"""
+Tests for background streaming: streamStartBackground, streamReadBackground
+and streamStopBackground, with an EmulatedU6 as the device.
+"""
+import os
+import sys
+import time
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import u6
+from LabJackPython import LabJackException
+from LabJackSimulator import EmulatedU6, openEmulated
+
+
+class ScriptedU6(EmulatedU6):
+    """
+    An EmulatedU6 whose stream reads return the blocks in script in
+    order, then nothing. A None in script is a read that timed out, and an
+    exception is raised by the read.
+    """
+    def __init__(self):
+        EmulatedU6.__init__(self)
+        self.script = []
+
+    def streamRead(self, numBytes, timeout):
+        if not self.script:
+            time.sleep(0.001)
+            return b""
+        block = self.script.pop(0)
+        if isinstance(block, Exception):
+            raise block
+        return b"" if block is None else block[:numBytes]
+
+
+def _block(firstPacket, numPackets, packetBytes):
+    # Packets that only have a PacketCounter, and the block's first
+    # PacketCounter in every other byte, to tell the blocks apart.
+    block = bytearray([firstPacket & 0xff]) * (numPackets * packetBytes)
+    for i in range(numPackets):
+        block[i * packetBytes + 10] = (firstPacket + i) & 0xff
+        block[i * packetBytes + 11] = 0
+    return bytes(block)
+
+
+class StreamBackgroundTest(unittest.TestCase):
+    def openDevice(self):
+        d = openEmulated(u6.U6(autoOpen = False), ScriptedU6())
+        d.streamConfig(NumChannels = 1, ChannelNumbers = [0], ChannelOptions = [0], ScanFrequency = 1000)
+        return d
+
+    def scriptBlocks(self, d, count):
+        # count blocks, the first starting at packet 1 * packetsPerRequest,
+        # the next at 2 * packetsPerRequest and so on.
+        numPackets = d.packetsPerRequest
+        packetBytes = d._streamPacketBytes()
+        return [_block(i * numPackets, numPackets, packetBytes) for i in range(1, count + 1)]
+
+    def waitForScript(self, d):
+        while d.handle.script:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+    def testBlocksInOrder(self):
+        d = self.openDevice()
+        d.handle.script = self.scriptBlocks(d, 10)
+        d.streamStartBackground(queueDepth = 16)
+        try:
+            firstPackets = [d.streamReadBackground(timeout = 1)['firstPacket'] for i in range(10)]
+            self.assertEqual(d.streamReadBackground(timeout = 0.05), None)
+        finally:
+            stats = d.streamStopBackground()
+        # The PacketCounter is a byte.
+        self.assertEqual(firstPackets, [(i * d.packetsPerRequest) & 0xff for i in range(1, 11)])
+        self.assertEqual(stats['blocks'], 10)
+        self.assertEqual(stats['dropped'], 0)
+        self.assertEqual(stats['queued'], 0)
+
+    def testQueueOverflow(self):
+        # Nothing is read until all 10 blocks are, so the first 3 are
+        # queued and the other 7 dropped.
+        d = self.openDevice()
+        blocks = self.scriptBlocks(d, 10)
+        d.handle.script = list(blocks)
+        d.streamStartBackground(queueDepth = 3)
+        try:
+            self.waitForScript(d)
+            stats = d.streamBackgroundStats()
+            self.assertEqual(stats['blocks'], 10)
+            self.assertEqual(stats['dropped'], 7)
+            self.assertEqual(stats['queued'], 3)
+            self.assertEqual(stats['highWaterMark'], 3)
+            self.assertEqual(stats['queueDepth'], 3)
+
+            # The dropped blocks were read into free buffers, not the
+            # queued blocks' ones.
+            for i in range(3):
+                block = d.streamReadBackground(timeout = 1)
+                self.assertEqual(bytes(block['result']), blocks[i])
+            self.assertEqual(d.streamBackgroundStats()['queued'], 0)
+
+            # With room in the queue again, blocks are queued.
+            d.handle.script = self.scriptBlocks(d, 2)
+            self.waitForScript(d)
+            self.assertEqual(d.streamReadBackground(timeout = 1)['firstPacket'], d.packetsPerRequest)
+        finally:
+            stats = d.streamStopBackground()
+        self.assertEqual(stats['blocks'], 12)
+        self.assertEqual(stats['dropped'], 7)
+        self.assertEqual(stats['queued'], 1)
+
+    def testStopJoinsTheThread(self):
+        d = self.openDevice()
+        d.streamStartBackground()
+        reader = d._streamReader
+        self.assertTrue(reader.is_alive())
+        time.sleep(0.05)
+
+        start = time.time()
+        stats = d.streamStopBackground()
+        self.assertTrue(time.time() - start < 1)
+        self.assertFalse(reader.is_alive())
+        self.assertFalse(d.streamStarted)
+        self.assertEqual(stats['blocks'], 0)
+        self.assertTrue(stats['emptyReads'] > 0)
+
+        self.assertRaises(LabJackException, d.streamReadBackground, 0)
+        self.assertRaises(LabJackException, d.streamBackgroundStats)
+        self.assertRaises(LabJackException, d.streamStopBackground)
+
+        # And it can be started again.
+        d.handle.script = self.scriptBlocks(d, 1)
+        d.streamStartBackground()
+        try:
+            self.assertEqual(d.streamReadBackground(timeout = 1)['firstPacket'], d.packetsPerRequest)
+        finally:
+            d.streamStopBackground()
+
+    def testStartTwice(self):
+        d = self.openDevice()
+        d.streamStartBackground()
+        try:
+            self.assertRaises(LabJackException, d.streamStartBackground)
+        finally:
+            d.streamStopBackground()
+        self.assertRaises(LabJackException, d.streamStartBackground, queueDepth = 0)
+
+    def testReaderError(self):
+        # The blocks read before the error are returned first, then the
+        # error is raised, and keeps being raised.
+        d = self.openDevice()
+        d.handle.script = self.scriptBlocks(d, 2) + [LabJackException("Stream read failed.")]
+        d.streamStartBackground()
+        try:
+            self.waitForScript(d)
+            self.assertFalse(d._streamReader.is_alive())
+            self.assertEqual(d.streamReadBackground(timeout = 1)['firstPacket'], d.packetsPerRequest)
+            self.assertEqual(d.streamReadBackground(timeout = 1)['firstPacket'], 2 * d.packetsPerRequest)
+            for i in range(2):
+                try:
+                    d.streamReadBackground(timeout = 1)
+                    self.fail("The reader's error wasn't raised.")
+                except LabJackException:
+                    self.assertEqual(str(sys.exc_info()[1]), "Stream read failed.")
+        finally:
+            stats = d.streamStopBackground()
+        self.assertEqual(stats['blocks'], 2)
+        self.assertFalse(d.streamStarted)
+
+    def testEmptyReadsDontReuseQueuedBuffers(self):
+        # Blocks 1-7 with a timed out read after each. With queueDepth = 1
+        # the pool has 3 buffers, so empty reads that kept their buffer
+        # would wrap onto the queued block's buffer.
+        d = self.openDevice()
+        numPackets = d.packetsPerRequest
+        packetBytes = d._streamPacketBytes()
+        script = []
+        for i in range(1, 8):
+            script.append(_block(i * numPackets, numPackets, packetBytes))
+            script.append(None)
+        d.handle.script = script
+
+        d.streamStartBackground(queueDepth = 1)
+        try:
+            while d.handle.script:
+                time.sleep(0.01)
+            time.sleep(0.05)
+
+            block = d.streamReadBackground(timeout = 1)
+            self.assertEqual(block['firstPacket'], numPackets)
+            self.assertEqual(bytearray(block['result'])[10], numPackets & 0xff)
+            self.assertEqual(bytearray(block['result'])[0], numPackets & 0xff)
+        finally:
+            stats = d.streamStopBackground()
+        self.assertEqual(stats['blocks'], 7)
+        self.assertEqual(stats['dropped'], 6)
+        self.assertTrue(stats['emptyReads'] >= 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Tests for StreamDecoderPool: blocks converted in worker processes give the
+same results, in the same order, as processStreamData in this process.
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import LabJackPython
+import u6
+from LabJackPython import StreamDecoderPool, deviceFromStreamConfigSnapshot
+from LabJackSimulator import EmulatedU6, openEmulated
+
+
+def _asLists(result):
+    return dict([(name, list(values)) for name, values in result.items()])
+
+
+class StreamDecoderPoolTest(unittest.TestCase):
+    def setUp(self):
+        d = openEmulated(u6.U6(autoOpen = False), EmulatedU6())
+        d.getCalibrationData()
+        d.streamConfig(NumChannels = 3, ChannelNumbers = [0, 1, 2], ChannelOptions = [0, 0x10, 0], ScanFrequency = 20000)
+        self.device = d
+
+        self.blocks = []
+        d.streamStart()
+        try:
+            for block in d.streamData(convert = False):
+                if block is not None:
+                    self.blocks.append(bytes(block['result']))
+                if len(self.blocks) == 6:
+                    break
+        finally:
+            d.streamStop()
+        # Too big for a shared memory slot, so it's pickled.
+        self.blocks.append(self.blocks[0] + self.blocks[1])
+        self.blocks.append(self.blocks[2][:self.device._streamPacketBytes()])
+
+    def expected(self):
+        device = deviceFromStreamConfigSnapshot(self.device.streamConfigSnapshot())
+        device.streamPacketOffset = 0
+        return [dict(device.processStreamData(block)) for block in self.blocks]
+
+    def decode(self, asArrays):
+        self.device.streamPacketOffset = 0
+        pool = StreamDecoderPool(self.device, processes = 2, asArrays = asArrays, maxPending = 3)
+        results = []
+        try:
+            for block in self.blocks:
+                pool.submit(block)
+                results.extend(pool.results())
+        finally:
+            results.extend(pool.close())
+        return results
+
+    def testMatchesProcessStreamData(self):
+        self.assertEqual(self.decode(False), self.expected())
+
+    @unittest.skipIf(LabJackPython._numpy() is None, "NumPy is not installed")
+    def testArrays(self):
+        results = self.decode(True)
+        self.assertEqual([_asLists(result) for result in results], self.expected())
+
+
+if __name__ == "__main__":
+    unittest.main()
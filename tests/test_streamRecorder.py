@@ -0,0 +1,135 @@
+"""
+Tests for StreamRecorder and StreamRecording: recording the raw blocks of an
+EmulatedU6 and reading them back, including recordings whose files were cut
+short.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import LabJackPython
+import StreamRecorder
+import u6
+from LabJackPython import deviceFromStreamConfigSnapshot
+from LabJackSimulator import EmulatedU6, openEmulated
+
+
+def _withoutNumpy(function, *args, **kwargs):
+    # Runs function with LabJackPython acting as if NumPy isn't installed.
+    LabJackPython._numpy()
+    numpy = LabJackPython.numpy
+    LabJackPython.numpy = None
+    try:
+        return function(*args, **kwargs)
+    finally:
+        LabJackPython.numpy = numpy
+
+
+class StreamRecorderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, "run.ljs")
+
+        d = openEmulated(u6.U6(autoOpen = False), EmulatedU6())
+        d.getCalibrationData()
+        d.streamConfig(NumChannels = 3, ChannelNumbers = [0, 1, 2], ChannelOptions = [0, 0, 0], ScanFrequency = 20000)
+        self.snapshot = d.streamConfigSnapshot()
+
+        self.blocks = []
+        d.streamStart()
+        try:
+            with StreamRecorder.StreamRecorder(self.filename, d) as recorder:
+                for block in d.streamData(convert = False):
+                    if block is None:
+                        continue
+                    block = dict(block, result = bytes(block['result']))
+                    recorder.write(block)
+                    self.blocks.append(block)
+                    if len(self.blocks) == 5:
+                        break
+        finally:
+            d.streamStop()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def expected(self, start = 0, stop = None):
+        # Each block converted in order by a device made from the snapshot.
+        device = deviceFromStreamConfigSnapshot(self.snapshot)
+        device.streamPacketOffset = 0
+        results = []
+        for block in self.blocks[:stop]:
+            results.append(dict(device.processStreamData(block['result'])))
+        return results[start:]
+
+    def testRoundTrip(self):
+        recording = StreamRecorder.StreamRecording(self.filename)
+        try:
+            self.assertEqual(len(recording), 5)
+            for i, block in enumerate(self.blocks):
+                recorded = recording.block(i)
+                self.assertTrue(isinstance(recorded['result'], memoryview))
+                self.assertEqual(bytes(recorded['result']), block['result'])
+                self.assertEqual(recorded['firstPacket'], block['firstPacket'])
+                self.assertEqual(recorded['missed'], block['missed'])
+
+            replayed = [dict([(k, v) for k, v in block.items() if k.startswith("AIN")]) for block in recording.replay(2)]
+            self.assertEqual(replayed, self.expected(2))
+
+            whole = dict(recording.read(1, 4))
+            for name in whole:
+                self.assertEqual(whole[name], sum([result[name] for result in self.expected(1, 4)], []))
+        finally:
+            recording.close()
+
+    def testReadWithoutNumpy(self):
+        recording = StreamRecorder.StreamRecording(self.filename)
+        try:
+            self.assertEqual(dict(_withoutNumpy(recording.read, 1, 4)), dict(recording.read(1, 4)))
+        finally:
+            recording.close()
+
+    def testCloseWithBlocksInUse(self):
+        recording = StreamRecorder.StreamRecording(self.filename)
+        result = recording.block(0)['result']
+        recording.close()
+        self.assertEqual(len(result), len(self.blocks[0]['result']))
+
+    def testTruncatedDataFile(self):
+        size = os.path.getsize(self.filename)
+        with open(self.filename, "r+b") as f:
+            f.truncate(size - 10)
+
+        recording = StreamRecorder.StreamRecording(self.filename)
+        try:
+            self.assertEqual(len(recording), 4)
+            self.assertEqual(bytes(recording.block(3)['result']), self.blocks[3]['result'])
+        finally:
+            recording.close()
+
+    def testTruncatedIndexFile(self):
+        indexName = self.filename + StreamRecorder.INDEX_SUFFIX
+        size = os.path.getsize(indexName)
+        with open(indexName, "r+b") as f:
+            f.truncate(size - 3)
+
+        recording = StreamRecorder.StreamRecording(self.filename)
+        try:
+            self.assertEqual(len(recording), 4)
+            replayed = [dict([(k, v) for k, v in block.items() if k.startswith("AIN")]) for block in recording.replay()]
+            self.assertEqual(replayed, self.expected(0, 4))
+        finally:
+            recording.close()
+
+    def testNotARecording(self):
+        with open(self.filename, "r+b") as f:
+            f.write(b"NOTSTRM!")
+        self.assertRaises(LabJackPython.LabJackException, StreamRecorder.StreamRecording, self.filename)
+
+
+if __name__ == "__main__":
+    unittest.main()
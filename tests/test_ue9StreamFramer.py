@@ -0,0 +1,157 @@
+"""
+Tests for UE9StreamFramer, which splits the UE9's TCP stream data into
+whole, checked stream packets.
+"""
+import os
+import socket
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import LabJackChecksum
+from LabJackPython import LabJackException, UE9StreamFramer
+
+
+PACKET_BYTES = 46
+
+
+def _packet(counter):
+    # A UE9 Ethernet stream packet with its PacketCounter and samples set
+    # from counter, and both checksums right.
+    packet = bytearray(PACKET_BYTES)
+    packet[1:4] = UE9StreamFramer.HEADER
+    packet[10] = counter & 0xff
+    for i in range(12, PACKET_BYTES - 2):
+        packet[i] = (counter * 7 + i) & 0xff
+    return bytes(LabJackChecksum.setChecksum(packet))
+
+
+def _packets(first, count):
+    return b"".join([_packet(i) for i in range(first, first + count)])
+
+
+class UE9StreamFramerTest(unittest.TestCase):
+    def testWholePackets(self):
+        framer = UE9StreamFramer(None)
+        framer.feed(_packets(0, 3))
+        self.assertEqual(framer.available(), 3)
+        self.assertEqual(framer.packets(2), _packets(0, 2))
+        self.assertEqual(framer.packets(), _packet(2))
+        self.assertEqual(framer.packets(), b"")
+        self.assertEqual(framer.stats(), dict(available = 0, bufferedBytes = 0, resyncs = 0, discardedBytes = 0))
+
+    def testSplitPackets(self):
+        framer = UE9StreamFramer(None)
+        data = _packets(0, 4)
+        for pos in range(0, len(data), 7):
+            framer.feed(data[pos:pos + 7])
+            self.assertEqual(framer.available(), (pos + 7) // PACKET_BYTES if pos + 7 < len(data) else 4)
+        self.assertEqual(framer.packets(), data)
+        self.assertEqual(framer.resyncs, 0)
+
+    def testResyncAfterLeadingGarbage(self):
+        framer = UE9StreamFramer(None)
+        framer.feed(b"garbage" + _packets(0, 3))
+        self.assertEqual(framer.packets(), _packets(0, 3))
+        self.assertEqual(framer.stats()['resyncs'], 1)
+        self.assertEqual(framer.stats()['discardedBytes'], 7)
+
+    def testResyncAfterGarbageBetweenPackets(self):
+        framer = UE9StreamFramer(None)
+        framer.feed(_packet(0) + b"\x00\x01\x02\x03\x04" + _packets(1, 2))
+        self.assertEqual(framer.packets(), _packets(0, 3))
+        self.assertEqual(framer.resyncs, 1)
+        self.assertEqual(framer.discardedBytes, 5)
+
+    def testBadChecksumDropsThePacket(self):
+        bad = bytearray(_packet(1))
+        bad[20] ^= 0xff
+        framer = UE9StreamFramer(None)
+        framer.feed(_packet(0) + bytes(bad) + _packet(2))
+        self.assertEqual(framer.packets(), _packet(0) + _packet(2))
+        self.assertEqual(framer.resyncs, 1)
+        self.assertEqual(framer.discardedBytes, PACKET_BYTES)
+
+    def testGarbageWithoutAHeader(self):
+        # The last bytes are kept in case they start a packet.
+        framer = UE9StreamFramer(None)
+        framer.feed(b"\x55" * 60)
+        self.assertEqual(framer.available(), 0)
+        self.assertEqual(framer.stats()['bufferedBytes'], len(UE9StreamFramer.HEADER))
+        framer.feed(_packets(0, 2))
+        self.assertEqual(framer.packets(), _packets(0, 2))
+        self.assertEqual(framer.discardedBytes, 60)
+
+    def testCompaction(self):
+        framer = UE9StreamFramer(None, bufferPackets = 2)
+        data = _packets(0, 3)
+        framer.feed(data[:PACKET_BYTES + 23])
+        self.assertEqual(framer.packets(), _packet(0))
+        self.assertEqual(framer.start, PACKET_BYTES)
+
+        # Less than a packet of room at the end, so the unread half packet
+        # is moved to the front.
+        space = framer.freeSpace()
+        self.assertEqual(framer.start, 0)
+        self.assertEqual(framer.end, 23)
+        self.assertEqual(len(space), 2 * PACKET_BYTES - 23)
+
+        framer.feed(data[PACKET_BYTES + 23:])
+        self.assertEqual(framer.packets(), _packets(1, 2))
+        self.assertEqual(framer.resyncs, 0)
+
+    def testFull(self):
+        framer = UE9StreamFramer(None, bufferPackets = 2)
+        framer.feed(_packets(0, 2))
+        self.assertRaises(LabJackException, framer.freeSpace)
+        self.assertRaises(LabJackException, framer.feed, _packet(2))
+
+    def testFreeSpaceAndCommit(self):
+        framer = UE9StreamFramer(None)
+        data = _packets(0, 2)
+        space = framer.freeSpace()
+        space[:60] = data[:60]
+        framer.commit(60)
+        self.assertEqual(framer.stats(), dict(available = 1, bufferedBytes = 60, resyncs = 0, discardedBytes = 0))
+
+        space = framer.freeSpace()
+        space[:len(data) - 60] = data[60:]
+        framer.commit(len(data) - 60)
+        self.assertEqual(framer.available(), 2)
+        self.assertEqual(framer.packets(), data)
+
+    def testClear(self):
+        framer = UE9StreamFramer(None)
+        framer.feed(b"xx" + _packets(0, 2))
+        framer.clear()
+        self.assertEqual(framer.stats(), dict(available = 0, bufferedBytes = 0, resyncs = 0, discardedBytes = 0))
+
+    def testNeedsTwoPackets(self):
+        self.assertRaises(LabJackException, UE9StreamFramer, None, bufferPackets = 1)
+
+    def testFillFromASocket(self):
+        sender, receiver = socket.socketpair()
+        try:
+            receiver.setblocking(False)
+            framer = UE9StreamFramer(receiver)
+            self.assertEqual(framer.fill(), 0)
+
+            data = _packets(0, 3)
+            sender.sendall(data[:50])
+            receiver.setblocking(True)
+            self.assertEqual(framer.fill(), 50)
+            self.assertEqual(framer.available(), 1)
+
+            sender.sendall(data[50:])
+            self.assertEqual(framer.read(3), data)
+
+            sender.close()
+            self.assertRaises(LabJackException, framer.fill)
+        finally:
+            sender.close()
+            receiver.close()
+
+
+if __name__ == "__main__":
+    unittest.main()